@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+
+class BackgroundLoop:
+    """A single daemon thread running an event loop shared by every sync Brain and the plugin manager."""
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="background-loop", daemon=True).start()
+            return self._loop
+
+    def run(self, coro):
+        """Run a coroutine on the background loop and block for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the background loop without waiting for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def iterate(self, agen):
+        """Drive an async generator from synchronous code, one item at a time."""
+        try:
+            while True:
+                try:
+                    yield self.run(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Closing early (e.g. the consumer broke out) cancels the provider stream
+            self.run(agen.aclose())
+
+
+background_loop = BackgroundLoop()
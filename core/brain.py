@@ -1,11 +1,18 @@
-import os
-import ollama
-import openai
-import anthropic
+import asyncio
+import threading
+import time
 from utils.logger import get_logger
 logger = get_logger("brain")
 import utils.config_loader
-from core.memory import update_memory
+from core.memory import update_memory, memory_limit
+from core.response_cache import ResponseCache
+from core.context_builder import ContextBuilder
+from core.provider_chain import ProviderChain
+from core.singleflight import SingleFlight
+from core.long_term_memory import LongTermMemory
+from core.summarizer import Summarizer
+from core import llm_clients
+from core.background_loop import background_loop as _background_loop
 
 BASE_SYSTEM_PROMPT = (
     "You are JARVIS, a smart AI terminal assistant with a touch of personality. "
@@ -17,85 +24,524 @@ BASE_SYSTEM_PROMPT = (
     "If no plugin is needed, respond normally."
 )
 
-class Brain:
-    def __init__(self):
-        self.config = utils.config_loader.load_config()
+OFFLINE_REPLY = "My mind is offline at the moment. Try again later."
+PLUGIN_MARKER = "PLUGIN:"
+
+
+class _Session:
+    """
+    Ollama context tokens for one conversation (one memory dict). Its turns
+    hold `lock`, so concurrent callers never interleave in the same context.
+    """
+    def __init__(self, memory):
+        self.memory = memory
+        self.context = None
+        self.summary = None  # memory["summary"] when the session was seeded
+        self.turns = 0
+        self.lock = asyncio.Lock()
+
+    def reset(self):
+        self.context = None
+
+
+class AsyncBrain:
+    """
+    Asyncio-native brain built on the providers' async clients.
+    At most `max_concurrency` queries are in flight against the backend at
+    once; an instance belongs to the event loop it is first used on.
+    """
+    def __init__(self, config=None, max_concurrency=None):
+        self.config = config if config is not None else utils.config_loader.load_config()
         self.USE_MODEL = self.config.get("use_model", "ollama")
         self.model = self.config.get("ollama_model", "llama3.2")
+        self.max_concurrency = max_concurrency or self.config.get("max_concurrent_queries", 4)
+        self.keep_alive = self.config.get("ollama_keep_alive")
+        self.last_activity = time.monotonic()
+        self._semaphore = None
+        self._clients = {}
 
-        if self.USE_MODEL == "claude":
-            self.client = anthropic.Anthropic(api_key=self.config.get("anthropic_api_key", os.getenv("ANTHROPIC_API_KEY")))
-        elif self.USE_MODEL == "openai":
-            self.client = openai.OpenAI(api_key=self.config.get("openai_api_key", os.getenv("OPENAI_API_KEY")))
-        # For Ollama, no client init needed
-
+        # Ordered providers with deadlines and optional hedging; USE_MODEL is the primary
+        self.chain = ProviderChain.from_config(self.config)
         self.BASE_SYSTEM_PROMPT = BASE_SYSTEM_PROMPT
+        self.context_builder = ContextBuilder.from_config(self.config, self._model_name(self.chain.providers[0]))
+        self.cache = ResponseCache.from_config(self.config) if self.config.get("response_cache_enabled", False) else None
+        # Every past turn, embedded for top-k recall beyond the recent context window
+        self.long_term = LongTermMemory.from_config(self.config)
+        # Older turns are folded into memory["summary"] off the request path
+        self.summarizer = Summarizer.from_config(self.config, self._summarize)
+        self._last_query = None
+        self._last_reply = None
+        self.inflight = _inflight
 
-    def respond_to_query(self, query, memory=None):
+        # Session mode: Ollama's returned context tokens stand in for the
+        # system prompt and history, so each turn only prefills the new input.
+        # Each conversation (memory dict) has its own session
+        self.session_mode = self.config.get("session_mode", False)
+        self._sessions = {}  # id(memory) -> _Session
+
+    @property
+    def semaphore(self):
+        # Created lazily so it binds to the loop the brain actually runs on
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @property
+    def client(self):
+        return self._client(self.USE_MODEL)
+
+    def _client(self, provider):
+        # Pooled per process (and per loop) by the client registry
+        if provider not in self._clients:
+            self._clients[provider] = llm_clients.get_async_client(provider, self.config)
+        return self._clients[provider]
+
+    def _model_name(self, provider):
+        if provider == "claude":
+            return "claude-3-sonnet-20240229"
+        if provider == "openai":
+            return self.config.get("llm_model", "gpt-3.5-turbo")
+        return self.model
+
+    @property
+    def model_id(self):
+        """Provider-qualified names of the models in the chain, used to key the cache."""
+        return ",".join(f"{provider}:{self._model_name(provider)}" for provider in self.chain.providers)
+
+    def provider_stats(self):
+        return self.chain.report()
+
+    def _request_key(self, query, system_prompt, chat):
+        return ResponseCache.make_key(query, self.model_id, system_prompt, chat[:-1])
+
+    def _cache_key(self, query, system_prompt, chat):
+        if self.cache is None:
+            return None
+        return self._request_key(query, system_prompt, chat)
+
+    def cache_stats(self):
+        if not self.cache:
+            return {}
+        return dict(self.cache.stats(), coalesced=self.inflight.shared)
+
+    def _build_messages(self, query, memory=None, session=None):
+        """
+        Return (system_prompt, chat) for a query, packing memory context into
+        the token budget. A live Ollama session never re-sends the system
+        prompt, so there recalled turns are put in front of the query instead.
+        """
+        context = memory.get("context", []) if memory else []
+        system_prompt = self.BASE_SYSTEM_PROMPT
+        if memory and memory.get("summary"):
+            system_prompt += f"\n\nSummary of the earlier conversation:\n{memory['summary']}"
+        if session is not None and session.context and session.summary != memory.get("summary"):
+            # A new summary only reaches the model by seeding a new session with it
+            session.reset()
+        recall = self._recall(query, context, memory)
+        if session is not None and session.context:
+            chat = self.context_builder.build(system_prompt, context, query)
+            if recall:
+                chat[-1] = {"role": "user", "content": f"{recall.strip()}\n\n{query}"}
+            return system_prompt, chat
+        system_prompt += recall
+        return system_prompt, self.context_builder.build(system_prompt, context, query)
+
+    def _recall(self, query, context, memory):
+        """Past turns relevant to the query that are no longer in the recent context, as prompt text."""
+        if self.long_term is None or memory is None:
+            return ""
+        recent = {turn.get("timestamp") for turn in context if turn.get("timestamp")}
+        recalled = self.long_term.recall(query, exclude=recent)
+        if not recalled:
+            return ""
+        lines = "\n".join(f"User: {turn['user']}\nJARVIS: {turn['ai']}" for turn in recalled)
+        return f"\n\nRelevant earlier conversation:\n{lines}"
+
+    def _session(self, memory):
+        """The Ollama session for a conversation, or None when session mode does not apply."""
+        if not self.session_mode or memory is None:
+            return None
+        session = self._sessions.get(id(memory))
+        if session is None or session.memory is not memory:
+            session = self._sessions[id(memory)] = _Session(memory)
+        return session
+
+    def reset_session(self, memory=None):
+        """Drop the Ollama session of a conversation (all of them by default) so it is seeded from memory again."""
+        sessions = self._sessions.values() if memory is None else [self._sessions.get(id(memory))]
+        for session in sessions:
+            if session is not None:
+                session.reset()
+
+    def _end_turn(self, session, turns_before):
+        # A turn the Ollama session did not see (cache hit, failover) leaves the
+        # model-side context behind the conversation, so start over next time
+        if session is not None and session.turns == turns_before:
+            session.reset()
+
+    def _session_request(self, session, system_prompt, chat):
+        """generate() arguments for the next session turn: only the new query once a context exists."""
+        request = {
+            "model": self.model,
+            "prompt": chat[-1]["content"],
+            "options": {
+                "temperature": 0.7,
+                "num_predict": 150
+            },
+            "keep_alive": self.keep_alive,
+        }
+        if session.context:
+            request["context"] = session.context
+        else:
+            session.summary = session.memory.get("summary")
+            history = "\n".join(
+                f"{'User' if message['role'] == 'user' else 'JARVIS'}: {message['content']}"
+                for message in chat[:-1]
+            )
+            request["system"] = f"{system_prompt}\n\nConversation so far:\n{history}" if history else system_prompt
+        return request
+
+    def _save_session(self, session, context):
+        if not context:
+            return
+        session.turns += 1
+        # Past the token budget the model-side context would keep growing
+        # unchecked; the next turn is seeded from the packed memory instead
+        if len(context) > self.context_builder.budget:
+            logger.debug(f"Session context reached {len(context)} tokens, starting a new session")
+            session.reset()
+        else:
+            session.context = context
+
+    def _claude_system(self, system_prompt):
+        # The static system prompt is marked cacheable so Anthropic only prefills it once
+        if not self.session_mode:
+            return system_prompt
+        return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
+    async def warm_up(self):
+        """Load the Ollama model ahead of the first query (an empty prompt only loads it)."""
+        if "ollama" not in self.chain.providers:
+            return False
+        started = time.monotonic()
+        try:
+            await self._client("ollama").generate(model=self.model, prompt="", keep_alive=self.keep_alive)
+        except Exception as e:
+            logger.warning(f"Model warm-up failed: {e}")
+            return False
+        logger.info(f"Warmed up '{self.model}' in {time.monotonic() - started:.2f}s")
+        return True
+
+    async def keep_warm(self, interval):
+        """Ping the model whenever it has been idle for `interval` seconds so Ollama never unloads it."""
+        while True:
+            idle = time.monotonic() - self.last_activity
+            if idle < interval:
+                await asyncio.sleep(interval - idle)
+                continue
+            await self.warm_up()
+            self.last_activity = time.monotonic()
+
+    def _remember(self, query, reply, memory):
+        if memory is not None:
+            update_memory(memory, query, reply, memory_limit(self.config))
+            if self.long_term is not None:
+                self.long_term.add(query, reply, memory["context"][-1]["timestamp"])
+            if self.summarizer is not None:
+                self.summarizer.schedule(memory)
+        self._last_query = query
+        self._last_reply = reply
+
+    async def _summarize(self, system_prompt, text):
+        reply, _ = await self._run_chain(system_prompt, [{"role": "user", "content": text}], None)
+        return reply
+
+    async def _run_chain(self, system_prompt, chat, session):
+        async with self.semaphore:
+            return await self.chain.run(
+                lambda provider: self._complete(provider, system_prompt, chat, session)
+            )
+
+    async def respond_to_query(self, query, memory=None):
+        session = self._session(memory)
+        if session is None:
+            return await self._respond(query, memory, None)
+        async with session.lock:
+            return await self._respond(query, memory, session)
+
+    async def _respond(self, query, memory, session):
+        turns_before = session.turns if session else 0
         try:
             # Check for plugin invocation
-            if query.startswith("PLUGIN:"):
+            if query.startswith(PLUGIN_MARKER):
                 return query
 
-            # Add memory context
-            user_history = []
-            if memory:
-                context = memory.get("context", [])
-                for past in context[-3:]:
-                    user_history.append({"role": "user", "content": past.get("user")})
-                    user_history.append({"role": "assistant", "content": past.get("ai")})
-
-            # Ollama
-            if self.USE_MODEL == "ollama":
-                messages = [{"role": "system", "content": self.BASE_SYSTEM_PROMPT}]
-                messages += user_history
-                messages.append({"role": "user", "content": query})
-                
-                response = ollama.chat(
-                    model=self.model,
-                    messages=messages,
-                    options={
-                        "temperature": 0.7,
-                        "num_predict": 150
-                    }
-                )
-                reply = response['message']['content']
-
-            # Claude 3.5 Sonnet
-            elif self.USE_MODEL == "claude":
-                response = self.client.messages.create(
-                    model="claude-3-sonnet-20240229",
-                    max_tokens=1024,
-                    temperature=0.7,
-                    system=self.BASE_SYSTEM_PROMPT,
-                    messages=user_history + [{"role": "user", "content": query}]
+            self.last_activity = time.monotonic()
+            system_prompt, chat = self._build_messages(query, memory, session)
+            cache_key = self._cache_key(query, system_prompt, chat)
+            reply = self.cache.get(cache_key) if cache_key else None
+            if reply is None:
+                reply, provider = await self.inflight.do(
+                    self._request_key(query, system_prompt, chat),
+                    lambda: self._run_chain(system_prompt, chat, session)
                 )
-                reply = response.content[0].text
-
-            # OpenAI GPT (updated to modern API)
-            else:
-                messages = [{"role": "system", "content": self.BASE_SYSTEM_PROMPT}]
-                messages += user_history
-                messages.append({"role": "user", "content": query})
-
-                response = self.client.chat.completions.create(
-                    model=self.config.get("llm_model", "gpt-3.5-turbo"),
-                    messages=messages,
-                    temperature=0.7,
-                    max_tokens=150
-                )
-                reply = response.choices[0].message.content.strip()
+                logger.debug(f"Answered by '{provider}'")
+                if cache_key:
+                    self.cache.set(cache_key, reply)
 
-            # Update memory
-            if memory is not None:
-                update_memory(memory, query, reply)
+            self._end_turn(session, turns_before)
+            self._remember(query, reply, memory)
+            return reply
 
-            # Cache last response to reduce repeated calls (simple in-memory cache)
-            self._last_query = query
-            self._last_reply = reply
+        except Exception as e:
+            logger.error(f"Error: {e}")
+            self._end_turn(session, turns_before)
+            return OFFLINE_REPLY
 
-            return reply
+    async def stream_query(self, query, memory=None):
+        """
+        Async generator variant of respond_to_query that yields text chunks
+        as the provider produces them. Memory is updated once the stream finishes.
+        """
+        session = self._session(memory)
+        # Without a session nothing is shared, so the lock is a fresh one
+        async with (session.lock if session else asyncio.Lock()):
+            async for chunk in self._stream_reply(query, memory, session):
+                yield chunk
+
+    async def _stream_reply(self, query, memory, session):
+        if query.startswith(PLUGIN_MARKER):
+            yield query
+            return
+
+        chunks = []
+        self.last_activity = time.monotonic()
+        turns_before = session.turns if session else 0
+        leader = None
+        try:
+            system_prompt, chat = self._build_messages(query, memory, session)
+            cache_key = self._cache_key(query, system_prompt, chat)
+            cached = self.cache.get(cache_key) if cache_key else None
+            request_key = self._request_key(query, system_prompt, chat)
+            in_flight = self.inflight.pending(request_key) if cached is None else None
+            if in_flight is not None:
+                # Late joiners get the leader's finished reply in one piece
+                cached, _ = await self.inflight.join(in_flight)
+            if cached is not None:
+                self._end_turn(session, turns_before)
+                self._remember(query, cached, memory)
+                yield cached
+                return
+
+            leader = self.inflight.lead(request_key)
+            async with self.semaphore:
+                stream = self.chain.stream(
+                    lambda provider: self._stream(provider, system_prompt, chat, session)
+                )
+                # While the reply could still be a PLUGIN: directive, watch for
+                # the end of its line and stop generating there
+                watching = True
+                try:
+                    async for chunk in stream:
+                        if not chunk:
+                            continue
+                        if watching:
+                            text = "".join(chunks)
+                            head = (text + chunk).lstrip()
+                            if head.startswith(PLUGIN_MARKER) and "\n" in head:
+                                full = text + chunk
+                                end = full.index("\n", full.index(PLUGIN_MARKER))
+                                chunks.append(chunk[:end - len(text)])
+                                if chunks[-1]:
+                                    yield chunks[-1]
+                                logger.debug("Plugin directive complete, stopping generation")
+                                break
+                            watching = head.startswith(PLUGIN_MARKER) or PLUGIN_MARKER.startswith(head)
+                        chunks.append(chunk)
+                        yield chunk
+                finally:
+                    await stream.aclose()
 
+            reply = "".join(chunks).strip()
+            leader.set_result((reply, None))
         except Exception as e:
             logger.error(f"Error: {e}")
-            return "My mind is offline at the moment. Try again later."
+            if leader is not None and not leader.done():
+                leader.set_exception(e)
+            self._end_turn(session, turns_before)
+            if not chunks:
+                yield OFFLINE_REPLY
+            return
+        finally:
+            # The consumer stopped early; joiners must not wait forever
+            if leader is not None and not leader.done():
+                leader.set_exception(RuntimeError("Stream closed before it finished"))
+
+        if cache_key:
+            self.cache.set(cache_key, reply)
+        self._end_turn(session, turns_before)
+        self._remember(query, reply, memory)
+
+    async def _complete(self, provider, system_prompt, chat, session=None):
+        client = self._client(provider)
+
+        # Ollama session: continue from the returned context instead of re-sending history
+        if provider == "ollama" and session:
+            response = await client.generate(**self._session_request(session, system_prompt, chat))
+            self._save_session(session, response.get("context"))
+            return response['response']
+
+        # Ollama
+        if provider == "ollama":
+            response = await client.chat(
+                model=self.model,
+                messages=[{"role": "system", "content": system_prompt}] + chat,
+                options={
+                    "temperature": 0.7,
+                    "num_predict": 150
+                },
+                keep_alive=self.keep_alive
+            )
+            return response['message']['content']
+
+        # Claude 3.5 Sonnet
+        if provider == "claude":
+            response = await client.messages.create(
+                model=self._model_name(provider),
+                max_tokens=1024,
+                temperature=0.7,
+                system=self._claude_system(system_prompt),
+                messages=chat
+            )
+            return response.content[0].text
+
+        # OpenAI GPT (updated to modern API)
+        response = await client.chat.completions.create(
+            model=self._model_name(provider),
+            messages=[{"role": "system", "content": system_prompt}] + chat,
+            temperature=0.7,
+            max_tokens=150
+        )
+        return response.choices[0].message.content.strip()
+
+    def _stream(self, provider, system_prompt, chat, session=None):
+        if provider == "ollama" and session:
+            return self._stream_ollama_session(session, system_prompt, chat)
+        if provider == "ollama":
+            return self._stream_ollama(system_prompt, chat)
+        if provider == "claude":
+            return self._stream_claude(system_prompt, chat)
+        return self._stream_openai(system_prompt, chat)
+
+    async def _stream_ollama(self, system_prompt, chat):
+        stream = await self._client("ollama").chat(
+            model=self.model,
+            messages=[{"role": "system", "content": system_prompt}] + chat,
+            options={
+                "temperature": 0.7,
+                "num_predict": 150
+            },
+            keep_alive=self.keep_alive,
+            stream=True
+        )
+        async for part in stream:
+            yield part['message']['content']
+
+    async def _stream_ollama_session(self, session, system_prompt, chat):
+        stream = await self._client("ollama").generate(**self._session_request(session, system_prompt, chat), stream=True)
+        async for part in stream:
+            yield part['response']
+            if part.get('done'):
+                self._save_session(session, part.get('context'))
+
+    async def _stream_claude(self, system_prompt, chat):
+        async with self._client("claude").messages.stream(
+            model=self._model_name("claude"),
+            max_tokens=1024,
+            temperature=0.7,
+            system=self._claude_system(system_prompt),
+            messages=chat
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+    async def _stream_openai(self, system_prompt, chat):
+        stream = await self._client("openai").chat.completions.create(
+            model=self._model_name("openai"),
+            messages=[{"role": "system", "content": system_prompt}] + chat,
+            temperature=0.7,
+            max_tokens=150,
+            stream=True
+        )
+        async for part in stream:
+            if part.choices:
+                yield part.choices[0].delta.content or ""
+
+
+# Identical requests in flight at the same time share one backend call,
+# whichever brain in the process (shell, voice, batch workers) made them
+_inflight = SingleFlight()
+
+# (host, model) pairs already warmed by some Brain in this process
+_warmed_models = set()
+_warmed_lock = threading.Lock()
+
+
+class Brain:
+    """Synchronous facade over AsyncBrain for the shell, voice thread and plugins."""
+    def __init__(self):
+        self.config = utils.config_loader.load_config()
+        self._async = AsyncBrain(self.config)
+        self.USE_MODEL = self._async.USE_MODEL
+        self.model = self._async.model
+        self.BASE_SYSTEM_PROMPT = self._async.BASE_SYSTEM_PROMPT
+        self._start_warm_up()
+
+    def _start_warm_up(self):
+        """Warm the local model in the background so the first query never pays the load."""
+        if not self.config.get("ollama_warmup", False) or "ollama" not in self._async.chain.providers:
+            return
+        key = (self.config.get("ollama_host"), self.model)
+        with _warmed_lock:
+            if key in _warmed_models:
+                return
+            _warmed_models.add(key)
+        _background_loop.submit(self._async.warm_up())
+        interval = self.config.get("ollama_keep_warm_interval")
+        if interval:
+            _background_loop.submit(self._async.keep_warm(interval))
+
+    @property
+    def async_brain(self):
+        return self._async
+
+    @property
+    def _last_query(self):
+        return self._async._last_query
+
+    @property
+    def _last_reply(self):
+        return self._async._last_reply
+
+    def cache_stats(self):
+        return self._async.cache_stats()
+
+    def provider_stats(self):
+        return self._async.provider_stats()
+
+    def clear_cache(self):
+        if self._async.cache:
+            self._async.cache.clear()
+
+    def reset_session(self, memory=None):
+        self._async.reset_session(memory)
+
+    def respond_to_query(self, query, memory=None):
+        return _background_loop.run(self._async.respond_to_query(query, memory))
+
+    def stream_query(self, query, memory=None):
+        """
+        Generator variant of respond_to_query that yields text chunks as the
+        provider produces them. Memory is updated once the stream finishes.
+        """
+        return _background_loop.iterate(self._async.stream_query(query, memory))
@@ -1,4 +1,5 @@
 import re
+from concurrent.futures import ThreadPoolExecutor
 from core.plugin_manager import PluginManager
 from core.brain import Brain
 from core.memory import Memory
@@ -30,91 +31,122 @@ class CommandHandler:
         logger.info(f"Preprocessed: {command}")
         self.memory.update(command, "")
 
-        subcommands = self._split_tasks(command)
         results = []
+        for step in self._plan_tasks(command):
+            if len(step) == 1:
+                outcomes = [self._run_task(step[0])]
+            else:
+                # Tasks joined by "and" are independent: run them together, answer in order
+                with ThreadPoolExecutor(max_workers=len(step)) as pool:
+                    outcomes = list(pool.map(self._run_task, step))
+            for replies, task_results in outcomes:
+                for reply in replies:
+                    self.respond(reply, use_voice)
+                results.extend(task_results)
 
-        for subcmd in subcommands:
-            resolved = self._apply_aliases(subcmd)
+        return "\n".join(results)
 
-            # First try direct plugin match
-            plugin_name, plugin_response = self.plugins.smart_dispatch(resolved)
-            if plugin_name:
-                try:
-                    result = self.plugins.execute(plugin_name, resolved)
-                    self.memory.update("", result)
-                    self.respond(result, use_voice)
-                    results.append(result)
-                    continue
-                except Exception as e:
-                    logger.error(f"Plugin '{plugin_name}' failed: {str(e)}")
-                    error_msg = f"The {plugin_name} plugin encountered an error. Let me try to help another way..."
-                    self.respond(error_msg, use_voice)
-                    results.append(error_msg)
-                    # Fall through to AI handling
+    def _run_task(self, subcmd):
+        """Handle one subtask, collecting its replies instead of printing them; returns (replies, results)."""
+        replies = []
+        return replies, self._handle_task(subcmd, replies.append)
 
-            # Try AI-powered command understanding
+    def _handle_task(self, subcmd, say):
+        """Resolve one subtask to a plugin or the AI; returns its results and passes replies to say()."""
+        results = []
+        resolved = self._apply_aliases(subcmd)
+
+        # First try direct plugin match
+        plugin_name, _ = self.plugins.smart_dispatch(resolved)
+        if plugin_name:
             try:
-                ai_suggestion = self.brain.respond_to_query(
-                    f"Interpret this command and suggest how to execute it: {resolved}\n"
-                    "Provide either: 1) A plugin name that can handle it, or "
-                    "2) Direct instructions/code to execute it."
-                )
-                logger.info(f"AI command interpretation: {ai_suggestion}")
-
-                # Try to match the AI's suggestion to a plugin
-                plugin_name, plugin_response = self.plugins.smart_dispatch(ai_suggestion)
-                if plugin_name:
-                    try:
-                        result = self.plugins.execute(plugin_name, ai_suggestion)
-                        self.memory.update("", result)
-                        self.respond(result, use_voice)
-                        results.append(result)
-                        continue
-                    except Exception as e:
-                        logger.error(f"AI-suggested plugin '{plugin_name}' failed: {str(e)}")
-                        error_msg = f"The AI-suggested plugin '{plugin_name}' encountered an error."
-                        self.respond(error_msg, use_voice)
-                        results.append(error_msg)
-                        continue
+                result = self.plugins.execute(plugin_name, self.plugins.plugin_args(plugin_name, resolved))
+                self.memory.update("", result)
+                say(result)
+                results.append(result)
+                return results
             except Exception as e:
-                logger.error(f"AI command interpretation failed: {str(e)}")
+                logger.error(f"Plugin '{plugin_name}' failed: {str(e)}")
+                error_msg = f"The {plugin_name} plugin encountered an error. Let me try to help another way..."
+                say(error_msg)
+                results.append(error_msg)
+                # Fall through to AI handling
 
-            # Final AI fallback - direct execution
-            logger.debug(f"Attempting direct AI execution for: {resolved}")
+        # Local intent classifier: confident matches skip the LLM entirely
+        plugin_name, confidence = self.plugins.classify(resolved)
+        if plugin_name:
+            logger.info(f"Intent router matched '{plugin_name}' ({confidence:.2f})")
             try:
-                ai_response = self.brain.respond_to_query(
-                    f"Provide direct executable solution for: {resolved}\n"
-                    "Format as either:\n"
-                    "1) A bash command between ```bash ``` marks\n"
-                    "2) Python code between ```python ``` marks\n"
-                    "3) Plain instructions if neither is possible"
-                )
-
-                # Try to execute the AI's suggestion
+                result = self.plugins.execute(plugin_name, self.plugins.plugin_args(plugin_name, resolved))
+                self.memory.update("", result)
+                say(result)
+                results.append(result)
+                return results
+            except Exception as e:
+                logger.error(f"Plugin '{plugin_name}' failed: {str(e)}")
+
+        # Try AI-powered command understanding
+        try:
+            ai_suggestion = self.brain.respond_to_query(
+                f"Interpret this command and suggest how to execute it: {resolved}\n"
+                "Provide either: 1) A plugin name that can handle it, or "
+                "2) Direct instructions/code to execute it."
+            )
+            logger.info(f"AI command interpretation: {ai_suggestion}")
+
+            # Try to match the AI's suggestion to a plugin
+            plugin_name, _ = self.plugins.smart_dispatch(ai_suggestion)
+            if plugin_name:
                 try:
-                    if "```" in ai_response:  # Extract code blocks
-                        code_blocks = re.findall(r'```(?:python|bash)?\n(.*?)\n```', ai_response, re.DOTALL)
-                        for block in code_blocks:
-                            self.execute_code_block(block)
-                            results.append(f"Executed: {block[:50]}...")
-                    else:
-                        self.respond(ai_response, use_voice)
-                        results.append(ai_response)
+                    result = self.plugins.execute(plugin_name, self.plugins.plugin_args(plugin_name, ai_suggestion))
+                    self.memory.update("", result)
+                    say(result)
+                    results.append(result)
+                    return results
                 except Exception as e:
-                    error_msg = f"Failed to execute: {str(e)}"
-                    self.respond(error_msg, use_voice)
+                    logger.error(f"AI-suggested plugin '{plugin_name}' failed: {str(e)}")
+                    error_msg = f"The AI-suggested plugin '{plugin_name}' encountered an error."
+                    say(error_msg)
                     results.append(error_msg)
-                
-                self.memory.update("", "\n".join(results))
-
+                    return results
+        except Exception as e:
+            logger.error(f"AI command interpretation failed: {str(e)}")
+
+        # Final AI fallback - direct execution
+        logger.debug(f"Attempting direct AI execution for: {resolved}")
+        try:
+            ai_response = self.brain.respond_to_query(
+                f"Provide direct executable solution for: {resolved}\n"
+                "Format as either:\n"
+                "1) A bash command between ```bash ``` marks\n"
+                "2) Python code between ```python ``` marks\n"
+                "3) Plain instructions if neither is possible"
+            )
+
+            # Try to execute the AI's suggestion
+            try:
+                if "```" in ai_response:  # Extract code blocks
+                    code_blocks = re.findall(r'```(?:python|bash)?\n(.*?)\n```', ai_response, re.DOTALL)
+                    for block in code_blocks:
+                        self.execute_code_block(block)
+                        results.append(f"Executed: {block[:50]}...")
+                else:
+                    say(ai_response)
+                    results.append(ai_response)
             except Exception as e:
-                logger.error(f"AI direct execution failed: {str(e)}")
-                error_msg = "I encountered an error while trying to process your request."
-                self.respond(error_msg, use_voice)
+                error_msg = f"Failed to execute: {str(e)}"
+                say(error_msg)
                 results.append(error_msg)
-                continue
 
-        return "\n".join(results)
+            self.memory.update("", "\n".join(results))
+
+        except Exception as e:
+            logger.error(f"AI direct execution failed: {str(e)}")
+            error_msg = "I encountered an error while trying to process your request."
+            say(error_msg)
+            results.append(error_msg)
+
+        return results
 
     def respond(self, response, use_voice=False):
         """Speak or print the response."""
@@ -141,9 +173,18 @@ class CommandHandler:
         command = self._filter_profanity(command)
         return command
 
-    def _split_tasks(self, command):
-        """Split tasks by conjunctions (and, then)."""
-        return [task.strip() for task in re.split(r"\b(?:and|then|&|,)\b", command)]
+    def _plan_tasks(self, command):
+        """
+        Split a command into steps run one after another ("then"), each made of
+        tasks that may run at the same time ("and"). Commas stay part of a
+        task: "weather in Paris, France" is one city, not two commands.
+        """
+        steps = []
+        for step in re.split(r"\bthen\b", command):
+            tasks = [task.strip() for task in re.split(r"\band\b", step) if task.strip()]
+            if tasks:
+                steps.append(tasks)
+        return steps
 
     def _apply_aliases(self, command):
         """Replace command with alias if it exists in config."""
@@ -0,0 +1,71 @@
+import re
+
+# Words and individual punctuation marks; long words count as several tokens
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+TRUNCATION_MARK = " …"
+
+DEFAULT_BUDGET = 1024
+DEFAULT_MAX_TURN_TOKENS = 256
+
+
+def estimate_tokens(text):
+    """Cheap local approximation of a BPE token count (no tokenizer needed)."""
+    if not text:
+        return 0
+    return sum(1 + (len(piece) - 1) // 6 for piece in _TOKEN_RE.findall(text))
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text down to roughly max_tokens, marking the cut."""
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text or ""
+    used = 0
+    end = 0
+    for match in _TOKEN_RE.finditer(text):
+        cost = 1 + (len(match.group()) - 1) // 6
+        if used + cost > max_tokens:
+            break
+        used += cost
+        end = match.end()
+    return text[:end].rstrip() + TRUNCATION_MARK
+
+
+class ContextBuilder:
+    """
+    Packs conversation history into a per-model token budget.
+
+    The system prompt and the current query are always sent in full; the
+    remaining budget is filled with the most recent turns, each capped at
+    max_turn_tokens so one verbose reply cannot crowd out the rest.
+    """
+    def __init__(self, budget=DEFAULT_BUDGET, max_turn_tokens=DEFAULT_MAX_TURN_TOKENS):
+        self.budget = budget
+        self.max_turn_tokens = max_turn_tokens
+
+    @classmethod
+    def from_config(cls, config, model=None):
+        budgets = config.get("context_token_budget", {})
+        if isinstance(budgets, dict):
+            budget = budgets.get(model, budgets.get("default", DEFAULT_BUDGET))
+        else:
+            budget = budgets
+        return cls(budget=budget, max_turn_tokens=config.get("context_max_turn_tokens", DEFAULT_MAX_TURN_TOKENS))
+
+    def build(self, system_prompt, context, query):
+        """Return the chat messages (history followed by the query) that fit the budget."""
+        remaining = self.budget - estimate_tokens(system_prompt) - estimate_tokens(query)
+        packed = []
+        for past in reversed(context or []):
+            turn = []
+            for role, key in (("user", "user"), ("assistant", "ai")):
+                content = past.get(key)
+                if content:
+                    turn.append({"role": role, "content": truncate_to_tokens(content, self.max_turn_tokens)})
+            if not turn:
+                continue
+            cost = sum(estimate_tokens(message["content"]) for message in turn)
+            if cost > remaining:
+                break
+            remaining -= cost
+            packed[:0] = turn
+        return packed + [{"role": "user", "content": query}]
@@ -0,0 +1,144 @@
+import math
+import re
+from collections import Counter, defaultdict
+from core.keyword_router import KeywordRouter
+from utils.logger import get_logger
+logger = get_logger("intent_router")
+
+DEFAULT_THRESHOLD = 0.45
+DEFAULT_MARGIN = 0.1
+# Score at which a command is as good as one of the plugin's own examples
+DEFAULT_EXAMPLE_MATCH = 0.8
+
+# Function words carry no intent and would otherwise match across plugins
+STOPWORDS = frozenset(
+    "a an the to of in on at for with and or is are be me my i you your it this that "
+    "what whats how about please can could would will do does some "
+    "tell make show give get want need like today".split()
+)
+
+
+class IntentRouter:
+    """
+    Local intent classifier over plugin example phrases.
+
+    Texts are embedded as TF-IDF weighted character n-grams of their content
+    words (word-boundary padded, so "weather in paris" and "weather in
+    london" share most features) and matched to the nearest example by
+    cosine similarity. A plugin is only returned when the best score clears `threshold` and
+    beats the best competing plugin by `margin`.
+
+    Broad examples ("look up the capital of peru") still score general
+    questions highly, so given the plugins' `keywords`, a command scoring
+    below `example_match` must also name the winning plugin's keywords and
+    no other plugin's: "tell me about python" and "check weather and list
+    todos" are left to the LLM.
+    """
+    def __init__(self, examples, threshold=DEFAULT_THRESHOLD, margin=DEFAULT_MARGIN, ngram_range=(3, 5),
+                 keywords=None, example_match=DEFAULT_EXAMPLE_MATCH):
+        self.threshold = threshold
+        self.margin = margin
+        self.ngram_range = ngram_range
+        self.example_match = example_match
+        keywords = {label: words for label, words in (keywords or {}).items() if words}
+        self._keyword_router = KeywordRouter(keywords) if keywords else None
+        self._keyworded = set(keywords)
+        self._labels = []
+        self._index = defaultdict(list)  # n-gram -> [(example_id, weight)]
+        self._idf = {}
+        self._fit(examples)
+
+    @classmethod
+    def from_plugins(cls, modules, config=None):
+        """Build a router from the EXAMPLES list each plugin module declares."""
+        return cls.from_manifests(
+            {name: {"examples": getattr(module, "EXAMPLES", [])} for name, module in modules.items()},
+            config,
+        )
+
+    @classmethod
+    def from_manifests(cls, manifests, config=None):
+        """Build a router from plugin manifests (see core.plugin_manifest), without importing plugins."""
+        config = config or {}
+        examples = {name: list(manifest.get("examples", [])) for name, manifest in manifests.items()}
+        return cls(
+            {name: phrases for name, phrases in examples.items() if phrases},
+            threshold=config.get("intent_router_threshold", DEFAULT_THRESHOLD),
+            margin=config.get("intent_router_margin", DEFAULT_MARGIN),
+            keywords={name: manifest.get("keywords", []) for name, manifest in manifests.items()},
+            example_match=config.get("intent_router_example_match", DEFAULT_EXAMPLE_MATCH),
+        )
+
+    def _ngrams(self, text):
+        words = [w for w in re.sub(r"[^\w\s]", "", text.lower()).split() if w not in STOPWORDS]
+        text = " " + " ".join(words) + " "
+        low, high = self.ngram_range
+        return Counter(
+            text[i:i + n]
+            for n in range(low, high + 1)
+            for i in range(len(text) - n + 1)
+        )
+
+    def _fit(self, examples):
+        documents = []
+        for label, phrases in examples.items():
+            for phrase in phrases:
+                self._labels.append(label)
+                documents.append(self._ngrams(phrase))
+
+        df = Counter()
+        for grams in documents:
+            df.update(grams.keys())
+        total = len(documents)
+        self._idf = {gram: math.log((1 + total) / (1 + count)) + 1 for gram, count in df.items()}
+
+        for example_id, grams in enumerate(documents):
+            for gram, weight in self._weigh(grams).items():
+                self._index[gram].append((example_id, weight))
+        logger.info(f"Intent router indexed {total} examples for {len(examples)} plugins")
+
+    def _weigh(self, grams):
+        # Unseen n-grams get unit weight so unrelated words dilute the match
+        # without drowning out free-form arguments such as city names
+        weights = {
+            gram: (1 + math.log(count)) * self._idf.get(gram, 1.0)
+            for gram, count in grams.items()
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {gram: w / norm for gram, w in weights.items()}
+
+    def scores(self, text):
+        """Best cosine similarity per plugin for the given text."""
+        similarity = defaultdict(float)
+        for gram, weight in self._weigh(self._ngrams(text)).items():
+            for example_id, example_weight in self._index.get(gram, ()):
+                similarity[example_id] += weight * example_weight
+
+        best = {}
+        for example_id, score in similarity.items():
+            label = self._labels[example_id]
+            if score > best.get(label, 0.0):
+                best[label] = score
+        return best
+
+    def _anchored(self, label, text):
+        """True if text names label's keywords (when it declares any) and no other plugin's."""
+        if self._keyword_router is None:
+            return True
+        named = {plugin for plugin, _ in self._keyword_router.rank(text)}
+        if label in self._keyworded and label not in named:
+            return False
+        return named <= {label}
+
+    def classify(self, text):
+        """Return (plugin_name, confidence); plugin_name is None when not confident."""
+        ranked = sorted(self.scores(text).items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return None, 0.0
+        label, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if score < self.threshold or score - runner_up < self.margin:
+            return None, score
+        if score < self.example_match and not self._anchored(label, text):
+            return None, score
+        return label, score
@@ -0,0 +1,58 @@
+import re
+from collections import defaultdict
+from utils.logger import get_logger
+logger = get_logger("keyword_router")
+
+
+def _tokens(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+class KeywordRouter:
+    """
+    Token index over the KEYWORDS each plugin declares.
+
+    Keywords (single words or phrases) are indexed by their first token, so
+    a command is matched in one left-to-right pass over its tokens; a token
+    missing from the index is retried without a plural "s". Whole tokens
+    are compared, so "play" no longer fires on "display". Plugins are ranked
+    by how many keyword tokens matched, then by the earliest match.
+    """
+    def __init__(self, keywords):
+        self._index = defaultdict(list)  # first token -> [(phrase tokens, plugin)]
+        for plugin, phrases in keywords.items():
+            for phrase in phrases:
+                tokens = tuple(_tokens(phrase))
+                if tokens:
+                    self._index[tokens[0]].append((tokens, plugin))
+        # Longest phrase first, so a phrase is tried before its first word alone
+        for entries in self._index.values():
+            entries.sort(key=lambda entry: -len(entry[0]))
+        logger.info(f"Keyword router indexed {sum(map(len, self._index.values()))} keywords for {len(keywords)} plugins")
+
+    @classmethod
+    def from_manifests(cls, manifests):
+        return cls({name: manifest.get("keywords", []) for name, manifest in manifests.items()})
+
+    def _lookup(self, token):
+        if token in self._index:
+            return self._index[token]
+        if token.endswith("s"):
+            return self._index.get(token[:-1], ())
+        return ()
+
+    def rank(self, command):
+        """[(plugin, score)] for every plugin whose keywords appear in command, best first."""
+        tokens = _tokens(command)
+        scores = defaultdict(int)
+        first_seen = {}
+        for position, token in enumerate(tokens):
+            longest = 0
+            for phrase, plugin in self._lookup(token):
+                if len(phrase) < longest:
+                    break  # only the longest phrase matching here counts
+                if tuple(tokens[position + 1:position + len(phrase)]) == phrase[1:]:
+                    scores[plugin] += len(phrase)
+                    first_seen.setdefault(plugin, position)
+                    longest = len(phrase)
+        return sorted(scores.items(), key=lambda item: (-item[1], first_seen[item[0]]))
@@ -0,0 +1,120 @@
+import os
+import asyncio
+import threading
+import weakref
+import httpx
+import ollama
+import openai
+import anthropic
+from utils.logger import get_logger
+logger = get_logger("llm_clients")
+
+
+class ClientRegistry:
+    """
+    Process-wide pool of LLM provider clients.
+
+    Every component asks the registry instead of constructing its own client,
+    so each provider gets one keep-alive HTTP connection pool per process.
+    Sync clients are shared across threads; async clients are shared per
+    event loop, since their connection pools cannot cross loops.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync = {}
+        self._async = weakref.WeakKeyDictionary()
+
+    # ──────────────────────────────
+    # Public API
+    # ──────────────────────────────
+
+    def get_client(self, provider, config):
+        """Return the shared synchronous client for a provider."""
+        key = self._key(provider, config)
+        with self._lock:
+            client = self._sync.get(key)
+            if client is None:
+                client = self._build(provider, config, asynchronous=False)
+                self._sync[key] = client
+                logger.info(f"Created pooled {provider} client")
+            return client
+
+    def get_async_client(self, provider, config):
+        """Return the shared async client for a provider on the running event loop."""
+        loop = asyncio.get_running_loop()
+        key = self._key(provider, config)
+        with self._lock:
+            clients = self._async.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = self._build(provider, config, asynchronous=True)
+                clients[key] = client
+                logger.info(f"Created pooled async {provider} client")
+            return client
+
+    def reset(self):
+        """Forget every pooled client, closing the synchronous ones."""
+        with self._lock:
+            sync_clients = list(self._sync.values())
+            self._sync.clear()
+            self._async = weakref.WeakKeyDictionary()
+        for client in sync_clients:
+            close = getattr(client, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    logger.debug(f"Error closing client: {e}")
+
+    # ──────────────────────────────
+    # Internal Helpers
+    # ──────────────────────────────
+
+    @staticmethod
+    def _key(provider, config):
+        if provider == "claude":
+            return provider, config.get("anthropic_api_key") or os.getenv("ANTHROPIC_API_KEY")
+        if provider == "openai":
+            return provider, config.get("openai_api_key") or os.getenv("OPENAI_API_KEY")
+        return "ollama", config.get("ollama_host")
+
+    @staticmethod
+    def _limits(config):
+        return httpx.Limits(
+            max_connections=config.get("llm_pool_size", 10),
+            max_keepalive_connections=config.get("llm_pool_size", 10),
+            keepalive_expiry=config.get("llm_keepalive_seconds", 300),
+        )
+
+    def _build(self, provider, config, asynchronous):
+        limits = self._limits(config)
+        timeout = config.get("llm_timeout", 120)
+        http_client = httpx.AsyncClient if asynchronous else httpx.Client
+
+        if provider == "claude":
+            factory = anthropic.AsyncAnthropic if asynchronous else anthropic.Anthropic
+            return factory(
+                api_key=config.get("anthropic_api_key") or os.getenv("ANTHROPIC_API_KEY"),
+                http_client=http_client(limits=limits, timeout=timeout),
+            )
+        if provider == "openai":
+            factory = openai.AsyncOpenAI if asynchronous else openai.OpenAI
+            return factory(
+                api_key=config.get("openai_api_key") or os.getenv("OPENAI_API_KEY"),
+                http_client=http_client(limits=limits, timeout=timeout),
+            )
+
+        # Ollama passes extra keyword arguments straight to its httpx client
+        factory = ollama.AsyncClient if asynchronous else ollama.Client
+        return factory(host=config.get("ollama_host"), limits=limits, timeout=timeout)
+
+
+registry = ClientRegistry()
+
+
+def get_client(provider, config):
+    return registry.get_client(provider, config)
+
+
+def get_async_client(provider, config):
+    return registry.get_async_client(provider, config)
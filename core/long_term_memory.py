@@ -0,0 +1,179 @@
+import json
+import os
+import re
+import threading
+import zlib
+from core.file_lock import FileLock
+from utils.logger import get_logger
+logger = get_logger("long_term_memory")
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Long-term memory is disabled without NumPy
+
+LONG_TERM_DIR = "data/long_term"
+DEFAULT_DIM = 128  # 100k turns = 50 MB of float32, one BLAS pass per recall
+DEFAULT_TOP_K = 3
+DEFAULT_MIN_SCORE = 0.2
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingVectorizer:
+    """
+    Offline text embedding: words and word bigrams hashed into a fixed
+    number of signed buckets, L2-normalised so a dot product is a cosine.
+    """
+    def __init__(self, dim=DEFAULT_DIM):
+        self.dim = dim
+
+    def _features(self, text):
+        words = _WORD_RE.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def transform(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class LongTermMemory:
+    """
+    Every conversation turn, embedded and kept on disk.
+
+    Vectors are appended as raw float32 rows to vectors.f32 and the turns to
+    turns.jsonl, so storing a turn never rewrites earlier data. Both appends
+    happen under one inter-process lock, so rows stay paired when several
+    processes share the directory. The matrix is held in RAM (grown by
+    doubling) and recall is a single matrix-vector product followed by a
+    partial sort for the top k.
+    """
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, path=LONG_TERM_DIR, dim=DEFAULT_DIM, top_k=DEFAULT_TOP_K, min_score=DEFAULT_MIN_SCORE):
+        self.path = path
+        self.dim = dim
+        self.top_k = top_k
+        self.min_score = min_score
+        self.vectorizer = HashingVectorizer(dim)
+        self._vectors_file = os.path.join(path, "vectors.f32")
+        self._turns_file = os.path.join(path, "turns.jsonl")
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(os.path.join(path, "turns.lock"))
+        self._matrix = np.zeros((1024, dim), dtype=np.float32)
+        self._turns = []
+        self._load()
+
+    @classmethod
+    def for_path(cls, path=LONG_TERM_DIR, dim=DEFAULT_DIM, top_k=DEFAULT_TOP_K, min_score=DEFAULT_MIN_SCORE):
+        """One index per directory in the process, shared by every brain that uses it."""
+        key = os.path.abspath(path)
+        with cls._stores_lock:
+            if key not in cls._stores:
+                cls._stores[key] = cls(path, dim, top_k, min_score)
+            return cls._stores[key]
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the store when enabled in config; None when disabled or NumPy is missing."""
+        if not config.get("long_term_memory_enabled", False):
+            return None
+        if np is None:
+            logger.warning("NumPy is not installed; long-term memory disabled")
+            return None
+        return cls.for_path(
+            path=config.get("long_term_memory_path", LONG_TERM_DIR),
+            dim=config.get("long_term_memory_dim", DEFAULT_DIM),
+            top_k=config.get("long_term_memory_top_k", DEFAULT_TOP_K),
+            min_score=config.get("long_term_memory_min_score", DEFAULT_MIN_SCORE),
+        )
+
+    def __len__(self):
+        return len(self._turns)
+
+    def _load(self):
+        os.makedirs(self.path, exist_ok=True)
+        with self._file_lock:
+            self._read()
+
+    def _read(self):
+        torn = False
+        if os.path.exists(self._turns_file):
+            with open(self._turns_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._turns.append(json.loads(line))
+                    except ValueError:
+                        torn = True  # partial last line from an interrupted write
+                        break
+        vectors = np.zeros((0, self.dim), dtype=np.float32)
+        if os.path.exists(self._vectors_file):
+            vectors = np.fromfile(self._vectors_file, dtype=np.float32)
+            vectors = vectors[:len(vectors) // self.dim * self.dim].reshape(-1, self.dim)
+
+        # Both files are appended in the same order; keep only rows present in both
+        count = min(len(self._turns), len(vectors))
+        if torn or count != len(self._turns) or count != len(vectors):
+            logger.warning(f"Long-term memory files out of step, keeping {count} turns")
+            self._turns = self._turns[:count]
+            self._rewrite(vectors[:count])
+        self._grow(count)
+        self._matrix[:count] = vectors[:count]
+        logger.info(f"Loaded {count} long-term memories from {self.path}")
+
+    def _rewrite(self, vectors):
+        vectors.astype(np.float32).tofile(self._vectors_file)
+        with open(self._turns_file, "w", encoding="utf-8") as f:
+            for turn in self._turns:
+                f.write(json.dumps(turn) + "\n")
+
+    def _grow(self, needed):
+        capacity = len(self._matrix)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[:len(self._matrix)] = self._matrix
+        self._matrix = matrix
+
+    def add(self, user_input, ai_response, timestamp=None):
+        """Embed and store one turn."""
+        turn = {"timestamp": timestamp, "user": user_input, "ai": ai_response}
+        vector = self.vectorizer.transform(f"{user_input}\n{ai_response}")
+        with self._lock:
+            self._grow(len(self._turns) + 1)
+            self._matrix[len(self._turns)] = vector
+            self._turns.append(turn)
+            with self._file_lock:
+                with open(self._vectors_file, "ab") as f:
+                    f.write(vector.tobytes())
+                with open(self._turns_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(turn) + "\n")
+
+    def recall(self, query, k=None, exclude=()):
+        """Return up to k past turns most similar to query, best first."""
+        k = k or self.top_k
+        vector = self.vectorizer.transform(query)
+        with self._lock:
+            count = len(self._turns)
+            if not count:
+                return []
+            scores = self._matrix[:count] @ vector
+            turns = self._turns  # append-only, so the first `count` entries stay put
+        candidates = min(count, k + len(exclude))
+        top = np.argpartition(scores, count - candidates)[count - candidates:]
+        results = []
+        for index in top[np.argsort(-scores[top])]:
+            turn = turns[index]
+            if scores[index] < self.min_score or turn.get("timestamp") in exclude:
+                continue
+            results.append(dict(turn, score=float(scores[index])))
+            if len(results) == k:
+                break
+        return results
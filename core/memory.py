@@ -1,56 +1,259 @@
+import atexit
 import json
 import os
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional
 from utils.logger import get_logger
+from utils.config_loader import load_config
+from core.memory_journal import JournalStore, DEFAULT_COMPACT_EVERY
+from core.memory_sqlite import SQLiteStore
 logger = get_logger("memory")
 
+# Defaults for the memory settings, which are read from config.json when a
+# store or view is created rather than at import time:
+# Number of interactions kept in memory["context"] ("memory_limit")
+DEFAULT_MEMORY_LIMIT = 20
+# Seconds dirty memory may wait before it is written, 0 writes immediately ("memory_flush_delay")
+DEFAULT_FLUSH_DELAY = 1.0
+# "memory_backend" is "json" (memory.json + journal) or "sqlite" ("memory_db_path")
+DEFAULT_BACKEND = "json"
+DEFAULT_DB_PATH = "data/memory.db"
+MEMORY_FILE = "data/memory.json"
+
+
+def memory_limit(config=None):
+    """The configured number of interactions kept in memory["context"]."""
+    config = config if config is not None else load_config()
+    return config.get("memory_limit", DEFAULT_MEMORY_LIMIT)
+
+
+def _open_store(path, config):
+    """Store for the configured backend, creating the default memory if none exists yet."""
+    journal = JournalStore.for_path(path, config.get("memory_compact_every", DEFAULT_COMPACT_EVERY))
+    if config.get("memory_backend", DEFAULT_BACKEND) == "sqlite":
+        db_path = config.get("memory_db_path", DEFAULT_DB_PATH)
+        store = SQLiteStore.for_path(db_path)
+        if not store.exists() and journal.exists():
+            store.reset(journal.load())
+            logger.info(f"Imported {path} into {db_path}")
+    else:
+        store = journal
+    if not store.exists():
+        store.reset({
+            "context": [],
+            "preferences": {
+                "audio_device_index": 0
+            }
+        })
+        logger.info(f"Created new memory store for {path}")
+    return store
+
+
+def _fingerprint(memory):
+    # list() takes the items atomically; other threads may be adding keys
+    return {key: json.dumps(value, sort_keys=True) for key, value in list(memory.items())}
+
+
+def _turn_key(turn):
+    return turn.get("timestamp"), turn.get("user"), turn.get("ai")
+
+
+def _merge_turns(context, turns, limit):
+    """Add turns missing from context, keep it in timestamp order and trimmed to limit."""
+    known = {_turn_key(turn) for turn in context}
+    merged = context + [turn for turn in turns if _turn_key(turn) not in known]
+    merged.sort(key=lambda turn: turn.get("timestamp") or "")
+    return merged[-limit:]
+
+
+class MemoryService:
+    """
+    The one in-process copy of memory, shared by every MemoryManager and
+    Memory view (shell, voice thread, plugins).
+
+    State is read from the store once and then lives in RAM. Changes are
+    written behind: the first one arms a timer, everything that happens
+    before it fires is flushed together, and whatever is still dirty is
+    flushed at interpreter exit. A flush journals new turns plus the
+    top-level keys whose contents changed.
+
+    Other processes may write the same store. Before each flush (and when a
+    view is created) their changes are merged in: their turns are added to
+    the context, and keys this process has not changed take their value.
+    For a key both sides changed, the last writer wins.
+    """
+    _services = {}
+    _services_lock = threading.Lock()
+
+    def __init__(self, store, flush_delay=DEFAULT_FLUSH_DELAY, limit=DEFAULT_MEMORY_LIMIT):
+        self.store = store
+        self.flush_delay = flush_delay
+        # Context length for turns merged in from a rewritten store
+        self.limit = limit
+        self._lock = threading.RLock()
+        self._timer = None
+        self._dirty = False
+        self._turns = []
+        self.memory = store.load()
+        # Ensure required keys exist
+        self.memory.setdefault("context", [])
+        self.memory.setdefault("preferences", {}).setdefault("audio_device_index", 0)
+        self._persisted = _fingerprint(self.memory)
+        self._persisted_context = list(self.memory["context"])
+        atexit.register(self.flush)
+
+    @classmethod
+    def for_path(cls, path):
+        key = os.path.abspath(path)
+        with cls._services_lock:
+            if key not in cls._services:
+                config = load_config()
+                cls._services[key] = cls(
+                    _open_store(path, config),
+                    flush_delay=config.get("memory_flush_delay", DEFAULT_FLUSH_DELAY),
+                    limit=memory_limit(config),
+                )
+            return cls._services[key]
+
+    def record_turn(self, entry, limit):
+        with self._lock:
+            context = self.memory.setdefault("context", [])
+            context.append(entry)
+            del context[:-limit]
+            self._turns.append({"op": "turn", "entry": entry, "limit": limit})
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        with self._lock:
+            self._dirty = True
+            if self.flush_delay <= 0:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _changed_locally(self, key):
+        if key not in self.memory:
+            return key in self._persisted
+        return self._persisted.get(key) != json.dumps(self.memory[key], sort_keys=True)
+
+    def _take(self, key, value):
+        """Adopt another process's value for key."""
+        if value is None:
+            self.memory.pop(key, None)
+            self._persisted.pop(key, None)
+        else:
+            self.memory[key] = value
+            self._persisted[key] = json.dumps(value, sort_keys=True)
+        if key == "context":
+            self._persisted_context = list(value or [])
+
+    def refresh(self):
+        """Merge in whatever other processes wrote since the last look."""
+        with self._lock:
+            entries, stale = self.store.poll()
+            if stale:
+                fresh = self.store.load()
+                for key in (self.memory.keys() | fresh.keys()) - {"context"}:
+                    if not self._changed_locally(key):
+                        self._take(key, fresh.get(key))
+                entries = [{"op": "turn", "entry": turn, "limit": self.limit} for turn in fresh.get("context", [])]
+            for entry in entries:
+                if entry.get("op") == "turn":
+                    limit = entry.get("limit") or self.limit
+                    self.memory["context"] = _merge_turns(self.memory.get("context", []), [entry["entry"]], limit)
+                    self._persisted_context = _merge_turns(self._persisted_context, [entry["entry"]], limit)
+                elif not self._changed_locally(entry["key"]):
+                    self._take(entry["key"], entry.get("value") if entry.get("op") == "set" else None)
+            if entries:
+                self._persisted["context"] = json.dumps(self._persisted_context, sort_keys=True)
+
+    def _context_ops(self):
+        """Turn entries for context changes that are plain appends; None if it was rewritten."""
+        current = self.memory.get("context", [])
+        previous = [_turn_key(turn) for turn in self._persisted_context]
+        present = {_turn_key(turn) for turn in current}
+        kept = [key for key in previous if key in present]
+        # Only trimming from the front keeps the journal able to replay it
+        if kept != previous[len(previous) - len(kept):]:
+            return None
+        known = set(kept)
+        added = [turn for turn in current if _turn_key(turn) not in known]
+        if not added and len(kept) != len(previous):
+            return None  # trimmed without appending; replaying nothing would not trim
+        return [{"op": "turn", "entry": turn, "limit": len(current)} for turn in added]
+
+    def flush(self):
+        """Write everything changed since the last flush."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self.refresh()
+            for op in self._turns:
+                if _turn_key(op["entry"]) in {_turn_key(turn) for turn in self._persisted_context}:
+                    continue
+                self.store.append(op)
+                self._persisted_context = _merge_turns(self._persisted_context, [op["entry"]], op["limit"])
+            self._turns = []
+
+            context_ops = self._context_ops()
+            if context_ops is None:
+                self.store.append({"op": "set", "key": "context", "value": self.memory.get("context", [])})
+            else:
+                for op in context_ops:
+                    self.store.append(op)
+
+            current = _fingerprint(self.memory)
+            for key, dumped in current.items():
+                if key != "context" and self._persisted.get(key) != dumped:
+                    self.store.append({"op": "set", "key": key, "value": self.memory[key]})
+            for key in self._persisted.keys() - current.keys():
+                self.store.append({"op": "delete", "key": key})
+            self._persisted = current
+            self._persisted_context = list(self.memory.get("context", []))
+            self._dirty = False
+        logger.debug(f"Flushed memory to {self.store.__class__.__name__}")
+
+    def replace(self, memory_data):
+        """Make memory_data the shared state (in place, so existing views see it)."""
+        with self._lock:
+            if memory_data is not self.memory:
+                snapshot = dict(memory_data)
+                self.memory.clear()
+                self.memory.update(snapshot)
+        self.mark_dirty()
+
+
 class MemoryManager:
     """Enhanced memory management with advanced features"""
-    def __init__(self, max_context_length: int = 20):
-        self.MEMORY_FILE = "data/memory.json"
-        self.max_context_length = max_context_length
+    def __init__(self, max_context_length: Optional[int] = None):
+        self.MEMORY_FILE = MEMORY_FILE
+        self.service = MemoryService.for_path(self.MEMORY_FILE)
+        self.max_context_length = max_context_length or self.service.limit
+        self.service.refresh()
+        self.store = self.service.store
         self.memory = self._load()
 
     def _load(self) -> Dict:
-        """Load memory from file or create new if doesn't exist"""
-        if not os.path.exists(self.MEMORY_FILE):
-            os.makedirs(os.path.dirname(self.MEMORY_FILE), exist_ok=True)
-            with open(self.MEMORY_FILE, "w") as f:
-                json.dump({
-                    "context": [],
-                    "preferences": {
-                        "audio_device_index": 0
-                    }
-                }, f)
-            logger.info(f"Created new memory file at {self.MEMORY_FILE}")
-
-        with open(self.MEMORY_FILE, "r") as f:
-            memory = json.load(f)
-            # Ensure required keys exist
-            if "context" not in memory:
-                memory["context"] = []
-            if "preferences" not in memory:
-                memory["preferences"] = {"audio_device_index": 0}
-            elif "audio_device_index" not in memory["preferences"]:
-                memory["preferences"]["audio_device_index"] = 0
-            return memory
+        """The shared in-process memory (read from disk once per process)"""
+        return self.service.memory
 
     def save(self) -> None:
-        """Save memory to file"""
-        with open(self.MEMORY_FILE, "w") as f:
-            json.dump(self.memory, f, indent=2)
-        logger.info(f"Saved memory to {self.MEMORY_FILE}")
+        """Queue the changes for the next write-behind flush"""
+        self.service.mark_dirty()
 
     def update_context(self, user_input: str, ai_response: str) -> None:
         """Update memory with new interaction"""
-        self.memory["context"].append({
+        self.service.record_turn({
             "timestamp": datetime.now().isoformat(),
             "user": user_input,
             "ai": ai_response
-        })
-        self._trim_context()
-        self.save()
+        }, self.max_context_length)
 
     def _trim_context(self) -> None:
         """Keep only recent interactions based on max_context_length"""
@@ -61,6 +264,16 @@ class MemoryManager:
         context = self.memory.get("context", [])
         return context[-n:] if n else context
 
+    def search(self, text: str, limit: int = 10) -> List[Dict]:
+        """Past interactions mentioning text (full-text search on the SQLite backend)"""
+        self.service.flush()
+        return self.store.search(text, limit)
+
+    def get_history(self, start: str, end: str) -> List[Dict]:
+        """Interactions with start <= timestamp < end (ISO format)"""
+        self.service.flush()
+        return self.store.between(start, end)
+
     def clear_context(self) -> None:
         """Clear all context memory"""
         self.memory["context"] = []
@@ -69,46 +282,26 @@ class MemoryManager:
 # Legacy implementation for backward compatibility
 class Memory:
     def __init__(self):
-        self.MEMORY_FILE = "data/memory.json"
+        self.MEMORY_FILE = MEMORY_FILE
+        self.service = MemoryService.for_path(self.MEMORY_FILE)
+        self.service.refresh()
         self.memory = self.load()
 
     def load(self):
-        """Load memory from file or create new if doesn't exist"""
-        if not os.path.exists(self.MEMORY_FILE):
-            os.makedirs(os.path.dirname(self.MEMORY_FILE), exist_ok=True)
-            with open(self.MEMORY_FILE, "w") as f:
-                json.dump({
-                    "context": [],
-                    "preferences": {
-                        "audio_device_index": 0
-                    }
-                }, f)
-            logger.info(f"Created new memory file at {self.MEMORY_FILE}")
-
-        with open(self.MEMORY_FILE, "r") as f:
-            memory = json.load(f)
-            if "preferences" not in memory:
-                memory["preferences"] = {"audio_device_index": 0}
-            elif "audio_device_index" not in memory["preferences"]:
-                memory["preferences"]["audio_device_index"] = 0
-            return memory
+        """The shared in-process memory (read from disk once per process)"""
+        return self.service.memory
 
     def save(self):
-        """Save memory to file"""
-        with open(self.MEMORY_FILE, "w") as f:
-            json.dump(self.memory, f, indent=2)
-        logger.info(f"Saved memory to {self.MEMORY_FILE}")
+        """Queue the changes for the next write-behind flush"""
+        self.service.replace(self.memory)
 
     def update(self, user_input, ai_response):
         """Update memory with new interaction"""
-        self.memory["context"].append({
+        self.service.record_turn({
             "timestamp": datetime.now().isoformat(),
             "user": user_input,
             "ai": ai_response
-        })
-        # Keep only last 20 interactions
-        self.memory["context"] = self.memory["context"][-20:]
-        self.save()
+        }, self.service.limit)
 
     def get_context(self):
         """Get the current memory context"""
@@ -123,8 +316,9 @@ def save_memory(memory_data):
     memory = Memory()
     memory.memory = memory_data
     memory.save()
+    memory.service.flush()
 
-def update_memory(memory_data, user_input, ai_response):
+def update_memory(memory_data, user_input, ai_response, limit=None):
     if "context" not in memory_data:
         memory_data["context"] = []
     memory_data["context"].append({
@@ -132,5 +326,5 @@ def update_memory(memory_data, user_input, ai_response):
         "user": user_input,
         "ai": ai_response
     })
-    # Keep only last 20 interactions
-    memory_data["context"] = memory_data["context"][-20:]
+    # Keep only the most recent interactions
+    memory_data["context"] = memory_data["context"][-(limit or memory_limit()):]
@@ -0,0 +1,269 @@
+import json
+import os
+import tempfile
+import threading
+from core.file_lock import FileLock
+from utils.logger import get_logger
+logger = get_logger("memory_journal")
+
+DEFAULT_COMPACT_EVERY = 200
+SEQ_KEY = "_journal_seq"
+
+
+def _replace(path, data):
+    """Atomically replace path with data (bytes) through a uniquely named temp file."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def apply_op(memory, op):
+    """Replay one journal entry onto a memory dict."""
+    kind = op.get("op")
+    if kind == "turn":
+        context = memory.setdefault("context", [])
+        context.append(op["entry"])
+        limit = op.get("limit")
+        if limit:
+            del context[:-limit]
+    elif kind == "set":
+        memory[op["key"]] = op["value"]
+    elif kind == "delete":
+        memory.pop(op["key"], None)
+
+
+class JournalStore:
+    """
+    Snapshot plus append-only JSONL journal for memory.json.
+
+    Each change is one appended line (a new turn, or a top-level key set or
+    deleted), so a write costs the same however large memory.json grows.
+    Every `compact_every` entries a background thread replays the journal
+    into a new snapshot (temp file + atomic rename) and drops the entries it
+    absorbed. Entries carry a sequence number and the snapshot records the
+    last one it contains, so a crash between the two renames never replays an
+    entry twice; a torn last line is discarded on load.
+
+    Several processes may share the files. Appends take a short advisory
+    lock, first reading whatever other processes appended so sequence
+    numbers stay global; those entries are handed out by poll(). Reads never
+    lock: the snapshot only changes by rename and incomplete journal lines
+    are ignored. Only one process compacts at a time.
+    """
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, snapshot_path, compact_every=DEFAULT_COMPACT_EVERY):
+        self.snapshot_path = snapshot_path
+        self.journal_path = os.path.splitext(snapshot_path)[0] + ".journal.jsonl"
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(snapshot_path + ".lock")
+        self._compact_lock = FileLock(snapshot_path + ".compact.lock")
+        self._seq = 0
+        self._offset = 0
+        self._journal_id = None
+        self._unseen = []
+        self._stale = False
+        self._pending = 0
+        self._compactor = None
+
+    @classmethod
+    def for_path(cls, snapshot_path, compact_every=DEFAULT_COMPACT_EVERY):
+        """One store per file in the process, so threads share its position in the journal."""
+        key = os.path.abspath(snapshot_path)
+        with cls._stores_lock:
+            if key not in cls._stores:
+                cls._stores[key] = cls(snapshot_path, compact_every)
+            return cls._stores[key]
+
+    def exists(self):
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    def _journal_identity(self):
+        try:
+            stat = os.stat(self.journal_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return {}, 0
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
+            memory = json.load(f)
+        return memory, memory.pop(SEQ_KEY, 0)
+
+    def _read_journal(self, start=0):
+        """Return (entries, end offset) for the complete lines after `start`."""
+        entries = []
+        offset = start
+        if not os.path.exists(self.journal_path):
+            return entries, offset
+        with open(self.journal_path, "rb") as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn, or still being written by another process
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+                offset += len(line)
+        return entries, offset
+
+    def _write_snapshot(self, memory, seq):
+        _replace(self.snapshot_path, json.dumps(dict(memory, **{SEQ_KEY: seq}), indent=2).encode("utf-8"))
+
+    def load(self):
+        """Snapshot with every newer journal entry applied (lock-free)."""
+        with self._lock:
+            identity = self._journal_identity()
+            memory, snapshot_seq = self._read_snapshot()
+            entries, end = self._read_journal()
+            self._seq = snapshot_seq
+            self._pending = 0
+            for entry in entries:
+                if entry.get("seq", 0) > snapshot_seq:
+                    apply_op(memory, entry)
+                    self._pending += 1
+                self._seq = max(self._seq, entry.get("seq", 0))
+            self._offset = end
+            self._journal_id = identity
+            self._unseen = []
+            self._stale = False
+            return memory
+
+    def _catch_up(self):
+        """Read entries other processes appended since we last looked."""
+        identity = self._journal_identity()
+        if identity != self._journal_id:
+            # Another process compacted: entries may have moved into the snapshot
+            _, snapshot_seq = self._read_snapshot()
+            if snapshot_seq > self._seq:
+                self._stale = True
+                self._seq = snapshot_seq
+            self._journal_id = identity
+            self._offset = 0
+        entries, self._offset = self._read_journal(self._offset)
+        for entry in entries:
+            if entry.get("seq", 0) > self._seq:
+                self._unseen.append(entry)
+                self._seq = entry["seq"]
+
+    def poll(self):
+        """
+        Return (entries, stale): entries other processes appended since the
+        last poll, and whether some were folded into a snapshot unseen (the
+        caller should then reload).
+        """
+        with self._lock:
+            self._catch_up()
+            entries, stale = self._unseen, self._stale
+            self._unseen, self._stale = [], False
+            return entries, stale
+
+    def reset(self, memory):
+        """Replace everything on disk with `memory`."""
+        with self._lock, self._file_lock:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            self._catch_up()
+            self._write_snapshot(memory, self._seq)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._journal_id = None
+            self._offset = 0
+            self._unseen = []
+            self._pending = 0
+
+    def search(self, text, limit=10):
+        """Context turns containing every word of `text`, newest first (linear scan)."""
+        words = text.lower().split()
+        memory, _ = self._read_state()
+        matches = [
+            turn for turn in reversed(memory.get("context", []))
+            if all(word in f"{turn.get('user', '')} {turn.get('ai', '')}".lower() for word in words)
+        ]
+        return matches[:limit]
+
+    def between(self, start, end):
+        """Context turns with start <= timestamp < end (ISO strings), oldest first."""
+        memory, _ = self._read_state()
+        return [turn for turn in memory.get("context", []) if start <= (turn.get("timestamp") or "") < end]
+
+    def _read_state(self):
+        """Current on-disk state without touching this store's journal position."""
+        memory, seq = self._read_snapshot()
+        entries, _ = self._read_journal()
+        for entry in entries:
+            if entry.get("seq", 0) > seq:
+                apply_op(memory, entry)
+        return memory, seq
+
+    def append(self, op):
+        with self._lock, self._file_lock:
+            self._catch_up()
+            if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) > self._offset:
+                # Nobody else is writing while we hold the lock, so this is a torn line
+                logger.warning(f"Discarding torn entry at the end of {self.journal_path}")
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(self._offset)
+            self._seq += 1
+            with open(self.journal_path, "ab") as f:
+                f.write((json.dumps(dict(op, seq=self._seq)) + "\n").encode("utf-8"))
+                self._offset = f.tell()
+            self._journal_id = self._journal_identity()
+            self._pending += 1
+            if self._pending >= self.compact_every:
+                self._start_compaction()
+
+    def _start_compaction(self):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._compact_quietly, name="memory-compactor", daemon=True)
+        self._compactor.start()
+
+    def _compact_quietly(self):
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Memory compaction failed: {e}")
+
+    def compact(self):
+        """Fold the journal into a new snapshot, keeping entries appended meanwhile."""
+        if not self._compact_lock.acquire(blocking=False):
+            return False  # another process is compacting
+        try:
+            identity = self._journal_identity()
+            memory, seq = self._read_snapshot()
+            entries, end = self._read_journal()
+            for entry in entries:
+                if entry.get("seq", 0) > seq:
+                    apply_op(memory, entry)
+                    seq = entry["seq"]
+
+            # Folding happens unlocked; the snapshot is only written if no
+            # reset() or other compaction replaced the journal meanwhile
+            with self._lock, self._file_lock:
+                if self._journal_identity() != identity:
+                    return False
+                self._write_snapshot(memory, seq)
+                tail = b""
+                if identity is not None:
+                    with open(self.journal_path, "rb") as f:
+                        f.seek(end)
+                        tail = f.read()
+                _replace(self.journal_path, tail)
+                self._pending = tail.count(b"\n")
+            logger.info(f"Compacted {len(entries)} journal entries into {self.snapshot_path}")
+            return True
+        finally:
+            self._compact_lock.release()
@@ -0,0 +1,216 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from utils.logger import get_logger
+logger = get_logger("memory_sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT,
+    user TEXT,
+    ai TEXT,
+    in_context INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS turns_timestamp ON turns(timestamp);
+CREATE INDEX IF NOT EXISTS turns_in_context ON turns(in_context) WHERE in_context = 1;
+CREATE TABLE IF NOT EXISTS preferences (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS todos (position INTEGER PRIMARY KEY, task TEXT);
+CREATE TABLE IF NOT EXISTS scheduled_tasks (
+    position INTEGER PRIMARY KEY,
+    name TEXT,
+    time TEXT,
+    last_run TEXT,
+    next_run TEXT
+);
+CREATE INDEX IF NOT EXISTS scheduled_tasks_name ON scheduled_tasks(name);
+CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(user, ai, content='turns', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS turns_fts_insert AFTER INSERT ON turns BEGIN
+    INSERT INTO turns_fts(rowid, user, ai) VALUES (new.id, new.user, new.ai);
+END;
+CREATE TRIGGER IF NOT EXISTS turns_fts_delete AFTER DELETE ON turns BEGIN
+    INSERT INTO turns_fts(turns_fts, rowid, user, ai) VALUES ('delete', old.id, old.user, old.ai);
+END;
+"""
+
+_TASK_FIELDS = ("name", "time", "last_run", "next_run")
+
+
+class SQLiteStore:
+    """
+    SQLite backend for memory.json's contents, same interface as JournalStore.
+
+    Turns, preferences, todos and scheduled tasks get their own tables; any
+    other top-level key is kept as JSON in `kv`. Every turn ever recorded
+    stays in `turns` (the live context is the rows flagged in_context), with
+    an index on timestamp for range queries and an FTS5 index over the
+    user/AI text. The database runs in WAL mode so readers never block the
+    writer.
+    """
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        try:
+            self._conn.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 unavailable, falling back to LIKE search: {e}")
+            self.fts = False
+        self._data_version = self._version()
+
+    @classmethod
+    def for_path(cls, path):
+        key = os.path.abspath(path)
+        with cls._stores_lock:
+            if key not in cls._stores:
+                cls._stores[key] = cls(path)
+            return cls._stores[key]
+
+    def _version(self):
+        # Changes whenever another connection (e.g. another process) commits
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def poll(self):
+        """([], stale): SQLite keeps no journal, so other writers only mark the state stale."""
+        with self._lock:
+            version = self._version()
+            stale, self._data_version = version != self._data_version, version
+            return [], stale
+
+    def exists(self):
+        return self._conn.execute("PRAGMA user_version").fetchone()[0] > 0
+
+    def load(self):
+        with self._lock:
+            conn = self._conn
+            memory = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM kv")}
+            memory["context"] = [
+                {"timestamp": timestamp, "user": user, "ai": ai}
+                for timestamp, user, ai in conn.execute(
+                    "SELECT timestamp, user, ai FROM turns WHERE in_context = 1 ORDER BY id"
+                )
+            ]
+            memory["preferences"] = {
+                key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM preferences")
+            }
+            todos = [task for (task,) in conn.execute("SELECT task FROM todos ORDER BY position")]
+            if todos:
+                memory["todo_list"] = todos
+            tasks = [
+                dict(zip(_TASK_FIELDS, row))
+                for row in conn.execute(f"SELECT {', '.join(_TASK_FIELDS)} FROM scheduled_tasks ORDER BY position")
+            ]
+            if tasks:
+                memory["scheduled_tasks"] = tasks
+            return memory
+
+    def reset(self, memory):
+        with self._lock, self._conn:
+            for table in ("turns", "preferences", "todos", "scheduled_tasks", "kv"):
+                self._conn.execute(f"DELETE FROM {table}")
+            for key, value in memory.items():
+                self._set(key, value)
+            self._conn.execute("PRAGMA user_version = 1")
+
+    def append(self, op):
+        with self._lock, self._conn:
+            kind = op.get("op")
+            if kind == "turn":
+                self._add_turn(op["entry"])
+                if op.get("limit"):
+                    self._trim_context(op["limit"])
+            elif kind == "set":
+                self._set(op["key"], op["value"])
+            elif kind == "delete":
+                self._set(op["key"], None)
+
+    def _add_turn(self, entry):
+        self._conn.execute(
+            "INSERT INTO turns (timestamp, user, ai, in_context) VALUES (?, ?, ?, 1)",
+            (entry.get("timestamp"), entry.get("user"), entry.get("ai")),
+        )
+
+    def _trim_context(self, limit):
+        self._conn.execute(
+            "UPDATE turns SET in_context = 0 WHERE in_context = 1 AND id NOT IN "
+            "(SELECT id FROM turns WHERE in_context = 1 ORDER BY id DESC LIMIT ?)",
+            (limit,),
+        )
+
+    def _set(self, key, value):
+        """Replace one top-level key; None deletes it."""
+        conn = self._conn
+        if key == "context":
+            # History is kept; only the live-context flags change
+            conn.execute("UPDATE turns SET in_context = 0 WHERE in_context = 1")
+            for entry in value or []:
+                marked = conn.execute(
+                    "UPDATE turns SET in_context = 1 WHERE id = (SELECT id FROM turns "
+                    "WHERE timestamp IS ? AND user IS ? AND ai IS ? ORDER BY id DESC LIMIT 1)",
+                    (entry.get("timestamp"), entry.get("user"), entry.get("ai")),
+                ).rowcount
+                if not marked:
+                    self._add_turn(entry)
+        elif key == "preferences":
+            conn.execute("DELETE FROM preferences")
+            conn.executemany(
+                "INSERT INTO preferences (key, value) VALUES (?, ?)",
+                [(k, json.dumps(v)) for k, v in (value or {}).items()],
+            )
+        elif key == "todo_list":
+            conn.execute("DELETE FROM todos")
+            conn.executemany("INSERT INTO todos (position, task) VALUES (?, ?)", enumerate(value or []))
+        elif key == "scheduled_tasks":
+            conn.execute("DELETE FROM scheduled_tasks")
+            conn.executemany(
+                f"INSERT INTO scheduled_tasks (position, {', '.join(_TASK_FIELDS)}) VALUES (?, ?, ?, ?, ?)",
+                [(i, *(task.get(field) for field in _TASK_FIELDS)) for i, task in enumerate(value or [])],
+            )
+        elif value is None:
+            conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+        else:
+            conn.execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def search(self, text, limit=10):
+        """Turns whose user or AI text matches every word of `text`, best match first."""
+        words = re.findall(r"\w+", text)
+        if not words:
+            return []
+        with self._lock:
+            if self.fts:
+                rows = self._conn.execute(
+                    "SELECT t.timestamp, t.user, t.ai FROM turns_fts JOIN turns t ON t.id = turns_fts.rowid "
+                    "WHERE turns_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (" ".join(f'"{word}"' for word in words), limit),
+                ).fetchall()
+            else:
+                clause = " AND ".join("(user LIKE ? OR ai LIKE ?)" for _ in words)
+                params = [f"%{word}%" for word in words for _ in range(2)]
+                rows = self._conn.execute(
+                    f"SELECT timestamp, user, ai FROM turns WHERE {clause} ORDER BY id DESC LIMIT ?",
+                    params + [limit],
+                ).fetchall()
+        return [{"timestamp": timestamp, "user": user, "ai": ai} for timestamp, user, ai in rows]
+
+    def between(self, start, end):
+        """Turns with start <= timestamp < end (ISO strings), oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT timestamp, user, ai FROM turns WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp",
+                (start, end),
+            ).fetchall()
+        return [{"timestamp": timestamp, "user": user, "ai": ai} for timestamp, user, ai in rows]
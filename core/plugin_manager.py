@@ -1,124 +1,471 @@
+import asyncio
 import importlib
 import os
+import queue
+import re
 import sys
+import threading
+import time
 import traceback
+from collections import Counter
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from core.background_loop import background_loop
+from core.intent_router import IntentRouter
+from core.keyword_router import KeywordRouter
+from core.plugin_manifest import discover
+from core.plugin_template import PluginError
+from core.response_cache import ResponseCache, TTLCache
+from utils.config_loader import load_config
 from utils.logger import get_logger
 logger = get_logger("plugin_manager")
 
 PLUGINS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plugins")
+# Skip voice_assistant plugin due to Python 3.14 compatibility issues
+SKIPPED_PLUGINS = {"voice_assistant"}
+MAX_LOAD_WORKERS = 8
+DEFAULT_PLUGIN_TIMEOUT = 30
+DEFAULT_PLUGIN_WORKERS = 4
+DEFAULT_PLUGIN_QUEUE_SIZE = 16
+DEFAULT_CACHE_SIZE = 128
+_MISSING = object()
+
+
+class PluginBusyError(RuntimeError):
+    """The plugin worker queue is full."""
+
+
+def _argv(command):
+    """Positional arguments for run(): an argument list is spread, anything else is passed as is."""
+    return list(command) if isinstance(command, (list, tuple)) else [command]
+
+
+def _add_import_path(root):
+    """Put the project root on sys.path (once) so plugins import as `plugins.<name>`"""
+    root = os.path.abspath(root)
+    if not any(os.path.abspath(entry or os.curdir) == root for entry in sys.path):
+        sys.path.insert(0, root)
+
+
+class LazyPlugins(Mapping):
+    """
+    Plugin modules by name, each imported the first time it is looked up.
+
+    Membership, iteration and len() only consult the manifests, so listing
+    or routing never pays for an import. A plugin that fails to import is
+    remembered and dropped from the mapping instead of being retried.
+    """
+    def __init__(self, manifests):
+        self.manifests = manifests
+        self.modules = {}
+        self.import_times = {}  # name -> seconds spent importing
+        self.failed = {}  # name -> import error
+        self._lock = threading.Lock()
+        self._import_locks = {}
+        _add_import_path(os.path.dirname(PLUGINS_DIR))
+
+    def __getitem__(self, name):
+        module = self.modules.get(name)
+        if module is not None:
+            return module
+        if name not in self:
+            raise KeyError(name)
+        # One lock per plugin, so different plugins can import concurrently
+        with self._lock:
+            import_lock = self._import_locks.setdefault(name, threading.Lock())
+        with import_lock:
+            if name in self.failed:
+                raise KeyError(name)
+            if name not in self.modules:
+                self.modules[name] = self._import(name)
+        return self.modules[name]
+
+    def __contains__(self, name):
+        return name in self.manifests and name not in self.failed
+
+    def __iter__(self):
+        return (name for name in list(self.manifests) if name not in self.failed)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def _import(self, name):
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(f"plugins.{name}")
+        except Exception as e:
+            logger.error(f"Failed to load '{name}': {e}")
+            traceback.print_exc()
+            self.failed[name] = str(e)
+            raise KeyError(name) from e
+        self.import_times[name] = time.perf_counter() - started
+        logger.info(f"Loaded '{name}' in {self.import_times[name] * 1000:.1f} ms")
+        return module
+
+    def load_all(self, workers=None):
+        """
+        Import every plugin now, `workers` at a time (default: one per CPU,
+        at most MAX_LOAD_WORKERS); returns the wall time in seconds.
+        """
+        workers = workers or min(MAX_LOAD_WORKERS, os.cpu_count() or 1)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="plugin-import") as pool:
+            # get() swallows the KeyError of a failed import, so one bad plugin never stops the rest
+            list(pool.map(self.get, list(self)))
+        elapsed = time.perf_counter() - started
+        logger.info(f"Imported {len(self.modules)} plugins in {elapsed * 1000:.1f} ms ({len(self.failed)} failed)")
+        return elapsed
+
+
+class PluginPool:
+    """
+    Bounded worker pool that plugin calls run on, off the shell thread.
+
+    At most `workers` calls run at once and at most `max_queued` more wait;
+    past that submit() refuses rather than let a backlog build up. Workers
+    are daemon threads started on demand, so a plugin stuck in a call that
+    never returns cannot keep JARVIS from exiting.
+    """
+    def __init__(self, workers=DEFAULT_PLUGIN_WORKERS, max_queued=DEFAULT_PLUGIN_QUEUE_SIZE):
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._idle = 0
+        self._unclaimed = 0  # submitted calls no worker has taken yet
+        self.running = 0
+        self.peak_queued = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args):
+        """Future for fn(*args), or None when the queue is full"""
+        future = Future()
+        try:
+            self._queue.put_nowait((future, fn, args))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return None
+        with self._lock:
+            self.peak_queued = max(self.peak_queued, self._queue.qsize())
+            self._unclaimed += 1
+            # An idle worker may be about to take an earlier call; only count
+            # on it for as many calls as there are idle workers
+            if self._unclaimed > self._idle and len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"plugin-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        return future
+
+    def _work(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+            future, fn, args = self._queue.get()
+            with self._lock:
+                self._idle -= 1
+                self._unclaimed -= 1
+            if not future.set_running_or_notify_cancel():
+                continue  # cancelled while queued
+            with self._lock:
+                self.running += 1
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self.running,
+                "queued": self._queue.qsize(),
+                "peak_queued": self.peak_queued,
+                "rejected": self.rejected,
+            }
+
 
 class PluginManager:
     def __init__(self):
-        self.plugins = {}
+        self.manifests = {}
+        self.plugins = LazyPlugins(self.manifests)
+        self.instances = {}
+        self._instances_lock = threading.Lock()
+        self.config = load_config()
+        self.pool = PluginPool(
+            self.config.get("plugin_workers", DEFAULT_PLUGIN_WORKERS),
+            self.config.get("plugin_queue_size", DEFAULT_PLUGIN_QUEUE_SIZE),
+        )
+        self.timeouts = Counter()
+        self.caches = {}
+        self._caches_lock = threading.Lock()
+        self.stale_hits = Counter()
+        self._refreshing = set()
+        self.intent_router = None
+        self.keyword_router = None
         self.load_plugins()
 
     def load_plugins(self):
-        """Dynamically load all plugins from the plugins directory"""
-        # Add plugins directory to Python path temporarily
-        original_sys_path = sys.path.copy()
-        try:
-            sys.path.insert(0, os.path.dirname(PLUGINS_DIR))
-            
-            if not os.path.exists(PLUGINS_DIR):
-                logger.error(f"Plugins directory not found: {PLUGINS_DIR}")
-                return
-            
-            for filename in os.listdir(PLUGINS_DIR):
-                if filename.endswith(".py") and not filename.startswith("__"):
-                    plugin_name = filename[:-3]
-                    # Skip voice_assistant plugin due to Python 3.14 compatibility issues
-                    if plugin_name == 'voice_assistant':
-                        logger.info(f"Skipped '{plugin_name}' (incompatible with Python 3.14)")
-                        continue
-                    try:
-                        module = importlib.import_module(f"plugins.{plugin_name}")
-                        if hasattr(module, "run"):
-                            self.plugins[plugin_name] = module
-                            logger.info(f"Loaded '{plugin_name}'")
-                        else:
-                            logger.warning(f"'{plugin_name}' does not have a run() method")
-                    except Exception as e:
-                        logger.error(f"Failed to load '{plugin_name}': {e}")
-                        traceback.print_exc()
-        finally:
-            # Restore original sys.path
-            sys.path = original_sys_path
+        """
+        Read every plugin's manifest. Modules are imported on first use, or
+        all at once in a thread pool when plugins_eager_load is set.
+        """
+        if not os.path.exists(PLUGINS_DIR):
+            logger.error(f"Plugins directory not found: {PLUGINS_DIR}")
+            return
+        started = time.perf_counter()
+        self.manifests.update(discover(PLUGINS_DIR, skip=SKIPPED_PLUGINS))
+        logger.info(f"Found {len(self.manifests)} plugins in {(time.perf_counter() - started) * 1000:.1f} ms")
+        if self.config.get("plugins_eager_load", False):
+            self.plugins.load_all(self.config.get("plugins_load_workers"))
+
+    def stats(self):
+        """Per-plugin load state (imported, import time, import error), timeout count and cache stats"""
+        stats = {}
+        for name in self.manifests:
+            entry = {"loaded": name in self.plugins.modules}
+            if name in self.plugins.import_times:
+                entry["import_ms"] = round(self.plugins.import_times[name] * 1000, 1)
+            if name in self.plugins.failed:
+                entry["error"] = self.plugins.failed[name]
+            if self.timeouts[name]:
+                entry["timeouts"] = self.timeouts[name]
+            if name in self.caches:
+                entry["cache"] = dict(self.caches[name].stats(), stale=self.stale_hits[name])
+            stats[name] = entry
+        return stats
 
     def list_plugins(self):
         """Return a list of available plugins"""
         return list(self.plugins.keys())
 
-    def execute(self, plugin_name, command):
-        """Run the plugin's main method with a command"""
+    def get_instance(self, plugin_name, module):
+        """
+        The plugin's long-lived PLUGIN_CLASS instance, created and set up on
+        first use; None for plugins that only offer a module-level run().
+        """
+        plugin_class = getattr(module, "PLUGIN_CLASS", None)
+        if not isinstance(plugin_class, type):
+            return None
+        instance = self.instances.get(plugin_name)
+        if instance is not None:
+            return instance
+        with self._instances_lock:
+            if plugin_name not in self.instances:
+                instance = plugin_class()
+                if hasattr(instance, "setup"):
+                    instance.setup()
+                self.instances[plugin_name] = instance
+                logger.info(f"Started '{plugin_name}'")
+            return self.instances[plugin_name]
+
+    def clear_cache(self):
+        """Drop every cached plugin result"""
+        with self._caches_lock:
+            for cache in self.caches.values():
+                cache.clear()
+
+    def shutdown(self):
+        """Tear down every plugin instance, most recently started first"""
+        with self._instances_lock:
+            instances, self.instances = self.instances, {}
+        for plugin_name, instance in reversed(list(instances.items())):
+            try:
+                if hasattr(instance, "teardown"):
+                    instance.teardown()
+            except Exception as e:
+                logger.error(f"Error stopping plugin '{plugin_name}': {e}")
+
+    def get_timeout(self, plugin_name):
+        """Seconds to wait for a plugin: its TIMEOUT, else config plugin_timeout"""
+        timeout = self.manifests.get(plugin_name, {}).get("timeout")
+        return timeout or self.config.get("plugin_timeout", DEFAULT_PLUGIN_TIMEOUT)
+
+    def _run(self, plugin_name, plugin, command):
+        return (self.get_instance(plugin_name, plugin) or plugin).run(*_argv(command))
+
+    @staticmethod
+    def _is_async(plugin):
+        """True if the run() a call would use is an `async def`"""
+        plugin_class = getattr(plugin, "PLUGIN_CLASS", None)
+        owner = plugin_class if isinstance(plugin_class, type) else plugin
+        return asyncio.iscoroutinefunction(getattr(owner, "run", None))
+
+    async def _call(self, plugin_name, plugin, command, timeout):
+        """The plugin's result; raises PluginBusyError, asyncio.TimeoutError or the plugin's own error."""
+        if self._is_async(plugin):
+            target = self.get_instance(plugin_name, plugin) or plugin
+            return await asyncio.wait_for(target.run(*_argv(command)), timeout)
+        future = self.pool.submit(self._run, plugin_name, plugin, command)
+        if future is None:
+            raise PluginBusyError(plugin_name)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            # A queued call is cancelled; a running one cannot be interrupted, so log its late finish
+            future.add_done_callback(
+                lambda done: done.cancelled() or logger.info(f"'{plugin_name}' finished after its {timeout}s deadline")
+            )
+            raise
+
+    def get_cache(self, plugin_name, command):
+        """
+        (cache, key) if this call's result may be cached, else (None, None).
+        Plugins opt in with CACHE_TTL; CACHE_COMMANDS limits caching to
+        read-only subcommands (the first word of the command).
+        """
+        manifest = self.manifests.get(plugin_name, {})
+        if not manifest.get("cache_ttl") or not self.config.get("plugin_cache_enabled", True):
+            return None, None
+        if isinstance(command, (list, tuple)):
+            command = " ".join(map(str, command))
+        key = ResponseCache.normalize(str(command))
+        allowed = manifest.get("cache_commands")
+        if allowed and key.split(" ", 1)[0] not in allowed:
+            return None, None
+        with self._caches_lock:
+            cache = self.caches.get(plugin_name)
+            if cache is None:
+                cache = self.caches[plugin_name] = TTLCache(
+                    max_size=manifest.get("cache_size", DEFAULT_CACHE_SIZE),
+                    ttl=manifest["cache_ttl"],
+                    grace=manifest.get("cache_stale", manifest["cache_ttl"]),
+                )
+        return cache, key
+
+    def _revalidate(self, plugin_name, plugin, command, cache, key):
+        """Refresh a stale cache entry in the background, once per key at a time."""
+        if (plugin_name, key) in self._refreshing:
+            return
+        self._refreshing.add((plugin_name, key))
+
+        async def refresh():
+            try:
+                cache.set(key, await self._call(plugin_name, plugin, command, self.get_timeout(plugin_name)))
+            except Exception as e:
+                logger.warning(f"Refreshing cached '{plugin_name}' result failed: {e!r}")
+            finally:
+                self._refreshing.discard((plugin_name, key))
+
+        asyncio.ensure_future(refresh())
+
+    async def execute_async(self, plugin_name, command):
+        """
+        Run a plugin within its deadline. Plugins with `async def run` are
+        awaited on the event loop; sync ones run on the worker pool. Cached
+        results are returned without calling the plugin; an expired one is
+        still returned during its grace period while a refresh runs.
+        """
         plugin = self.plugins.get(plugin_name)
         if not plugin:
             return f"Plugin '{plugin_name}' not found."
+        cache, key = self.get_cache(plugin_name, command)
+        if cache is not None:
+            result = cache.get(key, _MISSING)
+            if result is not _MISSING:
+                return result
+            result = cache.get_stale(key, _MISSING)
+            if result is not _MISSING:
+                self.stale_hits[plugin_name] += 1
+                self._revalidate(plugin_name, plugin, command, cache, key)
+                return result
+
+        timeout = self.get_timeout(plugin_name)
         try:
-            return plugin.run(command)
+            result = await self._call(plugin_name, plugin, command, timeout)
+        except PluginBusyError:
+            logger.warning(f"Plugin queue full, refused '{plugin_name}'")
+            return f"Too many plugin calls are waiting; try '{plugin_name}' again in a moment."
+        except asyncio.TimeoutError:
+            self.timeouts[plugin_name] += 1
+            logger.warning(f"Plugin '{plugin_name}' timed out after {timeout}s")
+            return f"The {plugin_name} plugin did not answer within {timeout} seconds."
+        except PluginError as e:
+            logger.warning(f"Plugin '{plugin_name}' failed: {e}")
+            return str(e)
         except Exception as e:
             logger.error(f"Error running plugin '{plugin_name}': {e}")
             traceback.print_exc()
             return f"Plugin execution failed: {e}. Check logs for details."
+        if cache is not None:
+            cache.set(key, result)
+        return result
+
+    def execute(self, plugin_name, command):
+        """Run the plugin's main method with a command and block for the result"""
+        return background_loop.run(self.execute_async(plugin_name, command))
 
     def get_plugin_help(self, plugin_name):
         """Return help text if available in the plugin"""
+        manifest = self.manifests.get(plugin_name, {})
+        if manifest.get("help"):
+            return manifest["help"]
         plugin = self.plugins.get(plugin_name)
         if plugin and hasattr(plugin, "help"):
             return plugin.help()
         return f"No help available for '{plugin_name}'."
 
-    def smart_dispatch(self, command):
+    def classify(self, command):
+        """
+        Route a command to a plugin with the local intent classifier.
+        Returns (plugin_name, confidence); plugin_name is None when the
+        router is disabled or not confident enough.
         """
-        Try to infer the correct plugin based on keywords in command.
-        Returns (plugin_name, response) or fallback message.
-        """
-        keywords = {
-            "weather": "weather",
-            "temperature": "weather",
-            "forecast": "weather",
-            "git": "git_helper",
-            "commit": "git_helper",
-            "clone": "git_helper",
-            "push": "git_helper",
-            "pull": "git_helper",
-            "search": "web_search",
-            "google": "web_search",
-            "info": "web_search",
-            "system": "system_control",
-            "shutdown": "system_control",
-            "restart": "system_control",
-            "cpu": "system_control",
-            "ram": "system_control",
-            "kill": "system_control",
-            "tasks": "system_control",
-            "music": "music_player",
-            "play": "music_player", 
-            "pause": "music_player",
-            "spotify": "system_control",
-            "open": "system_control",
-            "reminder": "reminder",
-            "note": "reminder",
-            "todo": "todo_manager",
-            "timer": "timer",
-            "convert": "unit_converter",
-            "units": "unit_converter",
-            "translate": "translator",
-            "language": "translator",
-            "news": "news_fetcher",
-            "joke": "fun_tools",
-            "quote": "fun_tools",
-            "ip": "network_tools",
-            "network": "network_tools",
-            "port": "network_tools",
-            "process": "process_watcher",
-            "monitor": "process_watcher",
-            "calendar": "calendar_tools",
-            "date": "calendar_tools"
-        }
-
-        for keyword, plugin_name in keywords.items():
-            if keyword in command.lower():
-                return plugin_name, self.execute(plugin_name, command)
-
-        return None, "I couldn't find a plugin for that. Try another command."
+        if not self.config.get("intent_router_enabled", True):
+            return None, 0.0
+        return self._intent_router().classify(command)
 
+    def _intent_router(self):
+        if self.intent_router is None:
+            self.intent_router = IntentRouter.from_manifests(self.manifests, self.config)
+        return self.intent_router
+
+    def rank(self, command):
+        """[(plugin_name, score)] for plugins whose declared keywords the command mentions, best first"""
+        if self.keyword_router is None:
+            self.keyword_router = KeywordRouter.from_manifests(self.manifests)
+        return self.keyword_router.rank(command)
+
+    def plugin_args(self, plugin_name, command):
+        """
+        Split a command routed to a plugin into the argument list its
+        run(*args) expects. For a plugin with COMMANDS the arguments start at
+        the first subcommand the command names, so "list my todos" and
+        "show my to do list" reach todo_list as ["list", "my", "todos"] and
+        ["list"]. Otherwise only a leading word naming the plugin (one of its
+        KEYWORDS, or their plural) is dropped: "weather in london" reaches
+        weather as ["in", "london"].
+        """
+        manifest = self.manifests.get(plugin_name, {})
+        words = command.split()
+        commands = {subcommand.lower() for subcommand in manifest.get("commands", [])}
+        for position, word in enumerate(words):
+            if re.sub(r"[^\w]", "", word.lower()) in commands:
+                return words[position:]
+        keywords = {keyword.lower() for keyword in manifest.get("keywords", [])}
+        token = re.sub(r"[^\w]", "", words[0].lower()) if words else ""
+        if token in keywords or (token.endswith("s") and token[:-1] in keywords):
+            return words[1:]
+        return words
+
+    def smart_dispatch(self, command):
+        """
+        Infer the plugin for a command from keywords, without running it.
+        Plugins whose keywords match equally often are told apart by the
+        intent classifier's score, so "search notes for meeting" goes to
+        notes rather than web_search. Returns (plugin_name, None), or
+        (None, fallback message) when no plugin's keywords appear; callers
+        then execute() the plugin once.
+        """
+        ranked = self.rank(command)
+        if not ranked:
+            return None, "I couldn't find a plugin for that. Try another command."
+        tied = [name for name, score in ranked if score == ranked[0][1]]
+        if len(tied) > 1 and self.config.get("intent_router_enabled", True):
+            scores = self._intent_router().scores(command)
+            # max() keeps the earliest match among equal scores
+            return max(tied, key=lambda name: scores.get(name, 0.0)), None
+        return tied[0], None
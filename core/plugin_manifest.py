@@ -0,0 +1,61 @@
+import ast
+import os
+from utils.logger import get_logger
+logger = get_logger("plugin_manifest")
+
+# Module-level constants a plugin may declare, read as literals from its source
+MANIFEST_FIELDS = (
+    "EXAMPLES", "KEYWORDS", "COMMANDS", "HELP", "TIMEOUT",
+    "CACHE_TTL", "CACHE_SIZE", "CACHE_STALE", "CACHE_COMMANDS",
+)
+
+
+def read_manifest(path):
+    """
+    Describe a plugin from its source without importing it.
+
+    Returns a dict with the plugin's name, path, whether it defines a
+    module-level run(), and the MANIFEST_FIELDS it assigns to literals
+    (lower-cased keys). Fields that are missing or not literals are left out.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    manifest = {
+        "name": os.path.splitext(os.path.basename(path))[0],
+        "path": path,
+        "has_run": False,
+    }
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == "run":
+            manifest["has_run"] = True
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            field = node.targets[0].id
+            if field not in MANIFEST_FIELDS:
+                continue
+            try:
+                manifest[field.lower()] = ast.literal_eval(node.value)
+            except ValueError:
+                logger.warning(f"{path}: {field} is not a literal, ignoring it")
+    return manifest
+
+
+def discover(plugins_dir, skip=()):
+    """Manifests for every plugin module in plugins_dir, keyed by name."""
+    manifests = {}
+    for filename in sorted(os.listdir(plugins_dir)):
+        if not filename.endswith(".py") or filename.startswith("__"):
+            continue
+        name = filename[:-3]
+        if name in skip:
+            continue
+        try:
+            manifest = read_manifest(os.path.join(plugins_dir, filename))
+        except (OSError, SyntaxError, UnicodeDecodeError) as e:
+            logger.error(f"Failed to read manifest for '{name}': {e}")
+            continue
+        if not manifest["has_run"]:
+            logger.warning(f"'{name}' does not have a run() method")
+            continue
+        manifests[name] = manifest
+    return manifests
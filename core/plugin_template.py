@@ -1,7 +1,44 @@
-"""Base template for all JARVIS plugins"""
+"""
+Base template for all JARVIS plugins.
+
+A plugin is a module in plugins/ with a module-level run(*args), which gets
+the command's words as arguments (e.g. "add", "buy", "milk").
+
+The plugin manager reads these optional module-level constants as literals
+from the source, without importing the module (see core.plugin_manifest):
+
+    EXAMPLES        phrases the local intent router matches commands against
+    KEYWORDS        words that route a command to the plugin (smart_dispatch)
+    COMMANDS        subcommands run() dispatches on its first argument; the
+                    arguments a routed command passes start at the first one
+    HELP            the plugin's help text
+    TIMEOUT         seconds the manager waits for run() (default: config
+                    "plugin_timeout"); plugins pass it to their own network
+                    calls too, so those do not outlive the deadline
+    CACHE_TTL       seconds a result is reused for the same arguments
+    CACHE_STALE     seconds past CACHE_TTL an expired result is still served
+                    while it is refreshed (default: CACHE_TTL)
+    CACHE_SIZE      results kept per plugin
+    CACHE_COMMANDS  first arguments whose results may be cached (default: all)
+
+PLUGIN_CLASS, when a module sets it, names the class the plugin manager
+instantiates once and keeps for the whole session: setup() is called before
+the first run() and teardown() at shutdown. Without it the module-level
+run() is called for every command.
+"""
 from utils.config_loader import load_config
 import re
 
+
+class PluginError(Exception):
+    """
+    A failure a plugin reports to the user. The plugin manager answers with
+    the message and does not cache it, so the next call tries again (and a
+    cached result that fails to refresh is kept). Plugins that cache their
+    results raise this instead of returning an error string.
+    """
+
+
 class BasePlugin:
     def __init__(self):
         self.config = load_config()
@@ -27,8 +64,14 @@ class BasePlugin:
                 
         return None, command
 
+    def setup(self):
+        """Called once by the plugin manager before the first run(); open clients, sessions, files here"""
+
+    def teardown(self):
+        """Called once by the plugin manager at shutdown; release whatever setup() acquired"""
+
     def run(self, *args, **kwargs):
-        """Main execution method to be overridden"""
+        """Main execution method to be overridden; may be an `async def`"""
         raise NotImplementedError("Plugins must implement run()")
 
     def handle_error(self, error):
@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import time
+from utils.logger import get_logger
+logger = get_logger("provider_chain")
+
+DEFAULT_DEADLINE = 30
+DEFAULT_REPROBE_INTERVAL = 300
+
+
+class AllProvidersFailed(Exception):
+    """Raised when every provider in the chain failed or timed out."""
+
+
+class ProviderStats:
+    """Exponentially weighted latency and success counters for one provider."""
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.latency = None
+        self.successes = 0
+        self.failures = 0
+        self.updated = None  # monotonic time of the last measurement
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok=True):
+        with self._lock:
+            self.updated = time.monotonic()
+            if ok:
+                self.successes += 1
+            else:
+                self.failures += 1
+            if self.latency is None:
+                self.latency = seconds
+            else:
+                self.latency = self.alpha * seconds + (1 - self.alpha) * self.latency
+
+    def start_probe(self):
+        """Forget the average so the next measurement alone decides where the provider ranks."""
+        with self._lock:
+            self.latency = None
+            self.updated = time.monotonic()
+
+    def as_dict(self):
+        return {
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "successes": self.successes,
+            "failures": self.failures,
+        }
+
+
+class ProviderChain:
+    """
+    Ordered list of LLM providers with per-provider deadlines.
+
+    Requests go to the first provider; if it fails or misses its deadline the
+    next one is tried. With hedge_delay set, the next provider is also fired
+    once the current one has been running that long, and whichever answers
+    first wins while the other is cancelled. When adaptive, the order is
+    re-sorted by observed latency (failures count as a full deadline), and a
+    provider that has not been measured for reprobe_interval seconds is tried
+    first once, so a demoted provider that recovered can win its place back.
+    """
+    def __init__(self, providers, deadlines=None, hedge_delay=None, adaptive=True,
+                 reprobe_interval=DEFAULT_REPROBE_INTERVAL):
+        self.providers = list(providers)
+        self.deadlines = deadlines or {}
+        self.hedge_delay = hedge_delay
+        self.adaptive = adaptive
+        self.reprobe_interval = reprobe_interval
+        self.stats = {provider: ProviderStats() for provider in self.providers}
+
+    @classmethod
+    def from_config(cls, config):
+        providers = config.get("provider_chain") or [config.get("use_model", "ollama")]
+        return cls(
+            providers,
+            deadlines=config.get("provider_timeouts", {}),
+            hedge_delay=config.get("hedge_delay"),
+            adaptive=config.get("adaptive_provider_order", True),
+            reprobe_interval=config.get("provider_reprobe_interval", DEFAULT_REPROBE_INTERVAL),
+        )
+
+    def deadline(self, provider):
+        return self.deadlines.get(provider, DEFAULT_DEADLINE)
+
+    def order(self):
+        """Providers in the order they should be tried."""
+        if not self.adaptive:
+            return list(self.providers)
+        # Unmeasured providers sort last but keep their configured order (stable sort)
+        ranked = sorted(
+            self.providers,
+            key=lambda p: self.stats[p].latency if self.stats[p].latency is not None else float("inf"),
+        )
+        if self.reprobe_interval:
+            now = time.monotonic()
+            for provider in ranked[1:]:
+                updated = self.stats[provider].updated
+                if updated is not None and now - updated >= self.reprobe_interval:
+                    # Only this request probes; the next ones rank it by the probe's result
+                    self.stats[provider].start_probe()
+                    ranked.remove(provider)
+                    ranked.insert(0, provider)
+                    break
+        return ranked
+
+    def report(self):
+        return {provider: self.stats[provider].as_dict() for provider in self.providers}
+
+    async def _timed(self, provider, call):
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(call(provider), self.deadline(provider))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.stats[provider].record(max(time.monotonic() - started, self.deadline(provider)), ok=False)
+            raise
+        self.stats[provider].record(time.monotonic() - started)
+        return result
+
+    async def run(self, call):
+        """
+        Await call(provider) across the chain and return (result, provider)
+        from the first provider to succeed.
+        """
+        queue = self.order()
+        pending = {}
+        last_error = None
+
+        def launch():
+            provider = queue.pop(0)
+            pending[asyncio.ensure_future(self._timed(provider, call))] = provider
+
+        launch()
+        try:
+            while pending:
+                hedge = self.hedge_delay if queue and self.hedge_delay else None
+                done, _ = await asyncio.wait(list(pending), timeout=hedge, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"Hedging: {', '.join(pending.values())} slower than {hedge}s, trying {queue[0]}")
+                    launch()
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result(), provider
+                    last_error = task.exception()
+                    logger.warning(f"Provider '{provider}' failed: {last_error!r}")
+                if not pending and queue:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise AllProvidersFailed(f"All providers failed: {last_error!r}")
+
+    async def stream(self, open_stream):
+        """
+        Yield chunks from open_stream(provider), failing over to the next
+        provider while no chunk has been produced yet. The deadline applies
+        to the first chunk; once output has started the stream is committed.
+        """
+        last_error = None
+        for provider in self.order():
+            stream = open_stream(provider)
+            started = time.monotonic()
+            try:
+                first = await asyncio.wait_for(stream.__anext__(), self.deadline(provider))
+            except StopAsyncIteration:
+                self.stats[provider].record(time.monotonic() - started)
+                return
+            except asyncio.CancelledError:
+                await stream.aclose()
+                raise
+            except Exception as e:
+                self.stats[provider].record(max(time.monotonic() - started, self.deadline(provider)), ok=False)
+                logger.warning(f"Provider '{provider}' failed: {e!r}")
+                last_error = e
+                await stream.aclose()
+                continue
+
+            self.stats[provider].record(time.monotonic() - started)
+            try:
+                yield first
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.aclose()
+            return
+        raise AllProvidersFailed(f"All providers failed: {last_error!r}")
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from utils.logger import get_logger
+logger = get_logger("response_cache")
+
+CACHE_FILE = "data/response_cache.db"
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory LRU cache whose entries expire after `ttl` seconds.
+    Expired entries are kept `grace` seconds longer for get_stale().
+    """
+    def __init__(self, max_size=256, ttl=3600, grace=0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.grace = grace
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if self.ttl and age > self.ttl:
+                if age > self.ttl + self.grace:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_stale(self, key, default=None):
+        """An entry past its ttl but within the grace period (not counted as a hit or miss)."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or time.time() - entry[1] > self.ttl + self.grace:
+                return default
+            return entry[0]
+
+    def set(self, key, value, stored_at=None):
+        with self._lock:
+            self._data[key] = (value, stored_at or time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "size": len(self._data),
+        }
+
+
+class ResponseCache:
+    """
+    Two-tier cache for LLM replies: an in-memory LRU in front of a SQLite
+    store under data/ so answers survive restarts.
+    """
+    def __init__(self, path=CACHE_FILE, max_size=256, disk_max_size=5000, ttl=3600):
+        self.path = path
+        self.ttl = ttl
+        self.disk_max_size = disk_max_size
+        self.memory = TTLCache(max_size=max_size, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._lock = threading.Lock()
+        self._db = self._open()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            path=config.get("response_cache_path", CACHE_FILE),
+            max_size=config.get("response_cache_size", 256),
+            disk_max_size=config.get("response_cache_disk_size", 5000),
+            ttl=config.get("response_cache_ttl", 3600),
+        )
+
+    def _open(self):
+        try:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, reply TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses(created)")
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            logger.error(f"Response cache disk tier unavailable: {e}")
+            return None
+
+    @staticmethod
+    def normalize(query):
+        """Case-fold, collapse whitespace and drop trailing punctuation."""
+        query = re.sub(r"\s+", " ", query.casefold()).strip()
+        return query.rstrip("?!. ")
+
+    @classmethod
+    def make_key(cls, query, model, system_prompt, history=None):
+        """Key on normalized query, model, system prompt and a hash of the context sent."""
+        context_hash = hashlib.sha256(
+            json.dumps(history or [], sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        raw = "\x1f".join([cls.normalize(query), model, system_prompt, context_hash])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        reply = self.memory.get(key)
+        if reply is not None:
+            self.hits += 1
+            return reply
+
+        reply = self._disk_get(key)
+        if reply is not None:
+            self.hits += 1
+            self.disk_hits += 1
+            return reply
+
+        self.misses += 1
+        return None
+
+    def set(self, key, reply):
+        now = time.time()
+        self.memory.set(key, reply, stored_at=now)
+        if self._db is None:
+            return
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, reply, created) VALUES (?, ?, ?)",
+                    (key, reply, now),
+                )
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                    (self.disk_max_size,),
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to persist cached response: {e}")
+
+    def _disk_get(self, key):
+        if self._db is None:
+            return None
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT reply, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read cached response: {e}")
+            return None
+        if row is None:
+            return None
+        reply, created = row
+        if self.ttl and time.time() - created > self.ttl:
+            return None
+        # Promote to the memory tier so the next hit skips SQLite
+        self.memory.set(key, reply, stored_at=created)
+        return reply
+
+    def clear(self):
+        self.memory.clear()
+        if self._db is None:
+            return
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "memory_entries": len(self.memory),
+        }
@@ -0,0 +1,61 @@
+import asyncio
+from utils.logger import get_logger
+logger = get_logger("singleflight")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical requests.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still in flight await the same future instead of starting their own.
+    Entries are dropped as soon as the call finishes, so nothing is cached.
+    A call in flight on another event loop cannot be awaited, so it is not joined.
+    """
+    def __init__(self):
+        self._calls = {}
+        self.shared = 0
+
+    def __len__(self):
+        return len(self._calls)
+
+    def pending(self, key):
+        """Future of the call in flight for key on the running loop, or None."""
+        future = self._calls.get(key)
+        if future is None or future.get_loop() is not asyncio.get_event_loop():
+            return None
+        return future
+
+    async def do(self, key, factory):
+        """Await factory() once per key; concurrent callers with the same key share its result."""
+        future = self.pending(key)
+        if future is not None:
+            return await self.join(future)
+        future = asyncio.ensure_future(factory())
+        self._track(key, future)
+        # Shielded so one caller giving up does not cancel the call for the others
+        return await asyncio.shield(future)
+
+    async def join(self, future):
+        """Await a call another caller started."""
+        self.shared += 1
+        logger.debug("Joined an identical request already in flight")
+        return await asyncio.shield(future)
+
+    def lead(self, key):
+        """Register work the caller resolves itself (e.g. a stream) and return its future."""
+        future = asyncio.get_event_loop().create_future()
+        self._track(key, future)
+        return future
+
+    def _track(self, key, future):
+        self._calls[key] = future
+
+        def done(finished):
+            if self._calls.get(key) is finished:
+                del self._calls[key]
+            # Mark failures as retrieved; followers (if any) re-raise them
+            if not finished.cancelled():
+                finished.exception()
+
+        future.add_done_callback(done)
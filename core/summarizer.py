@@ -0,0 +1,82 @@
+import asyncio
+from utils.logger import get_logger
+logger = get_logger("summarizer")
+
+DEFAULT_KEEP_TURNS = 6
+DEFAULT_BATCH = 4
+DEFAULT_MAX_WORDS = 120
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and JARVIS, "
+    "an AI terminal assistant. Merge the new turns into the existing summary. "
+    "Keep names, preferences, decisions and open tasks; drop small talk. "
+    "Reply with the updated summary only, in at most {max_words} words."
+)
+
+
+class Summarizer:
+    """
+    Folds old conversation turns into memory["summary"] in the background.
+
+    Once memory["context"] holds `batch` turns more than `keep_turns`, the
+    oldest ones are summarised together with the existing summary by
+    `complete(system_prompt, text)` and then removed from the context, so the
+    prompt carries a bounded summary plus a few recent raw turns.
+    """
+    def __init__(self, complete, keep_turns=DEFAULT_KEEP_TURNS, batch=DEFAULT_BATCH, max_words=DEFAULT_MAX_WORDS):
+        self.complete = complete
+        self.keep_turns = keep_turns
+        self.batch = batch
+        self.max_words = max_words
+        self._task = None
+
+    @classmethod
+    def from_config(cls, config, complete):
+        if not config.get("summary_enabled", False):
+            return None
+        return cls(
+            complete,
+            keep_turns=config.get("summary_keep_turns", DEFAULT_KEEP_TURNS),
+            batch=config.get("summary_batch", DEFAULT_BATCH),
+            max_words=config.get("summary_max_words", DEFAULT_MAX_WORDS),
+        )
+
+    def schedule(self, memory):
+        """Start a fold on the running loop if one is due; never blocks the caller."""
+        if self._task is not None and not self._task.done():
+            return None
+        if len(memory.get("context", [])) < self.keep_turns + self.batch:
+            return None
+        # Snapshot now: turns added before the task runs stay verbatim
+        self._task = asyncio.ensure_future(self.fold(memory, memory["context"][:-self.keep_turns]))
+        return self._task
+
+    def _prompt(self, summary, turns):
+        lines = []
+        for turn in turns:
+            if turn.get("user"):
+                lines.append(f"User: {turn['user']}")
+            if turn.get("ai"):
+                lines.append(f"JARVIS: {turn['ai']}")
+        return f"Existing summary:\n{summary or '(none)'}\n\nNew turns:\n" + "\n".join(lines)
+
+    async def fold(self, memory, evicted=None):
+        if evicted is None:
+            evicted = memory["context"][:-self.keep_turns]
+        if not evicted:
+            return False
+        try:
+            summary = await self.complete(
+                SUMMARY_PROMPT.format(max_words=self.max_words),
+                self._prompt(memory.get("summary", ""), evicted),
+            )
+        except Exception as e:
+            logger.warning(f"Summarization failed, keeping raw turns: {e}")
+            return False
+
+        # New turns may have arrived meanwhile; drop exactly the ones summarised
+        folded = {id(turn) for turn in evicted}
+        memory["context"] = [turn for turn in memory["context"] if id(turn) not in folded]
+        memory["summary"] = summary.strip()
+        logger.info(f"Folded {len(evicted)} turns into the conversation summary")
+        return True
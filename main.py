@@ -7,6 +7,10 @@ import cmd
 import subprocess
 import threading
 import time
+import json
+from collections import deque
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
 try:
     import readline  # For history and autocomplete (Unix/Linux)
 except ImportError:
@@ -67,6 +71,33 @@ def check_environment():
             print("Then: jarvis_env/bin/pip install -r requirements.txt")
             sys.exit(1)
 
+SHELL_COMMANDS = {
+    # File operations
+    'ls', 'dir', 'cd', 'pwd', 'mkdir', 'rmdir', 'rm', 'cp', 'copy', 'mv', 'move', 'cat', 'type', 'touch', 'ln', 'wc', 'head', 'tail', 'sort', 'uniq', 'diff', 'patch',
+    # Process management
+    'ps', 'tasklist', 'kill', 'taskkill', 'pgrep', 'pkill', 'jobs', 'bg', 'fg', 'nohup', 'top', 'htop',
+    # System info
+    'uname', 'whoami', 'id', 'uptime', 'free', 'vmstat', 'iostat', 'df', 'du', 'w', 'last',
+    # Networking
+    'ping', 'curl', 'wget', 'ssh', 'scp', 'rsync', 'netstat', 'ifconfig', 'ip', 'nslookup', 'dig',
+    # Text processing
+    'grep', 'find', 'sed', 'awk', 'cut', 'paste', 'tr', 'xargs', 'tee',
+    # Archiving
+    'tar', 'gzip', 'gunzip', 'bzip2', 'zip', 'unzip', 'rar', 'unrar',
+    # Package managers
+    'apt', 'apt-get', 'yum', 'dnf', 'pacman', 'brew', 'snap', 'flatpak', 'pip', 'npm', 'yarn', 'gem', 'cargo',
+    # Development
+    'git', 'svn', 'hg', 'gcc', 'g++', 'clang', 'make', 'cmake', 'python', 'python3', 'node', 'java', 'javac', 'gradle', 'maven',
+    # Utilities
+    'echo', 'printf', 'clear', 'cls', 'history', 'alias', 'export', 'set', 'source', 'which', 'whereis', 'locate', 'updatedb', 'chmod', 'chown', 'chgrp', 'sudo', 'su', 'passwd', 'useradd', 'usermod', 'groupadd',
+    # Windows specific
+    'cmd', 'powershell', 'start', 'shutdown', 'restart', 'net', 'reg', 'schtasks'
+}
+
+def is_shell_command(user_input):
+    """True if input starts with a common shell command or uses shell syntax"""
+    return user_input.split()[0] in SHELL_COMMANDS or any(char in user_input for char in ['|', '>', '<', '&', ';'])
+
 class JarvisShell(cmd.Cmd):
     """Custom shell for JARVIS AI Terminal"""
     intro = "Welcome to JARVIS AI Terminal Shell. Type 'help' or '?' for commands.\n"
@@ -115,66 +146,104 @@ class JarvisShell(cmd.Cmd):
         """Process user input through AI brain"""
         logger.info(f"User: {user_input}")
 
-        # Check if it's a shell command (starts with common commands or has shell syntax)
-        shell_commands = [
-            # File operations
-            'ls', 'dir', 'cd', 'pwd', 'mkdir', 'rmdir', 'rm', 'cp', 'copy', 'mv', 'move', 'cat', 'type', 'touch', 'ln', 'wc', 'head', 'tail', 'sort', 'uniq', 'diff', 'patch',
-            # Process management
-            'ps', 'tasklist', 'kill', 'taskkill', 'pgrep', 'pkill', 'jobs', 'bg', 'fg', 'nohup', 'top', 'htop',
-            # System info
-            'uname', 'whoami', 'id', 'uptime', 'free', 'vmstat', 'iostat', 'df', 'du', 'w', 'last',
-            # Networking
-            'ping', 'curl', 'wget', 'ssh', 'scp', 'rsync', 'netstat', 'ifconfig', 'ip', 'nslookup', 'dig',
-            # Text processing
-            'grep', 'find', 'sed', 'awk', 'cut', 'paste', 'tr', 'xargs', 'tee',
-            # Archiving
-            'tar', 'gzip', 'gunzip', 'bzip2', 'zip', 'unzip', 'rar', 'unrar',
-            # Package managers
-            'apt', 'apt-get', 'yum', 'dnf', 'pacman', 'brew', 'snap', 'flatpak', 'pip', 'npm', 'yarn', 'gem', 'cargo',
-            # Development
-            'git', 'svn', 'hg', 'gcc', 'g++', 'clang', 'make', 'cmake', 'python', 'python3', 'node', 'java', 'javac', 'gradle', 'maven',
-            # Utilities
-            'echo', 'printf', 'clear', 'cls', 'history', 'alias', 'export', 'set', 'source', 'which', 'whereis', 'locate', 'updatedb', 'chmod', 'chown', 'chgrp', 'sudo', 'su', 'passwd', 'useradd', 'usermod', 'groupadd',
-            # Windows specific
-            'cmd', 'powershell', 'start', 'shutdown', 'restart', 'net', 'reg', 'schtasks'
-        ]
-        if user_input.split()[0] in shell_commands or any(char in user_input for char in ['|', '>', '<', '&', ';']):
-            # Execute as shell command
-            try:
-                result = subprocess.run(user_input, shell=True, capture_output=True, text=True, cwd=os.getcwd())
-                output = result.stdout + result.stderr
-                if output:
-                    print(output.strip())
-                    if voice and self.voice:
-                        self.voice.speak(output.strip()[:200])  # Limit speech length
-            except Exception as e:
-                error_msg = f"Command error: {e}"
-                print(error_msg)
+        streamed = config.get("stream_responses", True)
+        ask = self.stream_response if streamed else None
+        route, response = self.route_query(user_input, memory, ask=ask)
+
+        if route == "shell":
+            if response:
+                print(response)
                 if voice and self.voice:
-                    self.voice.speak(error_msg)
+                    self.voice.speak(response[:200])  # Limit speech length
+            return
+
+        # A streamed reply has already been printed as it arrived
+        if not (route == "llm" and streamed):
+            print(f"JARVIS: {response}")
+        if voice and self.voice:
+            self.voice.speak(response)
+
+    def route_query(self, user_input, memory_data=None, execute_shell=True, ask=None, execute_plugins=True):
+        """
+        Route a query: shell commands run directly, confident local intent
+        matches go straight to their plugin, anything else goes to the AI,
+        whose 'PLUGIN:' directives are dispatched. Nothing is printed here;
+        ask(user_input) replaces the AI call (the shell passes its streaming
+        printer). Returns (route, response) where route is 'shell',
+        'plugin:<name>' or 'llm'. With execute_plugins=False the plugin is
+        not run and the argument list it would get is returned instead.
+        """
+        if is_shell_command(user_input):
+            if not execute_shell:
+                return "shell", ""
+            return "shell", self.run_shell_command(user_input)
+
+        plugin_name, confidence = plugins.classify(user_input)
+        if plugin_name:
+            logger.info(f"Intent router matched '{plugin_name}' ({confidence:.2f})")
+            plugin_args = plugins.plugin_args(plugin_name, user_input)
+            if not execute_plugins:
+                return f"plugin:{plugin_name}", plugin_args
+            return f"plugin:{plugin_name}", plugins.execute(plugin_name, plugin_args)
+
+        if ask is not None:
+            ai_response = ask(user_input)
         else:
-            # Process as AI query
-            ai_response = self.brain.respond_to_query(user_input, memory)
-
-            # Check if AI wants to invoke a plugin
-            if ai_response.startswith("PLUGIN:"):
-                parts = ai_response.split()
-                if len(parts) >= 2:
-                    plugin_name = parts[1]
-                    plugin_args = parts[2:] if len(parts) > 2 else []
-                    plugin_response = plugins.execute(plugin_name, plugin_args)
-                    print(f"JARVIS: {plugin_response}")
-                    if voice and self.voice:
-                        self.voice.speak(plugin_response)
-                else:
-                    msg = "Invalid plugin command."
-                    print(f"JARVIS: {msg}")
-                    if voice and self.voice:
-                        self.voice.speak(msg)
-            else:
-                print(f"JARVIS: {ai_response}")
-                if voice and self.voice:
-                    self.voice.speak(ai_response)
+            ai_response = self.brain.respond_to_query(user_input, memory_data)
+        if ai_response.startswith("PLUGIN:"):
+            parts = ai_response.split()
+            route = f"plugin:{parts[1]}" if len(parts) >= 2 else "plugin"
+            if not execute_plugins:
+                return route, parts[2:]
+            return route, self.dispatch_plugin_directive(ai_response)
+        return "llm", ai_response
+
+    def run_shell_command(self, command):
+        """Execute a shell command and return its combined output"""
+        try:
+            result = subprocess.run(command, shell=True, capture_output=True, text=True, cwd=os.getcwd())
+            return (result.stdout + result.stderr).strip()
+        except Exception as e:
+            return f"Command error: {e}"
+
+    def dispatch_plugin_directive(self, ai_response):
+        """Run a 'PLUGIN: <name> <args>' directive from the AI and return the plugin's output"""
+        parts = ai_response.split()
+        if len(parts) < 2:
+            return "Invalid plugin command."
+        plugin_name = parts[1]
+        plugin_args = parts[2:] if len(parts) > 2 else []
+        return plugins.execute(plugin_name, plugin_args)
+
+    def stream_response(self, user_input):
+        """Print the AI reply as tokens arrive and return the full text.
+
+        Output is held back until it is clear the reply is not a
+        'PLUGIN:' directive, which the caller dispatches instead. The brain
+        stops generating as soon as the directive line is complete.
+        """
+        marker = "PLUGIN:"
+        reply = ""
+        printing = False
+        for chunk in self.brain.stream_query(user_input, memory):
+            reply += chunk
+            if printing:
+                sys.stdout.write(chunk)
+                sys.stdout.flush()
+                continue
+            head = reply.lstrip()
+            if head.startswith(marker) or marker.startswith(head):
+                continue
+            sys.stdout.write(f"JARVIS: {head}")
+            sys.stdout.flush()
+            printing = True
+
+        reply = reply.strip()
+        if printing:
+            print()
+        elif reply and not reply.startswith(marker):
+            print(f"JARVIS: {reply}")
+        return reply
 
     def default(self, line):
         """Handle default input as AI query"""
@@ -203,6 +272,52 @@ class JarvisShell(cmd.Cmd):
         except Exception as e:
             print(f"Error changing directory: {e}")
 
+    def do_cache(self, arg):
+        """Show response cache statistics ('cache clear' empties it)"""
+        if arg.strip() == "clear":
+            self.brain.clear_cache()
+            print("Response cache cleared.")
+            return
+        stats = self.brain.cache_stats()
+        if not stats:
+            print("Response cache is disabled.")
+            return
+        for key, value in stats.items():
+            print(f"{key}: {value}")
+
+    def do_providers(self, arg):
+        """Show latency and success counters for each LLM provider"""
+        for provider, stats in self.brain.provider_stats().items():
+            latency = f"{stats['latency']}s" if stats["latency"] is not None else "n/a"
+            print(f"{provider}: latency {latency}, {stats['successes']} ok, {stats['failures']} failed")
+
+    def do_plugins(self, arg):
+        """List plugins ('plugins stats' for load times and cache hits, 'plugins cache clear' to reset the cache)"""
+        if arg.strip() == "cache clear":
+            plugins.clear_cache()
+            print("Plugin result cache cleared.")
+            return
+        stats = plugins.stats()
+        if arg.strip() != "stats":
+            print(", ".join(sorted(stats)))
+            return
+        pool = plugins.pool.stats()
+        print(f"pool: {pool['running']}/{pool['workers']} running, {pool['queued']} queued "
+              f"(peak {pool['peak_queued']}, {pool['rejected']} refused)")
+        for name, entry in sorted(stats.items(), key=lambda item: -item[1].get("import_ms", 0)):
+            if "error" in entry:
+                state = f"failed: {entry['error']}"
+            elif entry["loaded"]:
+                state = f"imported in {entry['import_ms']} ms"
+            else:
+                state = "not imported yet"
+            if entry.get("timeouts"):
+                state += f", {entry['timeouts']} timed out"
+            if "cache" in entry:
+                cache = entry["cache"]
+                state += f", cache {cache['hit_ratio']:.0%} hits ({cache['stale']} stale, {cache['size']} entries)"
+            print(f"{name}: {state}")
+
     def do_EOF(self, arg):
         """Exit on Ctrl+D"""
         return self.do_exit(arg)
@@ -239,16 +354,106 @@ def shell_mode(voice_enabled=False):
     except KeyboardInterrupt:
         print("\nJARVIS: Goodbye!")
     finally:
+        plugins.shutdown()
         save_memory(memory)
 
+def read_batch_queries(source):
+    """Yield (id, query) from plain-text lines or JSONL objects with a 'query' field"""
+    for line_no, line in enumerate(source, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            try:
+                record = json.loads(line)
+                yield record.get("id", line_no), record["query"]
+                continue
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Line {line_no}: treating as plain text ({e})")
+        yield line_no, line
+
+def run_batch(shell, queries, out, workers=4, execute_shell=False, execute_plugins=False):
+    """
+    Route queries through a bounded worker pool and write one JSON result
+    per line, in input order, as soon as each result is ready. Unless
+    execute_plugins is set, queries routed to a plugin are recorded with
+    the arguments it would get ("args") instead of being run.
+    """
+    def route(query_id, query):
+        started = time.perf_counter()
+        record = {"id": query_id, "query": query}
+        try:
+            route, response = shell.route_query(query, execute_shell=execute_shell, execute_plugins=execute_plugins)
+            record["route"] = route
+            record["args" if route.startswith("plugin") and not execute_plugins else "response"] = response
+        except Exception as e:
+            record["route"], record["error"] = "error", str(e)
+        record["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return record
+
+    def emit(future):
+        out.write(json.dumps(future.result(), ensure_ascii=False) + "\n")
+        out.flush()
+
+    count = 0
+    started = time.perf_counter()
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for query_id, query in queries:
+            # Bound memory use on huge inputs: at most 2x workers queued
+            if len(in_flight) >= workers * 2:
+                emit(in_flight.popleft())
+            in_flight.append(pool.submit(route, query_id, query))
+            count += 1
+        while in_flight:
+            emit(in_flight.popleft())
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Batch finished: {count} queries in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.1f}/s)")
+    return count
+
+def batch_mode(input_path="-", output_path="-", workers=4, execute_shell=False, execute_plugins=False):
+    """Run JARVIS over a file (or stdin) of queries, writing JSONL results"""
+    shell = JarvisShell(voice_enabled=False)
+    source = sys.stdin if input_path == "-" else open(input_path, "r", encoding="utf-8")
+    out = sys.stdout if output_path == "-" else open(output_path, "w", encoding="utf-8")
+    try:
+        # Anything plugins print goes to stderr, so it cannot corrupt JSONL written to stdout
+        with redirect_stdout(sys.stderr):
+            run_batch(
+                shell, read_batch_queries(source), out,
+                workers=workers, execute_shell=execute_shell, execute_plugins=execute_plugins,
+            )
+    finally:
+        plugins.shutdown()
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
 def main():
     parser = argparse.ArgumentParser(description="JARVIS AI Terminal")
-    parser.add_argument('--mode', choices=['text', 'voice', 'shell'], default='shell',
-                       help='Run mode: shell (default), text, or voice')
+    parser.add_argument('--mode', choices=['text', 'voice', 'shell', 'batch'], default='shell',
+                       help='Run mode: shell (default), text, voice, or batch')
+    parser.add_argument('--input', default='-',
+                       help='Batch mode: file of queries, one per line or JSONL with "query" (default: stdin)')
+    parser.add_argument('--output', default='-',
+                       help='Batch mode: JSONL results file (default: stdout)')
+    parser.add_argument('--workers', type=int, default=config.get("batch_workers", 4),
+                       help='Batch mode: number of concurrent workers')
+    parser.add_argument('--execute-shell', action='store_true',
+                       help='Batch mode: actually run queries routed as shell commands')
+    parser.add_argument('--execute-plugins', action='store_true',
+                       help='Batch mode: actually run the plugins queries are routed to')
 
     args = parser.parse_args()
 
     check_environment()
+
+    if args.mode == 'batch':
+        batch_mode(args.input, args.output, args.workers, args.execute_shell, args.execute_plugins)
+        return
+
     print_intro()
 
     if args.mode == 'voice':
@@ -1,12 +1,26 @@
-import openai
 import requests
 from core.memory import MemoryManager
+from core.llm_clients import get_client
 from utils.config_loader import load_config
+from utils.logger import get_logger
+
+logger = get_logger("ai_agent")
 config = load_config()
 
+EXAMPLES = [
+    "ask the ai agent",
+    "ai agent query",
+    "use the ai agent",
+    "ask openai agent",
+]
+
+KEYWORDS = ["agent", "assistant"]
+HELP = "Ask the AI agent anything: agent <question>"
+TIMEOUT = 60
+
 class AIAgent:
     def __init__(self):
-        self.api_key = config.get("llm", {}).get("api_keys", {}).get("openai")
+        self.api_key = config.get("llm", {}).get("api_keys", {}).get("openai") or config.get("openai_api_key")
         self.model = config.get("llm", {}).get("model", "gpt-4")
         self.memory = MemoryManager()
 
@@ -14,7 +28,6 @@ class AIAgent:
         if not self.api_key:
             return "OpenAI API key missing."
 
-        headers = {"Authorization": f"Bearer {self.api_key}"}
         messages = [{"role": "system", "content": "You are a helpful assistant."}]
 
         if context:
@@ -22,7 +35,9 @@ class AIAgent:
         messages.append({"role": "user", "content": prompt})
 
         try:
-            response = openai.ChatCompletion.create(
+            # Shared, connection-pooled client instead of a new one per call
+            client = get_client("openai", dict(config, openai_api_key=self.api_key))
+            response = client.chat.completions.create(
                 model=self.model,
                 messages=messages
             )
@@ -38,7 +53,7 @@ class AIAgent:
     def internet_search_fallback(self, prompt):
         try:
             search_url = f"https://api.duckduckgo.com/?q={prompt}&format=json"
-            res = requests.get(search_url)
+            res = requests.get(search_url, timeout=TIMEOUT)
             res_json = res.json()
             return res_json.get("AbstractText") or res_json.get("RelatedTopics", [{}])[0].get("Text") or "No good result found."
         except:
@@ -48,7 +63,9 @@ class AIAgent:
         """Main execution method for the plugin"""
         if not args:
             return "Please provide a query for the AI agent."
-        return self.query(args[0])
+        return self.query(" ".join(args))
+
+PLUGIN_CLASS = AIAgent
 
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
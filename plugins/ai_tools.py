@@ -1,9 +1,22 @@
-from core.plugin_template import BasePlugin
+from core.plugin_template import BasePlugin, PluginError
 import requests
 from utils.logger import get_logger
 
 logger = get_logger("ai_tools")
 
+EXAMPLES = [
+    "list ai tools",
+    "show popular ai tools",
+    "search ai tools for image generation",
+    "find hugging face spaces",
+]
+
+KEYWORDS = ["huggingface", "spaces", "models"]
+COMMANDS = ["search"]
+HELP = "List popular Hugging Face spaces, or search them: search <query>"
+TIMEOUT = 15
+CACHE_TTL = 3600
+
 class AIToolsPlugin(BasePlugin):
     def __init__(self):
         super().__init__()
@@ -18,26 +31,28 @@ class AIToolsPlugin(BasePlugin):
     def list_ai_tools(self):
         try:
             url = "https://huggingface.co/api/spaces?sort=likes"
-            response = requests.get(url)
+            response = requests.get(url, timeout=TIMEOUT)
             response.raise_for_status()
             tools = response.json()
             logger.info(f"Fetched {len(tools)} AI tools")
             return [f"🔧 {tool['id']} - {tool['likes']} likes" for tool in tools[:10]]
         except Exception as e:
             logger.error(f"Failed to fetch tools: {e}")
-            return [self.handle_error(e)]
+            raise PluginError(self.handle_error(e))
 
     def search_ai_tools(self, query):
         try:
             url = f"https://huggingface.co/api/spaces?search={query}"
-            response = requests.get(url)
+            response = requests.get(url, timeout=TIMEOUT)
             response.raise_for_status()
             tools = response.json()
             if not tools:
                 return f"No AI tools found for: {query}"
             return "\n".join([f"🔍 {tool['id']}" for tool in tools[:5]])
         except Exception as e:
-            return self.handle_error(e)
+            raise PluginError(self.handle_error(e))
+
+PLUGIN_CLASS = AIToolsPlugin
 
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
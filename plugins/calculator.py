@@ -3,6 +3,18 @@ import requests
 import urllib.parse
 import re
 
+EXAMPLES = [
+    "calculate 2 + 2",
+    "15 * 4",
+    "evaluate 3 / 7",
+    "compute 12 squared",
+    "calculate 45 plus 12",
+]
+
+KEYWORDS = ["calculate", "calculator", "compute", "math"]
+HELP = "Evaluate an expression: calculate <expression>"
+TIMEOUT = 10
+
 class CalculatorPlugin(BasePlugin):
     def __init__(self):
         super().__init__()
@@ -27,12 +39,14 @@ class CalculatorPlugin(BasePlugin):
         clean_expr = re.sub(r'[^0-9+\-*/().]', '', expression)
         encoded_expr = urllib.parse.quote(clean_expr)
         url = f"{self.mathjs_url}?expr={encoded_expr}"
-        response = requests.get(url)
+        response = requests.get(url, timeout=TIMEOUT)
         if response.status_code == 200:
             return response.text
         else:
             raise Exception("Failed to get a valid response from math.js API")
 
+PLUGIN_CLASS = CalculatorPlugin
+
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
     calculator = CalculatorPlugin()
@@ -1,6 +1,18 @@
-from core.plugin_template import BasePlugin
+from core.plugin_template import BasePlugin, PluginError
 import requests
 
+EXAMPLES = [
+    "convert usd to eur",
+    "convert 100 usd eur",
+    "how many euros is 50 dollars",
+    "currency exchange rate gbp to inr",
+]
+
+KEYWORDS = ["currency", "exchange", "convert"]
+HELP = "Convert money: convert <from> <to> <amount>"
+TIMEOUT = 10
+CACHE_TTL = 3600
+
 class CurrencyConverterPlugin(BasePlugin):
     def __init__(self):
         super().__init__()
@@ -29,7 +41,7 @@ class CurrencyConverterPlugin(BasePlugin):
         try:
             url = f"https://api.exchangerate-api.com/v4/latest/{from_currency}"
             headers = {"Authorization": f"Bearer {self.config['api_keys']['currency']}"}
-            response = requests.get(url, headers=headers)
+            response = requests.get(url, headers=headers, timeout=TIMEOUT)
             response.raise_for_status()
             
             rate = response.json()['rates'].get(to_currency)
@@ -37,7 +49,9 @@ class CurrencyConverterPlugin(BasePlugin):
                 return f"{amount} {from_currency} = {amount * rate:.2f} {to_currency}"
             return f"Conversion rate for {to_currency} not found."
         except Exception as e:
-            return self.handle_error(e)
+            raise PluginError(self.handle_error(e))
+
+PLUGIN_CLASS = CurrencyConverterPlugin
 
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
@@ -7,6 +7,19 @@ from utils.logger import get_logger
 
 logger = get_logger("email_manager")
 
+EXAMPLES = [
+    "send an email",
+    "send email to bob subject hello",
+    "check my inbox",
+    "check email",
+    "read my latest emails",
+]
+
+KEYWORDS = ["email", "mail", "inbox"]
+COMMANDS = ["send", "check", "read"]
+HELP = "Commands: send <recipient> <subject> <body>, check"
+TIMEOUT = 30
+
 class EmailManager:
     def __init__(self):
         config = load_config()
@@ -23,8 +36,10 @@ class EmailManager:
         command = args[0].lower()
         if command == "send" and len(args) >= 4:
             return self.send_email(args[1], args[2], " ".join(args[3:]))
-        elif command == "check":
+        elif command in ("check", "read"):
             return "\n".join(self.check_inbox())
+        elif command == "send":
+            return "Usage: send <recipient> <subject> <body>"
         else:
             return f"Unknown command: {command}"
 
@@ -35,7 +50,7 @@ class EmailManager:
             msg["From"] = self.email_address
             msg["To"] = recipient
 
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
+            with smtplib.SMTP_SSL("smtp.gmail.com", 465, timeout=TIMEOUT) as smtp:
                 smtp.login(self.email_address, self.email_password)
                 smtp.send_message(msg)
             logger.info(f"Email sent to {recipient}")
@@ -63,6 +78,8 @@ class EmailManager:
             logger.error(f"Failed to fetch inbox: {e}")
             return [f"Failed to fetch inbox: {e}"]
 
+PLUGIN_CLASS = EmailManager
+
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
     email_manager = EmailManager()
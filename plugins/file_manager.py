@@ -1,5 +1,16 @@
 import os
 
+EXAMPLES = [
+    "list files",
+    "create file notes.txt",
+    "delete file old.log",
+    "show files in this folder",
+]
+
+KEYWORDS = ["file", "files", "folder", "directory"]
+COMMANDS = ["list", "show", "create", "delete"]
+HELP = "Commands: list, create <filename>, delete <filename>"
+
 class FileManagerPlugin:
     def run(self, *args, **kwargs):
         """Main execution method for the plugin"""
@@ -7,12 +18,14 @@ class FileManagerPlugin:
             return "Available commands: list, create <filename>, delete <filename>"
         
         command = args[0].lower()
-        if command == "list":
+        if command in ("list", "show"):
             return self.list_files()
         elif command == "create" and len(args) > 1:
             return self.create_file(args[1])
         elif command == "delete" and len(args) > 1:
             return self.delete_file(args[1])
+        elif command in ("create", "delete"):
+            return f"Usage: {command} <filename>"
         else:
             return f"Unknown command: {command}"
 
@@ -31,6 +44,8 @@ class FileManagerPlugin:
         else:
             return f"File '{filename}' not found."
 
+PLUGIN_CLASS = FileManagerPlugin
+
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
     file_manager = FileManagerPlugin()
@@ -1,10 +1,26 @@
 import os
 import subprocess
 import requests
+from core.plugin_template import PluginError
 from utils.logger import get_logger
 
 logger = get_logger("git_helper")
 
+EXAMPLES = [
+    "git clone a repository",
+    "git commit with message",
+    "git push",
+    "commit my changes",
+    "latest commit of a github repo",
+]
+
+KEYWORDS = ["git", "commit", "clone", "push", "pull"]
+COMMANDS = ["clone", "commit", "push", "latest"]
+HELP = "Commands: clone <repo_url> [dir], commit <message>, push, latest <repo_url>"
+TIMEOUT = 120
+CACHE_TTL = 300
+CACHE_COMMANDS = ["latest"]
+
 class GitHelperPlugin:
     def run(self, *args, **kwargs):
         """Main execution method for the plugin"""
@@ -22,8 +38,12 @@ class GitHelperPlugin:
                 return self.push_changes()
             elif command == "latest" and len(args) > 1:
                 return self.get_latest_commit_info(args[1])
+            elif command in ("clone", "commit", "latest"):
+                return "Usage: clone <repo_url> [dir], commit <message>, latest <repo_url>"
             else:
                 return f"Unknown command: {command}"
+        except PluginError:
+            raise
         except subprocess.CalledProcessError as e:
             logger.error(f"Git command failed: {str(e)}")
             return f"Git operation failed: {str(e)}"
@@ -33,7 +53,7 @@ class GitHelperPlugin:
 
     def clone_repo(self, repo_url, clone_dir=""):
         command = f"git clone {repo_url} {clone_dir}" if clone_dir else f"git clone {repo_url}"
-        subprocess.run(command, shell=True, check=True)
+        subprocess.run(command, shell=True, check=True, timeout=TIMEOUT)
         logger.info(f"Cloned repository: {repo_url} to {clone_dir or 'current directory'}")
         return f"Cloned repository from {repo_url}"
 
@@ -44,13 +64,16 @@ class GitHelperPlugin:
         return f"Changes committed with message: {commit_message}"
 
     def push_changes(self):
-        subprocess.run("git push", shell=True, check=True)
+        subprocess.run("git push", shell=True, check=True, timeout=TIMEOUT)
         logger.info("Pushed changes to remote repository")
         return "Pushed changes to the remote repository."
 
     def get_latest_commit_info(self, repo_url):
         api_url = f"https://api.github.com/repos/{repo_url}/commits"
-        response = requests.get(api_url)
+        try:
+            response = requests.get(api_url, timeout=TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            raise PluginError(f"Error: {str(e)}")
         if response.status_code == 200:
             commits = response.json()
             latest_commit = commits[0]
@@ -59,7 +82,9 @@ class GitHelperPlugin:
             return info
         else:
             logger.error(f"Failed to fetch commits for {repo_url}")
-            return "Unable to fetch the latest commit."
+            raise PluginError("Unable to fetch the latest commit.")
+
+PLUGIN_CLASS = GitHelperPlugin
 
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
@@ -1,5 +1,16 @@
 import requests
 
+EXAMPLES = [
+    "tell me a joke",
+    "say something funny",
+    "make me laugh",
+    "i want to hear a joke",
+]
+
+KEYWORDS = ["joke", "jokes", "funny"]
+HELP = "Tell a random joke"
+TIMEOUT = 10
+
 class JokeTellerPlugin:
     def run(self, *args, **kwargs):
         """Main execution method for the plugin"""
@@ -7,12 +18,14 @@ class JokeTellerPlugin:
 
     def tell_joke(self):
         url = "https://v2.jokeapi.dev/joke/Any?type=single"
-        response = requests.get(url)
+        response = requests.get(url, timeout=TIMEOUT)
         joke_data = response.json()
         if joke_data['error']:
             return "Couldn't fetch a joke right now."
         return joke_data["joke"]
 
+PLUGIN_CLASS = JokeTellerPlugin
+
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
     teller = JokeTellerPlugin()
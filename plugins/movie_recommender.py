@@ -1,19 +1,41 @@
 import requests
 import random
+from core.response_cache import TTLCache
 from utils.config_loader import load_config
 from utils.logger import get_logger
 
 logger = get_logger("movie_recommender")
 
+EXAMPLES = [
+    "recommend a movie",
+    "suggest an action movie",
+    "what film should i watch",
+    "movie recommendation comedy",
+]
+
+KEYWORDS = ["movie", "movies", "film", "films"]
+HELP = "Recommend movies: movie <genre>"
+TIMEOUT = 15
+GENRES = (
+    "action", "adventure", "animation", "comedy", "crime", "documentary", "drama", "family",
+    "fantasy", "history", "horror", "mystery", "romance", "thriller", "war", "western",
+)
+# Seconds TMDB search results are reused; each call still picks a random movie from them
+SEARCH_CACHE_TTL = 3600
+
 class MovieRecommenderPlugin:
     def __init__(self):
         config = load_config()
         self.api_key = config.get("tmdb_api_key", "d67af61c17c439b10daaf2eb5bb1f745")
         self.base_url = "https://api.themoviedb.org/3"
+        self.searches = TTLCache(max_size=64, ttl=SEARCH_CACHE_TTL)
 
     def run(self, *args, **kwargs):
         """Main execution method for the plugin"""
-        genre = args[0] if args else "action"
+        # "suggest an action movie" names a genre among other words; a lone word is searched as given
+        genre = next((word.lower() for word in args if word.lower() in GENRES), None)
+        if genre is None:
+            genre = args[0] if len(args) == 1 else "action"
         return self.get_movie_recommendation(genre)
 
     def get_movie_recommendation(self, genre="action"):
@@ -25,11 +47,15 @@ class MovieRecommenderPlugin:
                 "language": "en-US",
                 "include_adult": False
             }
-            response = requests.get(search_url, params=params)
-            data = response.json()
+            results = self.searches.get(genre.lower())
+            if results is None:
+                response = requests.get(search_url, params=params, timeout=TIMEOUT)
+                results = response.json().get("results") or []
+                if results:
+                    self.searches.set(genre.lower(), results)
 
-            if data.get("results"):
-                movie = random.choice(data["results"])
+            if results:
+                movie = random.choice(results)
                 title = movie.get("title", "Unknown Title")
                 year = movie.get("release_date", "N/A")[:4]
                 logger.info(f"Recommended movie: {title}")
@@ -42,6 +68,8 @@ class MovieRecommenderPlugin:
             logger.error(f"Failed to fetch movie: {e}")
             return f"Failed to fetch movie: {e}"
 
+PLUGIN_CLASS = MovieRecommenderPlugin
+
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
     recommender = MovieRecommenderPlugin()
@@ -6,6 +6,18 @@ from utils.logger import get_logger
 
 logger = get_logger("music_player")
 
+EXAMPLES = [
+    "play music",
+    "play song.mp3",
+    "stop the music",
+    "show new music releases",
+]
+
+KEYWORDS = ["music", "play", "pause", "song"]
+COMMANDS = ["play", "stop", "releases"]
+HELP = "Commands: play <file>, stop, releases"
+TIMEOUT = 15
+
 class MusicPlayerPlugin:
     def run(self, *args, **kwargs):
         """Main execution method for the plugin"""
@@ -19,6 +31,8 @@ class MusicPlayerPlugin:
             return self.stop_music()
         elif command == "releases":
             return self.get_new_releases()
+        elif command == "play":
+            return "Usage: play <file>"
         else:
             return f"Unknown command: {command}"
 
@@ -52,7 +66,8 @@ class MusicPlayerPlugin:
                 return "Spotify API not configured. Set 'spotify_token' in config.json for new releases."
             response = requests.get(
                 "https://api.spotify.com/v1/browse/new-releases",
-                headers={"Authorization": f"Bearer {token}"}
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=TIMEOUT
             )
             releases = response.json().get("albums", {}).get("items", [])
             logger.info(f"Fetched {len(releases)} new releases")
@@ -78,6 +93,8 @@ class MusicPlayerPlugin:
             logger.error(f"Failed to stop music: {str(e)}")
             return "Error stopping music"
 
+PLUGIN_CLASS = MusicPlayerPlugin
+
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
     player = MusicPlayerPlugin()
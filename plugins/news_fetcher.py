@@ -1,7 +1,20 @@
 import requests
+from core.plugin_template import PluginError
 from utils.config_loader import load_config
 config = load_config()
 
+EXAMPLES = [
+    "show me the news",
+    "latest news headlines",
+    "what's in the news",
+    "top headlines",
+]
+
+KEYWORDS = ["news", "headlines"]
+HELP = "Top headlines: news [country code]"
+TIMEOUT = 10
+CACHE_TTL = 900
+
 class NewsReaderPlugin:
     def __init__(self):
         self.api_key = config.get("news_api_key", "YOUR_NEWS_API_KEY")
@@ -9,12 +22,13 @@ class NewsReaderPlugin:
 
     def run(self, *args, **kwargs):
         """Main execution method for the plugin"""
-        country = args[0] if args else "us"
+        # Only a lone two-letter argument is a country code ("news gb"), not "show me the news"
+        country = args[0].lower() if len(args) == 1 and len(args[0]) == 2 and args[0].isalpha() else "us"
         return self.get_news(country)
 
     def get_news(self, country="us"):
         if self.api_key == "YOUR_NEWS_API_KEY":
-            return "News API key not configured. Please set 'news_api_key' in config.json"
+            raise PluginError("News API key not configured. Please set 'news_api_key' in config.json")
 
         params = {
             'country': country,
@@ -22,7 +36,7 @@ class NewsReaderPlugin:
         }
 
         try:
-            response = requests.get(self.base_url, params=params, timeout=10)
+            response = requests.get(self.base_url, params=params, timeout=TIMEOUT)
             if response.status_code == 200:
                 data = response.json()
                 articles = data.get('articles', [])
@@ -32,9 +46,11 @@ class NewsReaderPlugin:
                 else:
                     return "No news articles found."
             else:
-                return f"Failed to fetch news: {response.status_code}"
+                raise PluginError(f"Failed to fetch news: {response.status_code}")
         except requests.exceptions.RequestException as e:
-            return f"Error fetching news: {str(e)}"
+            raise PluginError(f"Error fetching news: {str(e)}")
+
+PLUGIN_CLASS = NewsReaderPlugin
 
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
@@ -8,6 +8,18 @@ from utils.logger import get_logger
 
 logger = get_logger("notes")
 
+EXAMPLES = [
+    "add a note",
+    "notes add buy groceries",
+    "list my notes",
+    "search notes for meeting",
+]
+
+KEYWORDS = ["note", "notes"]
+COMMANDS = ["add", "list", "search"]
+HELP = "Commands: add <content>, list, search <keyword>"
+TIMEOUT = 15
+
 class NotesManager:
     def run(self, *args, **kwargs):
         """Main execution method for the plugin"""
@@ -26,6 +38,8 @@ class NotesManager:
             if isinstance(results, list):
                 return "\n".join([f"{i+1}. {note['content']}" for i, note in enumerate(results)]) if results else "No matching notes found"
             return results
+        elif command in ("add", "search"):
+            return "Usage: add <content>, search <keyword>"
         else:
             return f"Unknown command: {command}"
 
@@ -60,7 +74,8 @@ class NotesManager:
     def search_online_note(self, keyword):
         try:
             response = requests.get(
-                f"https://api.duckduckgo.com/?q={keyword}+notes&format=json"
+                f"https://api.duckduckgo.com/?q={keyword}+notes&format=json",
+                timeout=TIMEOUT
             )
             data = response.json()
             result = data.get("Abstract") or "No online notes found."
@@ -85,6 +100,8 @@ class NotesManager:
         except Exception as e:
             logger.error(f"Failed to save notes: {str(e)}")
 
+PLUGIN_CLASS = NotesManager
+
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
     notes_manager = NotesManager()
@@ -4,6 +4,17 @@ from utils.logger import get_logger
 
 logger = get_logger("reminder")
 
+EXAMPLES = [
+    "remind me to call mom in 10 minutes",
+    "set a reminder",
+    "reminder set stretch 60",
+    "set reminder take a break",
+]
+
+KEYWORDS = ["reminder", "remind"]
+COMMANDS = ["set"]
+HELP = "Set a reminder: set <message> <delay_seconds>"
+
 class ReminderPlugin:
     def run(self, *args, **kwargs):
         """Main execution method for the plugin"""
@@ -18,7 +29,7 @@ class ReminderPlugin:
             except ValueError:
                 return "Error: Delay must be a number"
         else:
-            return f"Unknown command: {args[0]}"
+            return "Usage: set <message> <delay_seconds>"
 
     def set_reminder(self, message, delay):
         def remind():
@@ -30,6 +41,8 @@ class ReminderPlugin:
         logger.info(f"Set reminder: '{message}' in {delay} seconds")
         return f"Reminder set for {delay} seconds: '{message}'"
 
+PLUGIN_CLASS = ReminderPlugin
+
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
     reminder = ReminderPlugin()
@@ -7,6 +7,19 @@ import subprocess
 import sounddevice as sd
 import json
 
+EXAMPLES = [
+    "system status",
+    "shutdown the computer",
+    "reboot the system",
+    "open spotify",
+    "list audio devices",
+]
+
+KEYWORDS = ["system", "shutdown", "restart", "reboot", "cpu", "ram", "kill", "tasks", "spotify", "open", "launch"]
+COMMANDS = ["open", "start", "launch", "shutdown", "reboot", "status", "info"]
+HELP = "Commands: shutdown, reboot, status, or open [app]"
+TIMEOUT = 10
+
 class SystemControlPlugin(BasePlugin):
     def __init__(self):
         super().__init__()
@@ -32,12 +45,13 @@ class SystemControlPlugin(BasePlugin):
             app_name = command.replace('open', '').replace('start', '').replace('launch', '').strip()
             return self.open_application(app_name)
         
-        # Handle system commands
-        if command == "shutdown":
+        # Handle system commands by their first word ("shutdown the computer")
+        action = command.split()[0] if command.split() else command
+        if action == "shutdown":
             return self.shutdown()
-        elif command == "reboot":
+        elif action == "reboot":
             return self.reboot()
-        elif command in ["status", "info"]:
+        elif action in ["status", "info"]:
             return self.system_status()
         elif "audio device" in command or "sound device" in command:
             return self.handle_audio_device(command)
@@ -63,12 +77,12 @@ class SystemControlPlugin(BasePlugin):
 
     def system_status(self):
         try:
-            response = requests.get("http://localhost:8080/system/status")
+            response = requests.get("http://localhost:8080/system/status", timeout=TIMEOUT)
             if response.status_code == 200:
                 status = response.json().get("status", "System status is normal.")
                 # Add audio device info to status
                 devices = sd.query_devices()
-                current_device = self.memory.load().get("preferences", {}).get("audio_device_index", 0)
+                current_device = self.memory.memory.get("preferences", {}).get("audio_device_index", 0)
                 status += f"\nAudio devices: {len(devices)} available (Current: {current_device})"
                 return status
             return "Unable to fetch system status."
@@ -79,7 +93,7 @@ class SystemControlPlugin(BasePlugin):
         """Handle audio device related commands"""
         try:
             devices = sd.query_devices()
-            current_index = self.memory.load()["preferences"]["audio_device_index"]
+            current_index = self.memory.memory["preferences"]["audio_device_index"]
             
             if "list" in command:
                 device_list = "\n".join(
@@ -97,9 +111,8 @@ class SystemControlPlugin(BasePlugin):
                         device_index = int(part)
                         if 0 <= device_index < len(devices):
                             # Update memory
-                            memory = self.memory.load()
-                            memory["preferences"]["audio_device_index"] = device_index
-                            self.memory.save(memory)
+                            self.memory.memory["preferences"]["audio_device_index"] = device_index
+                            self.memory.save()
                             return f"Audio device changed to {device_index}: {devices[device_index]['name']}"
                         return f"Invalid device index. Use numbers between 0-{len(devices)-1}"
                 return "Please specify a device number to switch to"
@@ -109,6 +122,8 @@ class SystemControlPlugin(BasePlugin):
         except Exception as e:
             return self.handle_error(e)
 
+PLUGIN_CLASS = SystemControlPlugin
+
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
     controller = SystemControlPlugin()
@@ -1,21 +1,36 @@
+import re
 import schedule
-import time
+import threading
 from core.memory import MemoryManager
 from utils.logger import get_logger
 
 logger = get_logger("task_scheduler")
 
+EXAMPLES = [
+    "schedule a task",
+    "schedule backup at 10:00",
+    "run the scheduler",
+    "schedule a daily job",
+]
+
+KEYWORDS = ["schedule", "scheduler"]
+COMMANDS = ["schedule", "run"]
+HELP = "Commands: schedule <task> <HH:MM>, run"
+
 class TaskSchedulerPlugin:
     def run(self, *args, **kwargs):
         """Main execution method for the plugin"""
         if not args:
-            return "Available commands: schedule <task_function> <time_str>, run"
+            return "Available commands: schedule <task> <HH:MM>, run"
         
         command = args[0].lower()
-        if command == "schedule" and len(args) == 3:
-            task_function = args[1]
-            time_str = args[2]
-            return self.schedule_task(task_function, time_str)
+        if command == "schedule":
+            # "schedule backup at 10:00": the task's name, then its daily time
+            words = [word for word in args[1:] if word.lower() != "at"]
+            if len(words) < 2 or not re.fullmatch(r"\d{2}:\d{2}", words[-1]):
+                return "Usage: schedule <task> <HH:MM>"
+            task_name = " ".join(words[:-1])
+            return self.schedule_task(lambda: f"Scheduled task '{task_name}' is due", words[-1], task_name=task_name)
         elif command == "run":
             return self.run_scheduler()
         else:
@@ -23,6 +38,8 @@ class TaskSchedulerPlugin:
 
     def __init__(self):
         self.memory = MemoryManager()
+        self._stop = threading.Event()
+        self._thread = None
         self.load_scheduled_tasks()
 
     def schedule_task(self, task_function, time_str, task_name=None):
@@ -33,6 +50,7 @@ class TaskSchedulerPlugin:
         job = schedule.every().day.at(time_str).do(self._wrap_task(task_function, task_name))
         self._save_task(job, task_name, time_str)
         logger.info(f"Scheduled task '{task_name}' at {time_str}")
+        return f"Scheduled '{task_name}' daily at {time_str}."
 
     def _wrap_task(self, task_function, task_name):
         """Wrapper to log task execution"""
@@ -67,11 +85,25 @@ class TaskSchedulerPlugin:
             logger.info(f"Loaded {len(self.memory.memory['scheduled_tasks'])} scheduled tasks from memory")
 
     def run_scheduler(self):
-        """Run the scheduler loop"""
+        """Start the scheduler loop on a background thread and return at once"""
+        if self._thread is not None and self._thread.is_alive():
+            return "Task scheduler is already running."
         logger.info("Starting task scheduler")
-        while True:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._scheduler_loop, name="task-scheduler", daemon=True)
+        self._thread.start()
+        return "Task scheduler started."
+
+    def _scheduler_loop(self):
+        while not self._stop.is_set():
             schedule.run_pending()
-            time.sleep(1)
+            self._stop.wait(1)
+
+    def teardown(self):
+        """Stop the scheduler loop"""
+        self._stop.set()
+
+PLUGIN_CLASS = TaskSchedulerPlugin
 
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
@@ -3,10 +3,29 @@ from core.memory import MemoryManager
 
 logger = get_logger("todo_list")
 
+EXAMPLES = [
+    "todo add buy milk",
+    "todo add",
+    "todo remove",
+    "todo list",
+    "add a task to my todo list",
+    "list my todos",
+    "remove task from todo list",
+    "show my to do list",
+]
+
+KEYWORDS = ["todo", "todos"]
+COMMANDS = ["add", "remove", "list"]
+HELP = "Commands: add <task>, remove <task>, list"
+
 class TodoListPlugin:
     def __init__(self):
         self.memory = MemoryManager()
-        self.todo_list = self.memory.memory.get("todo_list", [])
+
+    @property
+    def todo_list(self):
+        # Read through on every call: the instance outlives changes other views make
+        return self.memory.memory.setdefault("todo_list", [])
 
     def run(self, *args, **kwargs):
         """Main execution method for the plugin"""
@@ -20,6 +39,8 @@ class TodoListPlugin:
             return self.remove_task(" ".join(args[1:]))
         elif command == "list":
             return self.list_tasks()
+        elif command in ("add", "remove"):
+            return f"Usage: {command} <task>"
         else:
             return f"Unknown command: {command}"
 
@@ -45,9 +66,10 @@ class TodoListPlugin:
 
     def _save_tasks(self):
         """Save tasks to memory"""
-        self.memory.memory["todo_list"] = self.todo_list
         self.memory.save()
 
+PLUGIN_CLASS = TodoListPlugin
+
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
     todo = TodoListPlugin()
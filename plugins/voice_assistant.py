@@ -4,6 +4,14 @@ from utils.logger import get_logger
 
 logger = get_logger("voice_assistant")
 
+EXAMPLES = [
+    "speak hello",
+    "listen to my voice",
+]
+
+KEYWORDS = ["speak", "listen"]
+HELP = "Commands: speak <text>, listen"
+
 class VoiceAssistantPlugin:
     def run(self, *args, **kwargs):
         """Main execution method for the plugin"""
@@ -1,7 +1,22 @@
+import re
 import requests
+from core.plugin_template import PluginError
 from utils.config_loader import load_config
 config = load_config()
 
+EXAMPLES = [
+    "weather in london",
+    "what's the weather in paris",
+    "temperature in tokyo",
+    "how is the weather in new york",
+    "forecast for berlin",
+]
+
+KEYWORDS = ["weather", "temperature", "forecast"]
+HELP = "Current weather for a city: weather <city>"
+TIMEOUT = 10
+CACHE_TTL = 600
+
 class WeatherPlugin:
     def __init__(self):
         self.api_key = config.get("api_keys", {}).get("weather")
@@ -31,6 +46,11 @@ class WeatherPlugin:
             if pattern in query:
                 city_name = query.split(pattern)[-1].strip()
                 break
+        else:
+            # Routed commands arrive without the keyword: "in paris", "what's the in paris"
+            match = re.search(r"\b(?:in|at|for)\s+(.+)$", query)
+            if match:
+                city_name = match.group(1).strip()
                 
         # Remove question marks and other punctuation
         city_name = city_name.split("?")[0].strip()
@@ -39,23 +59,23 @@ class WeatherPlugin:
 
     def get_weather(self, city_name):
         if not self.api_key:
-            return "Weather API key not configured. Please set weather_api_key in config.json"
+            raise PluginError("Weather API key not configured. Please set weather_api_key in config.json")
 
         complete_url = f"{self.base_url}q={city_name}&appid={self.api_key}&units=metric"
         
         try:
-            response = requests.get(complete_url)
+            response = requests.get(complete_url, timeout=TIMEOUT)
             response.raise_for_status()
             data = response.json()
 
             if not isinstance(data, dict):
-                return "Invalid weather data received"
+                raise PluginError("Invalid weather data received")
 
             if data.get("cod") == "404":
                 return f"City {city_name} not found."
 
             if "main" not in data or "weather" not in data:
-                return "Unexpected weather data format received"
+                raise PluginError("Unexpected weather data format received")
 
             main_data = data["main"]
             weather_data = data["weather"][0]
@@ -64,12 +84,16 @@ class WeatherPlugin:
             weather_description = weather_data.get("description", "unknown conditions")
             return f"The temperature in {city_name} is {temperature}°C with {weather_description}."
 
+        except PluginError:
+            raise
         except requests.exceptions.RequestException as e:
-            return f"Failed to fetch weather data: {str(e)}"
+            raise PluginError(f"Failed to fetch weather data: {str(e)}")
         except (KeyError, IndexError) as e:
-            return "Unexpected weather data format received"
+            raise PluginError("Unexpected weather data format received")
         except Exception as e:
-            return f"An error occurred: {str(e)}"
+            raise PluginError(f"An error occurred: {str(e)}")
+
+PLUGIN_CLASS = WeatherPlugin
 
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
@@ -3,6 +3,17 @@ import requests
 from bs4 import BeautifulSoup
 import urllib.parse
 
+EXAMPLES = [
+    "search for python tutorials",
+    "google best laptops",
+    "look up the capital of peru",
+    "search the web for news about ai",
+]
+
+KEYWORDS = ["search", "google", "lookup"]
+HELP = "Search the web: search <query>"
+TIMEOUT = 15
+
 class WebSearchPlugin(BasePlugin):
     def __init__(self):
         super().__init__()
@@ -21,7 +32,7 @@ class WebSearchPlugin(BasePlugin):
             encoded_query = urllib.parse.quote_plus(query)
             search_url = f"https://www.google.com/search?q={encoded_query}"
             headers = {"User-Agent": "Mozilla/5.0"}
-            response = requests.get(search_url, headers=headers)
+            response = requests.get(search_url, headers=headers, timeout=TIMEOUT)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, "html.parser")
@@ -35,6 +46,8 @@ class WebSearchPlugin(BasePlugin):
         except Exception as e:
             return self.handle_error(e)
 
+PLUGIN_CLASS = WebSearchPlugin
+
 # Module-level run function required by plugin manager
 def run(*args, **kwargs):
     searcher = WebSearchPlugin()
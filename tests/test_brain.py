@@ -1,19 +1,32 @@
+import asyncio
+import os
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
-from core.brain import Brain
+from unittest.mock import patch, MagicMock, AsyncMock
+from core.brain import Brain, AsyncBrain
+from core import llm_clients
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
 
 class TestBrain(unittest.TestCase):
+    def setUp(self):
+        llm_clients.registry.reset()
+
     @patch('utils.config_loader.load_config')
-    @patch('ollama.chat')
-    def test_respond_to_query_ollama(self, mock_chat, mock_load_config):
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_respond_to_query_ollama(self, mock_async_client, mock_load_config):
         mock_load_config.return_value = {"use_model": "ollama", "ollama_model": "llama3.2"}
-        mock_chat.return_value = {'message': {'content': 'Ollama response'}}
+        mock_async_client.return_value.chat = AsyncMock(return_value={'message': {'content': 'Ollama response'}})
         brain = Brain()
         response = brain.respond_to_query("Hello", {})
         self.assertEqual(response, "Ollama response")
 
     @patch('utils.config_loader.load_config')
-    @patch('core.brain.openai.OpenAI')
+    @patch('core.llm_clients.openai.AsyncOpenAI')
     def test_respond_to_query_openai(self, mock_openai, mock_load_config):
         mock_load_config.return_value = {"use_model": "openai", "llm_model": "gpt-3.5-turbo"}
         mock_client = MagicMock()
@@ -21,7 +34,7 @@ class TestBrain(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.choices = [MagicMock()]
         mock_response.choices[0].message.content = "Test response"
-        mock_client.chat.completions.create.return_value = mock_response
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
         brain = Brain()
         response = brain.respond_to_query("Hello", {})
         self.assertEqual(response, "Test response")
@@ -29,32 +42,32 @@ class TestBrain(unittest.TestCase):
 
 
     @patch('utils.config_loader.load_config')
-    @patch('core.brain.anthropic.Anthropic')
+    @patch('core.llm_clients.anthropic.AsyncAnthropic')
     def test_respond_to_query_claude(self, mock_anthropic, mock_load_config):
         mock_load_config.return_value = {"use_model": "claude"}
         mock_client = MagicMock()
         mock_anthropic.return_value = mock_client
         mock_response = MagicMock()
         mock_response.content = [MagicMock(text="Claude response")]
-        mock_client.messages.create.return_value = mock_response
+        mock_client.messages.create = AsyncMock(return_value=mock_response)
         brain = Brain()
         response = brain.respond_to_query("Hello", {})
         self.assertEqual(response, "Claude response")
 
     @patch('utils.config_loader.load_config')
-    @patch('ollama.chat')
-    def test_respond_to_query_exception(self, mock_chat, mock_load_config):
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_respond_to_query_exception(self, mock_async_client, mock_load_config):
         mock_load_config.return_value = {"use_model": "ollama", "ollama_model": "llama3.2"}
-        mock_chat.side_effect = Exception("API error")
+        mock_async_client.return_value.chat = AsyncMock(side_effect=Exception("API error"))
         brain = Brain()
         response = brain.respond_to_query("Hello", {})
         self.assertIn("⚠️", response)
 
     @patch('utils.config_loader.load_config')
-    @patch('ollama.chat')
-    def test_memory_update(self, mock_chat, mock_load_config):
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_memory_update(self, mock_async_client, mock_load_config):
         mock_load_config.return_value = {"use_model": "ollama", "ollama_model": "llama3.2"}
-        mock_chat.return_value = {'message': {'content': 'Test response'}}
+        mock_async_client.return_value.chat = AsyncMock(return_value={'message': {'content': 'Test response'}})
         brain = Brain()
         memory = {}
         brain.respond_to_query("Test query", memory)
@@ -67,5 +80,311 @@ class TestBrain(unittest.TestCase):
         response = brain.respond_to_query("PLUGIN: weather get_weather", {})
         self.assertEqual(response, "PLUGIN: weather get_weather")
 
+    @patch('utils.config_loader.load_config')
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_stream_query_ollama(self, mock_async_client, mock_load_config):
+        mock_load_config.return_value = {"use_model": "ollama", "ollama_model": "llama3.2"}
+        mock_chat = AsyncMock(return_value=_aiter([
+            {'message': {'content': 'Hel'}},
+            {'message': {'content': 'lo'}},
+        ]))
+        mock_async_client.return_value.chat = mock_chat
+        brain = Brain()
+        memory = {}
+        chunks = list(brain.stream_query("Hi", memory))
+        self.assertEqual(chunks, ["Hel", "lo"])
+        self.assertTrue(mock_chat.call_args.kwargs["stream"])
+        self.assertEqual(memory["context"][-1]["ai"], "Hello")
+
+    @patch('utils.config_loader.load_config')
+    @patch('core.llm_clients.openai.AsyncOpenAI')
+    def test_stream_query_openai(self, mock_openai, mock_load_config):
+        mock_load_config.return_value = {"use_model": "openai", "llm_model": "gpt-3.5-turbo"}
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        parts = []
+        for text in ["Str", "eam"]:
+            part = MagicMock()
+            part.choices = [MagicMock()]
+            part.choices[0].delta.content = text
+            parts.append(part)
+        mock_client.chat.completions.create = AsyncMock(return_value=_aiter(parts))
+        brain = Brain()
+        self.assertEqual("".join(brain.stream_query("Hi")), "Stream")
+
+    @patch('utils.config_loader.load_config')
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_stream_query_exception(self, mock_async_client, mock_load_config):
+        mock_load_config.return_value = {"use_model": "ollama", "ollama_model": "llama3.2"}
+        mock_async_client.return_value.chat = AsyncMock(side_effect=Exception("API error"))
+        brain = Brain()
+        memory = {}
+        chunks = list(brain.stream_query("Hello", memory))
+        self.assertIn("offline", chunks[0])
+        self.assertNotIn("context", memory)
+
+    @patch('utils.config_loader.load_config')
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_response_cache_hit(self, mock_async_client, mock_load_config):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            mock_load_config.return_value = {
+                "use_model": "ollama",
+                "ollama_model": "llama3.2",
+                "response_cache_enabled": True,
+                "response_cache_path": os.path.join(tmpdir, "cache.db"),
+            }
+            mock_chat = AsyncMock(return_value={'message': {'content': 'Cached reply'}})
+            mock_async_client.return_value.chat = mock_chat
+            brain = Brain()
+            self.assertEqual(brain.respond_to_query("What can you do?"), "Cached reply")
+            self.assertEqual(brain.respond_to_query("what can you do"), "Cached reply")
+            self.assertEqual("".join(brain.stream_query("What can you do")), "Cached reply")
+            self.assertEqual(mock_chat.call_count, 1)
+            self.assertEqual(brain.cache_stats()["hits"], 2)
+
+
+class TestAsyncBrain(unittest.TestCase):
+    def setUp(self):
+        llm_clients.registry.reset()
+
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_stream_stops_at_plugin_directive(self, mock_async_client):
+        consumed = []
+
+        async def parts():
+            for text in ["PLUGIN: wea", "ther London\nSure, here", " is the forecast", " for today"]:
+                consumed.append(text)
+                yield {'message': {'content': text}}
+
+        mock_async_client.return_value.chat = AsyncMock(return_value=parts())
+        brain = AsyncBrain({"use_model": "ollama"})
+
+        async def collect():
+            return [chunk async for chunk in brain.stream_query("weather in london")]
+
+        self.assertEqual("".join(asyncio.run(collect())), "PLUGIN: weather London")
+        self.assertEqual(len(consumed), 2)
+        self.assertEqual(brain._last_reply, "PLUGIN: weather London")
+
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_concurrency_limit(self, mock_async_client):
+        in_flight = []
+        peak = []
+
+        async def slow_chat(**kwargs):
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            return {'message': {'content': 'ok'}}
+
+        mock_async_client.return_value.chat = slow_chat
+        brain = AsyncBrain({"use_model": "ollama"}, max_concurrency=2)
+
+        async def run_all():
+            return await asyncio.gather(*(brain.respond_to_query(f"q{i}") for i in range(6)))
+
+        replies = asyncio.run(run_all())
+        self.assertEqual(replies, ["ok"] * 6)
+        self.assertEqual(max(peak), 2)
+
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_identical_queries_are_coalesced(self, mock_async_client):
+        calls = []
+
+        async def slow_chat(**kwargs):
+            calls.append(kwargs)
+            await asyncio.sleep(0.01)
+            return {'message': {'content': 'shared'}}
+
+        mock_async_client.return_value.chat = slow_chat
+        brain = AsyncBrain({"use_model": "ollama"})
+        other_brain = AsyncBrain({"use_model": "ollama"})
+        shared_before = brain.inflight.shared
+
+        async def run_all():
+            return await asyncio.gather(
+                brain.respond_to_query("same question"),
+                other_brain.respond_to_query("same question"),
+                brain.respond_to_query("other question"),
+            )
+
+        self.assertEqual(asyncio.run(run_all()), ["shared"] * 3)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(brain.inflight.shared - shared_before, 1)
+
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_query_joins_stream_in_flight(self, mock_async_client):
+        async def parts():
+            for text in ["Hello", " there"]:
+                await asyncio.sleep(0.01)
+                yield {'message': {'content': text}}
+
+        mock_chat = AsyncMock(return_value=parts())
+        mock_async_client.return_value.chat = mock_chat
+        brain = AsyncBrain({"use_model": "ollama"})
+
+        async def run_both():
+            async def stream():
+                return "".join([chunk async for chunk in brain.stream_query("hi")])
+            streaming = asyncio.ensure_future(stream())
+            await asyncio.sleep(0)
+            return await asyncio.gather(streaming, brain.respond_to_query("hi"))
+
+        self.assertEqual(asyncio.run(run_both()), ["Hello there", "Hello there"])
+        self.assertEqual(mock_chat.call_count, 1)
+
+    @patch('core.memory.save_memory')
+    def test_long_term_memory_recalled_into_prompt(self, mock_save_memory):
+        with tempfile.TemporaryDirectory() as tmp:
+            brain = AsyncBrain({
+                "use_model": "ollama",
+                "long_term_memory_enabled": True,
+                "long_term_memory_path": tmp,
+            })
+            brain.long_term.add("My favourite colour is teal", "Teal it is.", "earlier")
+            system_prompt, chat = brain._build_messages("what is my favourite colour", {"context": []})
+            self.assertIn("My favourite colour is teal", system_prompt)
+            self.assertEqual(chat, [{"role": "user", "content": "what is my favourite colour"}])
+
+            recent = {"context": [{"timestamp": "earlier", "user": "My favourite colour is teal", "ai": "Teal it is."}]}
+            system_prompt, _ = brain._build_messages("what is my favourite colour", recent)
+            self.assertEqual(system_prompt, brain.BASE_SYSTEM_PROMPT)
+
+    def test_summary_included_in_prompt(self):
+        brain = AsyncBrain({"use_model": "ollama"})
+        memory = {"context": [], "summary": "The user is planning a trip to Lisbon."}
+        system_prompt, _ = brain._build_messages("any tips?", memory)
+        self.assertTrue(system_prompt.startswith(brain.BASE_SYSTEM_PROMPT))
+        self.assertIn("planning a trip to Lisbon", system_prompt)
+
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_session_mode_sends_summary_and_recall(self, mock_async_client):
+        mock_generate = AsyncMock(return_value={'response': 'ok', 'context': [1, 2]})
+        mock_async_client.return_value.generate = mock_generate
+        with tempfile.TemporaryDirectory() as tmp:
+            brain = AsyncBrain({
+                "use_model": "ollama",
+                "session_mode": True,
+                "long_term_memory_enabled": True,
+                "long_term_memory_path": tmp,
+            })
+            memory = {"context": []}
+            asyncio.run(brain.respond_to_query("hi", memory))
+
+            brain.long_term.add("My favourite colour is teal", "Teal it is.", "earlier")
+            asyncio.run(brain.respond_to_query("what is my favourite colour", memory))
+            request = mock_generate.call_args.kwargs
+            self.assertEqual(request["context"], [1, 2])
+            self.assertIn("My favourite colour is teal", request["prompt"])
+            self.assertTrue(request["prompt"].endswith("what is my favourite colour"))
+
+            memory["summary"] = "The user is planning a trip to Lisbon."
+            asyncio.run(brain.respond_to_query("any tips?", memory))
+            request = mock_generate.call_args.kwargs
+            self.assertNotIn("context", request)
+            self.assertIn("planning a trip to Lisbon", request["system"])
+
+            asyncio.run(brain.respond_to_query("thanks", memory))
+            self.assertEqual(mock_generate.call_args.kwargs["context"], [1, 2])
+
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_warm_up_loads_model_with_keep_alive(self, mock_async_client):
+        mock_generate = AsyncMock(return_value={})
+        mock_async_client.return_value.generate = mock_generate
+        brain = AsyncBrain({"use_model": "ollama", "ollama_model": "llama3.2", "ollama_keep_alive": "30m"})
+        self.assertTrue(asyncio.run(brain.warm_up()))
+        mock_generate.assert_called_once_with(model="llama3.2", prompt="", keep_alive="30m")
+
+    def test_warm_up_skipped_without_ollama(self):
+        brain = AsyncBrain({"use_model": "openai"})
+        self.assertFalse(asyncio.run(brain.warm_up()))
+
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_queries_pass_keep_alive(self, mock_async_client):
+        mock_chat = AsyncMock(return_value={'message': {'content': 'ok'}})
+        mock_async_client.return_value.chat = mock_chat
+        brain = AsyncBrain({"use_model": "ollama", "ollama_keep_alive": "1h"})
+        asyncio.run(brain.respond_to_query("hi"))
+        self.assertEqual(mock_chat.call_args.kwargs["keep_alive"], "1h")
+
+    @patch('core.memory.save_memory')
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_session_mode_reuses_ollama_context(self, mock_async_client, mock_save_memory):
+        mock_generate = AsyncMock(side_effect=[
+            {'response': 'Hello!', 'context': [1, 2, 3]},
+            {'response': 'Fine.', 'context': [1, 2, 3, 4, 5]},
+        ])
+        mock_async_client.return_value.generate = mock_generate
+        brain = AsyncBrain({"use_model": "ollama", "session_mode": True})
+        memory = {"context": []}
+
+        self.assertEqual(asyncio.run(brain.respond_to_query("hi", memory)), "Hello!")
+        first = mock_generate.call_args_list[0].kwargs
+        self.assertEqual(first["system"], brain.BASE_SYSTEM_PROMPT)
+        self.assertNotIn("context", first)
+
+        self.assertEqual(asyncio.run(brain.respond_to_query("how are you", memory)), "Fine.")
+        second = mock_generate.call_args_list[1].kwargs
+        self.assertEqual(second["prompt"], "how are you")
+        self.assertEqual(second["context"], [1, 2, 3])
+        self.assertNotIn("system", second)
+
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_session_reset_after_turn_it_missed(self, mock_async_client):
+        mock_async_client.return_value.generate = AsyncMock(return_value={'response': 'ok', 'context': [7]})
+        brain = AsyncBrain({"use_model": "ollama", "session_mode": True})
+        memory = {"context": []}
+        with patch('core.memory.save_memory'):
+            asyncio.run(brain.respond_to_query("hi", memory))
+            self.assertEqual(brain._session(memory).context, [7])
+            mock_async_client.return_value.generate.side_effect = Exception("down")
+            asyncio.run(brain.respond_to_query("again", memory))
+        self.assertIsNone(brain._session(memory).context)
+
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_sessions_are_per_conversation_and_serialized(self, mock_async_client):
+        active = []
+        overlapped = []
+        async def generate(**kwargs):
+            active.append(kwargs["prompt"])
+            overlapped.append(len(active) > 1)
+            await asyncio.sleep(0.01)
+            active.remove(kwargs["prompt"])
+            return {'response': 'ok', 'context': [kwargs.get("context", [0])[0] + 1]}
+        mock_async_client.return_value.generate = generate
+        brain = AsyncBrain({"use_model": "ollama", "session_mode": True, "response_cache_enabled": False})
+        shell, voice = {"context": []}, {"context": []}
+
+        async def main():
+            await asyncio.gather(*(brain.respond_to_query(f"q{i}", shell) for i in range(3)))
+            await brain.respond_to_query("hello", voice)
+        asyncio.run(main())
+        self.assertFalse(any(overlapped))
+        self.assertEqual(brain._session(shell).context, [3])
+        self.assertEqual(brain._session(voice).context, [1])
+
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_session_reset_past_token_budget(self, mock_async_client):
+        mock_generate = AsyncMock(return_value={'response': 'ok', 'context': list(range(50))})
+        mock_async_client.return_value.generate = mock_generate
+        brain = AsyncBrain({"use_model": "ollama", "session_mode": True, "context_token_budget": 40})
+        memory = {"context": []}
+        asyncio.run(brain.respond_to_query("hi", memory))
+        asyncio.run(brain.respond_to_query("again", memory))
+        self.assertIsNone(brain._session(memory).context)
+        self.assertIn("system", mock_generate.call_args.kwargs)
+        self.assertNotIn("context", mock_generate.call_args.kwargs)
+
+    @patch('core.llm_clients.anthropic.AsyncAnthropic')
+    def test_session_mode_caches_claude_system_prompt(self, mock_anthropic):
+        mock_create = AsyncMock(return_value=MagicMock(content=[MagicMock(text="Hi")]))
+        mock_anthropic.return_value.messages.create = mock_create
+        brain = AsyncBrain({"use_model": "claude", "session_mode": True})
+        asyncio.run(brain.respond_to_query("hi"))
+        system = mock_create.call_args.kwargs["system"]
+        self.assertEqual(system[0]["text"], brain.BASE_SYSTEM_PROMPT)
+        self.assertEqual(system[0]["cache_control"], {"type": "ephemeral"})
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,3 +1,5 @@
+import threading
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 from core.command_handler import CommandHandler
@@ -31,5 +33,55 @@ class TestCommandHandler(unittest.TestCase):
             self.assertIn('response', result)
             mock_respond.assert_called()
 
+    @patch.object(CommandHandler, 'respond')
+    def test_intent_router_skips_llm(self, mock_respond):
+        with patch.object(self.ch.plugins, 'smart_dispatch', return_value=(None, None)), \
+            patch.object(self.ch.plugins, 'classify', return_value=('weather', 0.9)), \
+            patch.object(self.ch.plugins, 'execute', return_value='sunny') as mock_execute, \
+            patch.object(self.ch.brain, 'respond_to_query') as mock_brain:
+            result = self.ch.handle("weather in london")
+            self.assertEqual(result, 'sunny')
+            mock_execute.assert_called_once_with('weather', ['in', 'london'])
+            mock_brain.assert_not_called()
+
+    @patch.object(CommandHandler, 'respond')
+    def test_and_runs_tasks_concurrently_in_order(self, mock_respond):
+        both_running = threading.Barrier(2, timeout=5)
+        def slow_execute(plugin_name, command):
+            both_running.wait()  # raises unless the two tasks overlap
+            time.sleep(0.1 if plugin_name == "weather" else 0)
+            return f"{plugin_name} done"
+        dispatch = lambda command: ("weather" if "weather" in command else "todo_list", None)
+        with patch.object(self.ch.plugins, 'smart_dispatch', side_effect=dispatch), \
+            patch.object(self.ch.plugins, 'execute', side_effect=slow_execute):
+            result = self.ch.handle("weather in london and todo list")
+        self.assertEqual(result, "weather done\ntodo_list done")
+        self.assertEqual([c.args[0] for c in mock_respond.call_args_list], ["weather done", "todo_list done"])
+
+    def test_plan_tasks(self):
+        self.assertEqual(
+            self.ch._plan_tasks("check weather and list todos then play music"),
+            [["check weather", "list todos"], ["play music"]],
+        )
+        self.assertEqual(self.ch._plan_tasks("weather in Paris, France"), [["weather in Paris, France"]])
+        self.assertEqual(self.ch._plan_tasks("notes add milk, eggs & bread"), [["notes add milk, eggs & bread"]])
+
+    @patch.object(CommandHandler, 'respond')
+    def test_then_runs_tasks_in_sequence(self, mock_respond):
+        active = []
+        overlap = threading.Event()
+        def execute(plugin_name, args):
+            command = " ".join(args)
+            active.append(command)
+            if len(active) > 1:
+                overlap.set()
+            time.sleep(0.05)
+            active.remove(command)
+            return command
+        with patch.object(self.ch.plugins, 'smart_dispatch', return_value=('dummy', None)), \
+            patch.object(self.ch.plugins, 'execute', side_effect=execute):
+            self.assertEqual(self.ch.handle("first then second"), "first\nsecond")
+        self.assertFalse(overlap.is_set())
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from core.context_builder import ContextBuilder, estimate_tokens, truncate_to_tokens
+
+def turn(user, ai):
+    return {"user": user, "ai": ai}
+
+class TestContextBuilder(unittest.TestCase):
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("hello world!"), 3)
+        self.assertGreater(estimate_tokens("x" * 60), 1)
+
+    def test_truncate_to_tokens(self):
+        text = " ".join(["word"] * 50)
+        short = truncate_to_tokens(text, 10)
+        self.assertTrue(short.endswith("…"))
+        self.assertLessEqual(estimate_tokens(short), 11)
+        self.assertEqual(truncate_to_tokens("short text", 10), "short text")
+
+    def test_packs_most_recent_turns_within_budget(self):
+        context = [turn(f"question {i}", f"answer {i}") for i in range(10)]
+        builder = ContextBuilder(budget=estimate_tokens("sys") + estimate_tokens("now") + 12)
+        messages = builder.build("sys", context, "now")
+        self.assertEqual(messages[-1], {"role": "user", "content": "now"})
+        self.assertEqual([m["content"] for m in messages[:-1]],
+                         ["question 8", "answer 8", "question 9", "answer 9"])
+
+    def test_oversized_turn_is_truncated(self):
+        context = [turn("hi", "blah " * 500)]
+        builder = ContextBuilder(budget=200, max_turn_tokens=20)
+        messages = builder.build("sys", context, "next")
+        self.assertEqual(len(messages), 3)
+        self.assertLessEqual(estimate_tokens(messages[1]["content"]), 21)
+
+    def test_budget_per_model(self):
+        config = {"context_token_budget": {"default": 100, "llama3.2": 4000}}
+        self.assertEqual(ContextBuilder.from_config(config, "llama3.2").budget, 4000)
+        self.assertEqual(ContextBuilder.from_config(config, "gpt-4").budget, 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from core.intent_router import IntentRouter
+from core.plugin_manager import PLUGINS_DIR, SKIPPED_PLUGINS
+from core.plugin_manifest import discover
+
+EXAMPLES = {
+    "weather": ["weather in london", "what's the weather in paris", "temperature in tokyo"],
+    "todo_list": ["todo add buy milk", "list my todos", "remove task from todo list"],
+    "joke_teller": ["tell me a joke", "make me laugh"],
+}
+
+class TestIntentRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = IntentRouter(EXAMPLES)
+
+    def test_confident_match(self):
+        plugin, confidence = self.router.classify("weather in mumbai")
+        self.assertEqual(plugin, "weather")
+        self.assertGreaterEqual(confidence, self.router.threshold)
+        self.assertEqual(self.router.classify("todo add call the dentist")[0], "todo_list")
+
+    def test_low_confidence_falls_through(self):
+        plugin, confidence = self.router.classify("write me a python function")
+        self.assertIsNone(plugin)
+        self.assertLess(confidence, self.router.threshold)
+
+    def test_empty_input(self):
+        self.assertEqual(self.router.classify(""), (None, 0.0))
+
+    def test_from_plugins_reads_examples(self):
+        class Module:
+            EXAMPLES = ["play music"]
+        router = IntentRouter.from_plugins({"music_player": Module, "bare": object()}, {"intent_router_threshold": 0.9})
+        self.assertEqual(router.threshold, 0.9)
+        self.assertEqual(router.classify("play music")[0], "music_player")
+
+    def test_general_questions_are_left_to_the_llm(self):
+        router = IntentRouter.from_manifests(discover(PLUGINS_DIR, skip=SKIPPED_PLUGINS))
+        for question in (
+            "tell me about python",
+            "what is the capital of france",
+            "check weather and list todos",
+            "who is the president of the united states",
+            "write me a python function",
+        ):
+            with self.subTest(question=question):
+                self.assertIsNone(router.classify(question)[0])
+        self.assertEqual(router.classify("weather in mumbai")[0], "weather")
+        self.assertEqual(router.classify("search notes for meeting")[0], "notes")
+
+    def test_command_must_name_only_the_winning_plugin(self):
+        keywords = {"weather": ["weather"], "todo_list": ["todo", "todos"]}
+        router = IntentRouter(EXAMPLES, keywords=keywords, example_match=1.1)
+        self.assertEqual(router.classify("list my todos")[0], "todo_list")
+        self.assertIsNone(router.classify("list my todos and the weather")[0])
+        self.assertEqual(router.classify("make me laugh")[0], "joke_teller")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from core.keyword_router import KeywordRouter
+
+KEYWORDS = {
+    "weather": ["weather", "temperature", "forecast"],
+    "music_player": ["music", "play", "new releases"],
+    "notes": ["note"],
+    "news_fetcher": ["news", "new"],
+}
+
+class TestKeywordRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = KeywordRouter(KEYWORDS)
+
+    def test_matches_whole_tokens(self):
+        self.assertEqual(self.router.rank("What's the weather like?"), [("weather", 1)])
+        self.assertEqual(self.router.rank("display the forecast"), [("weather", 1)])
+        self.assertEqual(self.router.rank("write me a poem"), [])
+
+    def test_plural_fallback(self):
+        self.assertEqual(self.router.rank("show my notes")[0][0], "notes")
+
+    def test_ranks_by_matched_tokens(self):
+        ranked = self.router.rank("play music and check the weather")
+        self.assertEqual(ranked, [("music_player", 2), ("weather", 1)])
+
+    def test_longest_phrase_wins(self):
+        self.assertEqual(self.router.rank("any new releases"), [("music_player", 2)])
+
+if __name__ == '__main__':
+    unittest.main()
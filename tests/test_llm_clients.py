@@ -0,0 +1,45 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from core.llm_clients import ClientRegistry
+
+class TestClientRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ClientRegistry()
+
+    @patch('core.llm_clients.openai.OpenAI')
+    def test_sync_client_is_shared(self, mock_openai):
+        config = {"openai_api_key": "key"}
+        first = self.registry.get_client("openai", config)
+        second = self.registry.get_client("openai", config)
+        self.assertIs(first, second)
+        mock_openai.assert_called_once()
+
+    @patch('core.llm_clients.ollama.Client')
+    def test_ollama_client_uses_connection_pool(self, mock_client):
+        self.registry.get_client("ollama", {"llm_pool_size": 4})
+        self.assertEqual(mock_client.call_args.kwargs["limits"].max_keepalive_connections, 4)
+
+    @patch('core.llm_clients.ollama.AsyncClient')
+    def test_async_client_is_shared_per_loop(self, mock_async_client):
+        mock_async_client.side_effect = lambda **kwargs: object()
+
+        async def fetch_twice():
+            return (self.registry.get_async_client("ollama", {}),
+                    self.registry.get_async_client("ollama", {}))
+
+        first, second = asyncio.run(fetch_twice())
+        self.assertIs(first, second)
+        third, _ = asyncio.run(fetch_twice())
+        self.assertIsNot(first, third)
+
+    @patch('core.llm_clients.anthropic.Anthropic')
+    def test_reset_closes_clients(self, mock_anthropic):
+        client = self.registry.get_client("claude", {"anthropic_api_key": "key"})
+        self.registry.reset()
+        client.close.assert_called_once()
+        self.registry.get_client("claude", {"anthropic_api_key": "key"})
+        self.assertEqual(mock_anthropic.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
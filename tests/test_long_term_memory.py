@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+import numpy as np
+from core.long_term_memory import LongTermMemory
+
+
+def _add_turns(path, worker, count):
+    store = LongTermMemory(path=path, dim=32)
+    for i in range(count):
+        store.add(f"worker {worker} question {i}", f"answer {i}", f"{worker}-{i}")
+
+
+class TestLongTermMemory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "long_term")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _store(self):
+        store = LongTermMemory(path=self.path, dim=128, min_score=0.1)
+        store.add("My sister's name is Alice", "Nice, I'll remember Alice.", "t1")
+        store.add("What is the capital of France?", "Paris.", "t2")
+        store.add("I prefer dark roast coffee", "Noted, dark roast it is.", "t3")
+        return store
+
+    def test_recall_ranks_relevant_turns_first(self):
+        store = self._store()
+        recalled = store.recall("what coffee roast do I prefer", k=1)
+        self.assertEqual(recalled[0]["timestamp"], "t3")
+
+    def test_recall_excludes_recent_turns(self):
+        store = self._store()
+        recalled = store.recall("what coffee roast do I prefer", exclude={"t3"})
+        self.assertNotIn("t3", [turn["timestamp"] for turn in recalled])
+
+    def test_persists_across_instances(self):
+        self._store()
+        reloaded = LongTermMemory(path=self.path, dim=128, min_score=0.1)
+        self.assertEqual(len(reloaded), 3)
+        self.assertEqual(reloaded.recall("name of my sister", k=1)[0]["timestamp"], "t1")
+
+    def test_recovers_from_torn_append(self):
+        self._store()
+        with open(os.path.join(self.path, "turns.jsonl"), "a") as f:
+            f.write('{"timestamp": "t4", "us')
+        reloaded = LongTermMemory(path=self.path, dim=128, min_score=0.1)
+        self.assertEqual(len(reloaded), 3)
+        reloaded.add("Another turn", "Sure.", "t5")
+        self.assertEqual(len(LongTermMemory(path=self.path, dim=128)), 4)
+
+    def test_grows_past_initial_capacity(self):
+        store = LongTermMemory(path=self.path, dim=32)
+        for i in range(1500):
+            store.add(f"question {i}", f"answer {i}", str(i))
+        self.assertEqual(len(store), 1500)
+        self.assertEqual(len(LongTermMemory(path=self.path, dim=32)), 1500)
+
+    def test_processes_keep_vectors_and_turns_paired(self):
+        workers = [multiprocessing.Process(target=_add_turns, args=(self.path, worker, 100)) for worker in range(3)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join(30)
+            self.assertEqual(process.exitcode, 0)
+
+        store = LongTermMemory(path=self.path, dim=32)
+        self.assertEqual(len(store), 300)
+        for row, turn in enumerate(store._turns):
+            expected = store.vectorizer.transform(f"{turn['user']}\n{turn['ai']}")
+            self.assertTrue(np.array_equal(store._matrix[row], expected))
+
+    def test_one_index_per_path(self):
+        config = {"long_term_memory_enabled": True, "long_term_memory_path": self.path}
+        self.assertIs(LongTermMemory.from_config(config), LongTermMemory.from_config(config))
+
+    def test_disabled_by_config(self):
+        self.assertIsNone(LongTermMemory.from_config({"long_term_memory_enabled": False}))
+
+
+if __name__ == '__main__':
+    unittest.main()
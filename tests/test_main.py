@@ -0,0 +1,68 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from core import memory as memory_module
+import main
+
+
+class TestProcessQuery(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "memory.json")
+        self.patcher = patch.object(memory_module, "MEMORY_FILE", self.path)
+        self.patcher.start()
+        # The todo plugin's warm instance holds the memory it was created with
+        main.plugins.instances.pop("todo_list", None)
+        with patch("main.Brain"):
+            self.shell = main.JarvisShell()
+
+    def tearDown(self):
+        main.plugins.instances.pop("todo_list", None)
+        memory_module.MemoryService.for_path(self.path).flush()
+        self.patcher.stop()
+        self.tmp.cleanup()
+
+    def ask(self, query):
+        with patch("builtins.print") as mock_print:
+            self.shell.process_query(query)
+        return [call.args[0] for call in mock_print.call_args_list]
+
+    def test_intent_match_runs_real_plugin_with_arguments(self):
+        self.assertEqual(self.ask("todo add buy milk"), ["JARVIS: Task 'buy milk' added."])
+        self.assertEqual(self.ask("todo list"), ["JARVIS: • buy milk"])
+        self.assertEqual(self.ask("list my todos"), ["JARVIS: • buy milk"])
+        self.shell.brain.respond_to_query.assert_not_called()
+        self.shell.brain.stream_query.assert_not_called()
+
+    def test_streamed_plugin_directive_is_dispatched(self):
+        self.shell.brain.stream_query.return_value = iter(["PLUGIN: todo_list ", "list"])
+        with patch.dict(main.config, {"stream_responses": True}):
+            self.assertEqual(self.ask("anything left on my plate"), ["JARVIS: No tasks found."])
+        self.shell.brain.respond_to_query.assert_not_called()
+
+    def run_batch(self, queries, **kwargs):
+        out = io.StringIO()
+        main.run_batch(self.shell, enumerate(queries, 1), out, workers=1, **kwargs)
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_batch_records_plugin_without_running_it(self):
+        self.shell.brain.respond_to_query.return_value = "PLUGIN: todo_list add call mom"
+        with patch.object(main.plugins, "execute") as mock_execute:
+            records = self.run_batch(["todo add buy milk", "anything left on my plate"])
+        mock_execute.assert_not_called()
+        self.assertEqual([(r["route"], r["args"]) for r in records], [
+            ("plugin:todo_list", ["add", "buy", "milk"]),
+            ("plugin:todo_list", ["add", "call", "mom"]),
+        ])
+        self.assertTrue(all("response" not in r for r in records))
+
+    def test_batch_runs_plugins_when_asked(self):
+        records = self.run_batch(["todo add buy milk"], execute_plugins=True)
+        self.assertEqual(records[0]["response"], "Task 'buy milk' added.")
+
+
+if __name__ == '__main__':
+    unittest.main()
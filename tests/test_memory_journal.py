@@ -0,0 +1,127 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from core.memory_journal import JournalStore, SEQ_KEY
+from core import memory as memory_module
+
+
+class TestJournalStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "memory.json")
+        self.store = JournalStore(self.path, compact_every=1000)
+        self.store.reset({"context": [], "preferences": {"audio_device_index": 0}})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _turn(self, i):
+        return {"op": "turn", "entry": {"user": f"q{i}", "ai": f"a{i}"}, "limit": 3}
+
+    def test_appends_replay_on_load(self):
+        for i in range(5):
+            self.store.append(self._turn(i))
+        self.store.append({"op": "set", "key": "todo_list", "value": ["milk"]})
+        memory = JournalStore(self.path).load()
+        self.assertEqual([turn["user"] for turn in memory["context"]], ["q2", "q3", "q4"])
+        self.assertEqual(memory["todo_list"], ["milk"])
+
+    def test_append_does_not_rewrite_snapshot(self):
+        before = os.stat(self.path).st_mtime_ns
+        self.store.append(self._turn(0))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, before)
+
+    def test_torn_tail_is_discarded(self):
+        self.store.append(self._turn(0))
+        with open(self.store.journal_path, "a") as f:
+            f.write('{"op": "turn", "entry": {"us')
+        store = JournalStore(self.path)
+        memory = store.load()
+        self.assertEqual(len(memory["context"]), 1)
+        store.append(self._turn(1))
+        self.assertEqual(len(JournalStore(self.path).load()["context"]), 2)
+
+    def test_compaction_folds_journal_into_snapshot(self):
+        for i in range(4):
+            self.store.append(self._turn(i))
+        self.store.compact()
+        with open(self.path) as f:
+            snapshot = json.load(f)
+        self.assertEqual(snapshot[SEQ_KEY], 4)
+        self.assertEqual(os.path.getsize(self.store.journal_path), 0)
+        self.assertEqual(len(JournalStore(self.path).load()["context"]), 3)
+
+    def test_compaction_does_not_overwrite_concurrent_reset(self):
+        for i in range(4):
+            self.store.append(self._turn(i))
+        read_journal = self.store._read_journal
+        def reset_while_compacting(start=0):
+            result = read_journal(start)
+            if start == 0 and not self.store._lock._is_owned():
+                self.store.reset({"context": [], "todo_list": ["from reset"]})
+            return result
+        with patch.object(self.store, "_read_journal", side_effect=reset_while_compacting):
+            self.assertFalse(self.store.compact())
+        self.assertEqual(JournalStore(self.path).load()["todo_list"], ["from reset"])
+        self.assertEqual([name for name in os.listdir(self.tmp.name) if name.endswith(".tmp")], [])
+
+    def test_crash_between_snapshot_and_journal_rewrite(self):
+        for i in range(4):
+            self.store.append(self._turn(i))
+        memory = self.store.load()
+        # Snapshot written, journal not yet truncated
+        self.store._write_snapshot(memory, 4)
+        self.store.append(self._turn(4))
+        reloaded = JournalStore(self.path).load()
+        self.assertEqual([turn["user"] for turn in reloaded["context"]], ["q2", "q3", "q4"])
+
+    def test_background_compaction_triggers(self):
+        store = JournalStore(self.path, compact_every=3)
+        store.load()
+        for i in range(3):
+            store.append(self._turn(i))
+        store._compactor.join(5)
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)[SEQ_KEY], 3)
+
+
+class TestMemoryManagerJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "memory.json")
+        self.patcher = patch.object(memory_module, "MEMORY_FILE", path)
+        self.patcher.start()
+        self.path = path
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp.cleanup()
+
+    def test_update_context_appends_one_line(self):
+        manager = memory_module.MemoryManager()
+        manager.update_context("hello", "hi there")
+        manager.update_context("bye", "goodbye")
+        manager.service.flush()
+        journal = os.path.splitext(self.path)[0] + ".journal.jsonl"
+        with open(journal) as f:
+            self.assertEqual(len(f.readlines()), 2)
+        self.assertEqual(memory_module.MemoryManager().get_context()[-1]["user"], "bye")
+
+    def test_save_journals_only_changed_keys(self):
+        manager = memory_module.MemoryManager()
+        manager.memory["todo_list"] = ["call mom"]
+        manager.save()
+        manager.service.flush()
+        manager.save()
+        manager.service.flush()
+        journal = os.path.splitext(self.path)[0] + ".journal.jsonl"
+        with open(journal) as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual([(e["op"], e["key"]) for e in entries], [("set", "todo_list")])
+        self.assertEqual(memory_module.load_memory()["todo_list"], ["call mom"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from core.file_lock import FileLock
+from core.memory import MemoryService
+from core.memory_journal import JournalStore
+
+
+def _append_turns(path, worker, count):
+    store = JournalStore(path, compact_every=25)
+    store.load()
+    for i in range(count):
+        store.append({"op": "turn", "entry": {"timestamp": f"{worker}-{i:03d}", "user": f"{worker}:{i}", "ai": ""}})
+    if store._compactor is not None:
+        store._compactor.join(5)
+
+
+class TestFileLock(unittest.TestCase):
+    def test_second_holder_cannot_acquire(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "memory.json.lock")
+            first, second = FileLock(path), FileLock(path)
+            self.assertTrue(first.acquire(blocking=False))
+            self.assertFalse(second.acquire(blocking=False))
+            first.release()
+            self.assertTrue(second.acquire(blocking=False))
+            second.release()
+
+
+class TestCrossProcessJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "memory.json")
+        JournalStore(self.path).reset({"context": [], "preferences": {"audio_device_index": 0}})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_concurrent_processes_lose_no_entries(self):
+        workers = [
+            multiprocessing.Process(target=_append_turns, args=(self.path, worker, 60))
+            for worker in range(3)
+        ]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join(30)
+            self.assertEqual(process.exitcode, 0)
+
+        store = JournalStore(self.path)
+        memory, seq = store._read_state()
+        self.assertEqual(seq + len(store._read_journal()[0]), 180)
+        users = {turn["user"] for turn in memory["context"]}
+        self.assertEqual(len(users), 180)
+
+    def test_poll_returns_other_writers_entries(self):
+        mine, theirs = JournalStore(self.path), JournalStore(self.path)
+        mine.load()
+        theirs.load()
+        theirs.append({"op": "set", "key": "todo_list", "value": ["from elsewhere"]})
+        mine.append({"op": "set", "key": "summary", "value": "mine"})
+        entries, stale = mine.poll()
+        self.assertFalse(stale)
+        self.assertEqual([entry["key"] for entry in entries], ["todo_list"])
+        self.assertEqual([entry["seq"] for entry in entries], [1])
+
+    def test_poll_reports_stale_after_foreign_compaction(self):
+        mine, theirs = JournalStore(self.path), JournalStore(self.path)
+        mine.load()
+        theirs.load()
+        theirs.append({"op": "set", "key": "todo_list", "value": ["x"]})
+        theirs.compact()
+        entries, stale = mine.poll()
+        self.assertTrue(stale)
+
+
+class TestMergeOnWrite(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "memory.json")
+        JournalStore(self.path).reset({"context": [], "preferences": {"audio_device_index": 0}})
+        # Two services on separate store objects behave like two processes
+        self.voice = MemoryService(JournalStore(self.path), flush_delay=0)
+        self.shell = MemoryService(JournalStore(self.path), flush_delay=0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_turns_from_both_processes_survive(self):
+        self.voice.record_turn({"timestamp": "2025-01-01T10:00:00", "user": "voice", "ai": "a"}, 20)
+        self.shell.memory["context"].append({"timestamp": "2025-01-01T10:00:01", "user": "shell", "ai": "b"})
+        self.shell.mark_dirty()
+
+        on_disk = JournalStore(self.path).load()
+        self.assertEqual([turn["user"] for turn in on_disk["context"]], ["voice", "shell"])
+        self.assertEqual([turn["user"] for turn in self.shell.memory["context"]], ["voice", "shell"])
+
+    def test_untouched_keys_take_other_process_value(self):
+        self.voice.memory["todo_list"] = ["from voice"]
+        self.voice.mark_dirty()
+        self.shell.memory["preferences"]["audio_device_index"] = 2
+        self.shell.mark_dirty()
+
+        on_disk = JournalStore(self.path).load()
+        self.assertEqual(on_disk["todo_list"], ["from voice"])
+        self.assertEqual(on_disk["preferences"]["audio_device_index"], 2)
+        self.assertEqual(self.shell.memory["todo_list"], ["from voice"])
+
+
+if __name__ == '__main__':
+    unittest.main()
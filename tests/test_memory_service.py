@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from core import memory as memory_module
+from core.memory import MemoryService, MemoryManager, Memory
+from core.memory_journal import JournalStore
+
+
+class TestMemoryService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "memory.json")
+        self.patcher = patch.object(memory_module, "MEMORY_FILE", self.path)
+        self.patcher.start()
+
+    def tearDown(self):
+        MemoryService.for_path(self.path).flush()
+        self.patcher.stop()
+        self.tmp.cleanup()
+
+    def _on_disk(self):
+        return JournalStore(self.path).load()
+
+    def test_limit_is_read_from_config_when_service_is_created(self):
+        with patch.object(memory_module, "load_config", return_value={"memory_limit": 2, "memory_flush_delay": 0}):
+            legacy = Memory()
+        for i in range(3):
+            legacy.update(f"q{i}", f"a{i}")
+        self.assertEqual([turn["user"] for turn in legacy.get_context()], ["q1", "q2"])
+        self.assertEqual(MemoryManager().max_context_length, 2)
+
+    def test_views_share_one_state(self):
+        todo = MemoryManager()
+        scheduler = MemoryManager()
+        legacy = Memory()
+        self.assertIs(todo.memory, scheduler.memory)
+        self.assertIs(todo.memory, legacy.memory)
+
+        todo.memory["todo_list"] = ["water plants"]
+        todo.save()
+        scheduler.memory["scheduled_tasks"] = [{"name": "backup", "time": "09:00"}]
+        scheduler.save()
+        todo.service.flush()
+
+        on_disk = self._on_disk()
+        self.assertEqual(on_disk["todo_list"], ["water plants"])
+        self.assertEqual(on_disk["scheduled_tasks"], [{"name": "backup", "time": "09:00"}])
+
+    def test_loads_store_once(self):
+        with patch.object(JournalStore, "load", wraps=JournalStore.for_path(self.path).load) as mock_load:
+            for _ in range(5):
+                MemoryManager()
+        self.assertLessEqual(mock_load.call_count, 1)
+
+    def test_writes_are_debounced(self):
+        manager = MemoryManager()
+        manager.service.flush_delay = 60
+        with patch.object(manager.store, "append") as mock_append:
+            for i in range(10):
+                manager.update_context(f"q{i}", f"a{i}")
+            self.assertEqual(mock_append.call_count, 0)
+            manager.service.flush()
+        self.assertEqual(mock_append.call_count, 10)
+        self.assertTrue(all(call.args[0]["op"] == "turn" for call in mock_append.call_args_list))
+
+    def test_background_flush(self):
+        manager = MemoryManager()
+        manager.service.flush_delay = 0.01
+        manager.update_context("hello", "hi")
+        manager.service._timer.join(5)
+        self.assertEqual(self._on_disk()["context"][-1]["user"], "hello")
+
+    def test_save_memory_replaces_shared_state(self):
+        view = MemoryManager()
+        memory_module.save_memory({"context": [], "preferences": {"audio_device_index": 3}})
+        self.assertEqual(view.memory["preferences"]["audio_device_index"], 3)
+        self.assertEqual(self._on_disk()["preferences"]["audio_device_index"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from core.memory_sqlite import SQLiteStore
+from core import memory as memory_module
+
+
+class TestSQLiteStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "memory.db")
+        self.store = SQLiteStore(self.path)
+        self.store.reset({
+            "context": [],
+            "preferences": {"audio_device_index": 2},
+            "todo_list": ["buy milk"],
+            "summary": "Earlier chat.",
+        })
+
+    def tearDown(self):
+        self.store._conn.close()
+        self.tmp.cleanup()
+
+    def _turn(self, i, limit=3):
+        return {
+            "op": "turn",
+            "entry": {"timestamp": f"2025-01-0{i + 1}T10:00:00", "user": f"question {i}", "ai": f"answer {i}"},
+            "limit": limit,
+        }
+
+    def test_round_trip(self):
+        memory = self.store.load()
+        self.assertEqual(memory["preferences"], {"audio_device_index": 2})
+        self.assertEqual(memory["todo_list"], ["buy milk"])
+        self.assertEqual(memory["summary"], "Earlier chat.")
+        self.assertEqual(memory["context"], [])
+
+    def test_wal_mode(self):
+        mode = self.store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+
+    def test_context_trimmed_but_history_kept(self):
+        for i in range(5):
+            self.store.append(self._turn(i))
+        context = self.store.load()["context"]
+        self.assertEqual([turn["user"] for turn in context], ["question 2", "question 3", "question 4"])
+        self.assertEqual(len(self.store.between("2025-01-01", "2025-01-06")), 5)
+
+    def test_full_text_search(self):
+        self.store.append({"op": "turn", "entry": {"timestamp": "t1", "user": "remind me about the dentist", "ai": "Done."}})
+        self.store.append({"op": "turn", "entry": {"timestamp": "t2", "user": "what's the weather", "ai": "Sunny."}})
+        results = self.store.search("dentist")
+        self.assertEqual([turn["timestamp"] for turn in results], ["t1"])
+
+    def test_set_context_reuses_history_rows(self):
+        for i in range(2):
+            self.store.append(self._turn(i))
+        context = self.store.load()["context"]
+        self.store.append({"op": "set", "key": "context", "value": context[1:]})
+        self.assertEqual(self.store.load()["context"], context[1:])
+        count = self.store._conn.execute("SELECT COUNT(*) FROM turns").fetchone()[0]
+        self.assertEqual(count, 2)
+
+    def test_scheduled_tasks_and_delete(self):
+        tasks = [{"name": "backup", "time": "09:00", "last_run": None, "next_run": "2025-01-02 09:00:00"}]
+        self.store.append({"op": "set", "key": "scheduled_tasks", "value": tasks})
+        self.store.append({"op": "delete", "key": "summary"})
+        memory = self.store.load()
+        self.assertEqual(memory["scheduled_tasks"], tasks)
+        self.assertNotIn("summary", memory)
+
+
+class TestMemoryManagerSQLite(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patchers = [
+            patch.object(memory_module, "MEMORY_FILE", os.path.join(self.tmp.name, "memory.json")),
+            patch.object(memory_module, "load_config", return_value={
+                "memory_backend": "sqlite",
+                "memory_db_path": os.path.join(self.tmp.name, "memory.db"),
+            }),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        self.tmp.cleanup()
+
+    def test_manager_api_on_sqlite(self):
+        manager = memory_module.MemoryManager()
+        manager.update_context("note that the wifi password is hunter2", "Noted.")
+        manager.memory["todo_list"] = ["call mom"]
+        manager.save()
+
+        reloaded = memory_module.MemoryManager()
+        self.assertEqual(reloaded.get_context()[-1]["ai"], "Noted.")
+        self.assertEqual(reloaded.memory["todo_list"], ["call mom"])
+        self.assertEqual(len(reloaded.search("wifi password")), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "memory.json")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,9 @@
+import asyncio
+import threading
+import time
 import unittest
+from functools import partial
+import requests
 from unittest.mock import patch, MagicMock
 from core.plugin_manager import PluginManager
 
@@ -24,6 +29,29 @@ class TestPluginManager(unittest.TestCase):
         pm = PluginManager()
         # Should not crash, just log error
 
+    @patch('importlib.import_module')
+    def test_plugins_imported_on_first_use(self, mock_import):
+        mock_import.return_value = MagicMock(run=MagicMock(return_value="sunny"))
+        pm = PluginManager()
+        self.assertIn('weather', pm.plugins)
+        self.assertEqual(pm.get_plugin_help('weather'), pm.manifests['weather']['help'])
+        mock_import.assert_not_called()
+
+        self.assertEqual(pm.execute('weather', 'weather in london'), "sunny")
+        pm.execute('weather', 'weather in paris')
+        mock_import.assert_called_once_with('plugins.weather')
+        self.assertTrue(pm.stats()['weather']['loaded'])
+        self.assertIn('import_ms', pm.stats()['weather'])
+
+    @patch('importlib.import_module')
+    def test_failed_import_is_not_retried(self, mock_import):
+        mock_import.side_effect = ImportError("No module named 'requests'")
+        pm = PluginManager()
+        self.assertIn("not found", pm.execute('weather', 'weather in london'))
+        self.assertNotIn('weather', pm.plugins)
+        pm.execute('weather', 'weather in london')
+        self.assertEqual(mock_import.call_count, 1)
+
     def test_execute_plugin_success(self):
         with patch.object(self.pm, 'plugins', {'test': MagicMock(run=MagicMock(return_value="Success"))}):
             result = self.pm.execute('test', ['arg'])
@@ -40,14 +68,223 @@ class TestPluginManager(unittest.TestCase):
             result = self.pm.execute('test', [])
             self.assertIn("failed", result.lower())
 
+    @patch('importlib.import_module')
+    def test_load_all_isolates_failures(self, mock_import):
+        def fake_import(module_name):
+            if module_name == 'plugins.weather':
+                raise ImportError("No module named 'requests'")
+            return MagicMock()
+        mock_import.side_effect = fake_import
+        pm = PluginManager()
+        pm.plugins.load_all(workers=4)
+        stats = pm.stats()
+        self.assertIn("requests", stats['weather']['error'])
+        self.assertTrue(all(entry['loaded'] for name, entry in stats.items() if name != 'weather'))
+        self.assertEqual(mock_import.call_count, len(stats))
+
+    def test_plugin_instance_is_reused(self):
+        created = []
+
+        class Counter:
+            def __init__(self):
+                created.append(self)
+                self.calls = 0
+                self.torn_down = False
+
+            def setup(self):
+                self.ready = True
+
+            def teardown(self):
+                self.torn_down = True
+
+            def run(self, command):
+                self.calls += 1
+                return f"{command} #{self.calls}"
+
+        module = MagicMock(PLUGIN_CLASS=Counter)
+        with patch.object(self.pm, 'plugins', {'counter': module}):
+            self.assertEqual(self.pm.execute('counter', 'ping'), "ping #1")
+            self.assertEqual(self.pm.execute('counter', 'ping'), "ping #2")
+        self.assertEqual(len(created), 1)
+        self.assertTrue(created[0].ready)
+        module.run.assert_not_called()
+
+        self.pm.shutdown()
+        self.assertTrue(created[0].torn_down)
+        self.assertEqual(self.pm.instances, {})
+
+    def test_execute_times_out(self):
+        release = threading.Event()
+        slow = MagicMock()
+        slow.run.side_effect = lambda command: release.wait(5) and "late"
+        self.pm.manifests['slow'] = {'name': 'slow', 'timeout': 0.05}
+        with patch.object(self.pm, 'plugins', {'slow': slow}):
+            result = self.pm.execute('slow', 'go')
+        release.set()
+        self.assertIn("did not answer within 0.05 seconds", result)
+        self.assertEqual(self.pm.timeouts['slow'], 1)
+
+    def test_async_plugin_is_awaited(self):
+        class AsyncEcho:
+            async def run(self, command):
+                if command == "hang":
+                    await asyncio.sleep(5)
+                return f"echo {command}"
+
+        self.pm.manifests['echo'] = {'name': 'echo', 'timeout': 0.05}
+        with patch.object(self.pm, 'plugins', {'echo': MagicMock(PLUGIN_CLASS=AsyncEcho)}):
+            self.assertEqual(self.pm.execute('echo', 'hi'), "echo hi")
+            self.assertIn("did not answer", self.pm.execute('echo', 'hang'))
+        self.assertEqual(self.pm.pool.stats()['peak_queued'], 0)
+
+    def test_execute_refuses_when_queue_full(self):
+        from core.plugin_manager import PluginPool
+        release = threading.Event()
+        self.pm.pool = PluginPool(workers=1, max_queued=1)
+        busy = MagicMock()
+        busy.run.side_effect = lambda command: release.wait(5) and "done"
+        with patch.object(self.pm, 'plugins', {'busy': busy}):
+            running = self.pm.pool.submit(busy.run, 'first')
+            while self.pm.pool.stats()['running'] == 0:
+                time.sleep(0.01)
+            queued = self.pm.pool.submit(busy.run, 'second')
+            self.assertIn("try 'busy' again", self.pm.execute('busy', 'third'))
+        self.assertEqual(self.pm.pool.stats()['queued'], 1)
+        self.assertEqual(self.pm.pool.stats()['rejected'], 1)
+        release.set()
+        self.assertEqual(queued.result(timeout=5), "done")
+        self.assertEqual(running.result(timeout=5), "done")
+
+    def test_hung_call_does_not_hold_up_the_next(self):
+        from core.plugin_manager import PluginPool
+        release = threading.Event()
+        for _ in range(10):
+            pool = PluginPool(workers=4)
+            pool.submit(lambda: None).result(timeout=2)
+            while pool._idle == 0:
+                time.sleep(0.001)
+            # One idle worker, then a call that hangs and one right behind it
+            hung = pool.submit(release.wait)
+            quick = pool.submit(lambda: "done")
+            self.assertEqual(quick.result(timeout=2), "done")
+            release.set()
+            hung.result(timeout=2)
+            release.clear()
+
+    def test_task_scheduler_runs_in_background(self):
+        self.assertEqual(self.pm.execute('task_scheduler', 'run'), "Task scheduler started.")
+        self.assertEqual(self.pm.execute('task_scheduler', 'run'), "Task scheduler is already running.")
+        scheduler = self.pm.instances['task_scheduler']
+        self.pm.shutdown()
+        scheduler._thread.join(timeout=5)
+        self.assertFalse(scheduler._thread.is_alive())
+
+    def test_cached_plugin_runs_once_per_arguments(self):
+        weather = MagicMock()
+        weather.run.side_effect = lambda command: f"sunny ({command})"
+        self.pm.manifests['weather'] = {'name': 'weather', 'cache_ttl': 600}
+        with patch.object(self.pm, 'plugins', {'weather': weather}):
+            first = self.pm.execute('weather', 'weather in London')
+            self.assertEqual(self.pm.execute('weather', '  Weather in london? '), first)
+            self.pm.execute('weather', 'weather in paris')
+        self.assertEqual(weather.run.call_count, 2)
+        cache = self.pm.stats()['weather']['cache']
+        self.assertEqual((cache['hits'], cache['misses'], cache['hit_ratio']), (1, 2, 0.333))
+
+    def test_cache_only_read_only_commands(self):
+        git = MagicMock()
+        git.run.return_value = "ok"
+        self.pm.manifests['git_helper'] = {'name': 'git_helper', 'cache_ttl': 300, 'cache_commands': ['latest']}
+        with patch.object(self.pm, 'plugins', {'git_helper': git}):
+            for _ in range(2):
+                self.pm.execute('git_helper', 'latest octocat/hello-world')
+                self.pm.execute('git_helper', 'push')
+        self.assertEqual([c.args[0] for c in git.run.call_args_list],
+                         ['latest octocat/hello-world', 'push', 'push'])
+
+    def test_stale_result_served_while_refreshing(self):
+        calls = []
+        refreshed = threading.Event()
+        def run(command):
+            calls.append(command)
+            if len(calls) > 1:
+                refreshed.set()
+            return f"result {len(calls)}"
+        news = MagicMock()
+        news.run.side_effect = run
+        self.pm.manifests['news_fetcher'] = {'name': 'news_fetcher', 'cache_ttl': 60, 'cache_stale': 600}
+        with patch.object(self.pm, 'plugins', {'news_fetcher': news}):
+            self.assertEqual(self.pm.execute('news_fetcher', 'us'), "result 1")
+            cache, key = self.pm.get_cache('news_fetcher', 'us')
+            cache.set(key, "result 1", stored_at=time.time() - 120)
+            self.assertEqual(self.pm.execute('news_fetcher', 'us'), "result 1")
+            self.assertTrue(refreshed.wait(5))
+            for _ in range(100):
+                if cache.get_stale(key) == "result 2" and not self.pm._refreshing:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(self.pm.execute('news_fetcher', 'us'), "result 2")
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.pm.stats()['news_fetcher']['cache']['stale'], 1)
+
+    def test_failed_network_call_is_not_cached(self):
+        weather = self.pm.get_instance('weather', self.pm.plugins['weather'])
+        weather.api_key = "test-key"
+        response = MagicMock()
+        response.json.return_value = {"main": {"temp": 21}, "weather": [{"description": "clear sky"}]}
+        with patch('plugins.weather.requests.get', side_effect=requests.exceptions.ConnectionError("offline")):
+            self.assertIn("Failed to fetch weather data", self.pm.execute('weather', ['paris']))
+        cache, key = self.pm.get_cache('weather', ['paris'])
+        self.assertIsNone(cache.get_stale(key))
+
+        with patch('plugins.weather.requests.get', return_value=response):
+            good = self.pm.execute('weather', ['paris'])
+        self.assertEqual(good, "The temperature in paris is 21°C with clear sky.")
+
+        # An expired entry whose refresh fails keeps the good value
+        cache.set(key, good, stored_at=time.time() - 700)
+        with patch('plugins.weather.requests.get', side_effect=requests.exceptions.ConnectionError("offline")) as mock_get:
+            self.assertEqual(self.pm.execute('weather', ['paris']), good)
+            for _ in range(100):
+                if mock_get.called and not self.pm._refreshing:
+                    break
+                time.sleep(0.01)
+        self.assertTrue(mock_get.called)
+        self.assertEqual(cache.get_stale(key), good)
+
     def test_smart_dispatch_weather(self):
         plugin, response = self.pm.smart_dispatch("What's the weather like?")
         self.assertEqual(plugin, "weather")
 
+    def test_smart_dispatch_does_not_execute(self):
+        with patch.object(self.pm, 'execute') as mock_execute:
+            self.assertEqual(self.pm.smart_dispatch("git pull origin main"), ("git_helper", None))
+            mock_execute.assert_not_called()
+
+    def test_smart_dispatch_breaks_keyword_ties_by_intent(self):
+        self.assertEqual(self.pm.rank("search notes for meeting"), [("web_search", 1), ("notes", 1)])
+        self.assertEqual(self.pm.smart_dispatch("search notes for meeting"), ("notes", None))
+        self.assertEqual(self.pm.smart_dispatch("search for python tutorials"), ("web_search", None))
+
     def test_smart_dispatch_unknown(self):
         plugin, response = self.pm.smart_dispatch("Unknown command")
         self.assertIsNone(plugin)
         self.assertIn("couldn't find", response)
 
+    def test_plugin_examples_reach_a_subcommand(self):
+        # Only run()'s own dispatch is exercised: the methods it calls are mocks
+        for name, manifest in self.pm.manifests.items():
+            plugin_class = getattr(self.pm.plugins.get(name), "PLUGIN_CLASS", None)
+            if plugin_class is None:
+                continue  # failed to import here, e.g. system_control without sounddevice
+            for example in manifest.get("examples", []):
+                with self.subTest(plugin=name, example=example):
+                    self.assertEqual(self.pm.classify(example)[0], name)
+                    stub = MagicMock(spec=plugin_class)
+                    if hasattr(plugin_class, "parse_voice_command"):
+                        stub.parse_voice_command = partial(plugin_class.parse_voice_command, stub)
+                    answer = plugin_class.run(stub, *self.pm.plugin_args(name, example))
+                    self.assertNotIn("Unknown command", str(answer))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+from core.plugin_manifest import discover, read_manifest
+
+PLUGIN_SOURCE = '''import some_missing_dependency
+
+EXAMPLES = ["play music"]
+KEYWORDS = ["music", "play"]
+HELP = "Commands: play <file>"
+NOTES_FILE = "data/notes.json"
+
+def run(*args, **kwargs):
+    return "ok"
+'''
+
+class TestPluginManifest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def write(self, name, source):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(source)
+        return path
+
+    def test_reads_literals_without_importing(self):
+        manifest = read_manifest(self.write("music_player.py", PLUGIN_SOURCE))
+        self.assertEqual(manifest["name"], "music_player")
+        self.assertTrue(manifest["has_run"])
+        self.assertEqual(manifest["keywords"], ["music", "play"])
+        self.assertEqual(manifest["examples"], ["play music"])
+        self.assertEqual(manifest["help"], "Commands: play <file>")
+        self.assertNotIn("notes_file", manifest)
+
+    def test_discover_skips_plugins_without_run(self):
+        self.write("music_player.py", PLUGIN_SOURCE)
+        self.write("helpers.py", "KEYWORDS = ['x']\n")
+        self.write("broken.py", "def run(:\n")
+        self.write("__init__.py", "")
+        self.assertEqual(list(discover(self.dir.name)), ["music_player"])
+        self.assertEqual(discover(self.dir.name, skip={"music_player"}), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import asyncio
+import unittest
+from core.provider_chain import ProviderChain, AllProvidersFailed
+
+def make_call(behaviour, calls):
+    async def call(provider):
+        calls.append(provider)
+        delay, result = behaviour[provider]
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return call
+
+class TestProviderChain(unittest.TestCase):
+    def test_failover_to_next_provider(self):
+        calls = []
+        chain = ProviderChain(["ollama", "openai"], adaptive=False)
+        call = make_call({"ollama": (0, ConnectionError("down")), "openai": (0, "from openai")}, calls)
+        result, provider = asyncio.run(chain.run(call))
+        self.assertEqual((result, provider), ("from openai", "openai"))
+        self.assertEqual(chain.stats["ollama"].failures, 1)
+
+    def test_deadline_triggers_failover(self):
+        calls = []
+        chain = ProviderChain(["ollama", "openai"], deadlines={"ollama": 0.05}, adaptive=False)
+        call = make_call({"ollama": (1, "late"), "openai": (0, "fast")}, calls)
+        result, provider = asyncio.run(chain.run(call))
+        self.assertEqual(provider, "openai")
+
+    def test_hedging_takes_first_answer(self):
+        calls = []
+        chain = ProviderChain(["ollama", "openai"], hedge_delay=0.02, adaptive=False)
+        call = make_call({"ollama": (0.5, "slow"), "openai": (0.01, "hedged")}, calls)
+        result, provider = asyncio.run(chain.run(call))
+        self.assertEqual((result, provider), ("hedged", "openai"))
+        self.assertEqual(calls, ["ollama", "openai"])
+
+    def test_all_providers_fail(self):
+        chain = ProviderChain(["ollama"])
+        call = make_call({"ollama": (0, RuntimeError("boom"))}, [])
+        with self.assertRaises(AllProvidersFailed):
+            asyncio.run(chain.run(call))
+
+    def test_adaptive_order(self):
+        chain = ProviderChain(["ollama", "openai", "claude"])
+        self.assertEqual(chain.order(), ["ollama", "openai", "claude"])
+        chain.stats["ollama"].record(5.0)
+        chain.stats["openai"].record(0.5)
+        self.assertEqual(chain.order(), ["openai", "ollama", "claude"])
+
+    def test_demoted_provider_is_reprobed(self):
+        chain = ProviderChain(["ollama", "openai"], reprobe_interval=60)
+        chain.stats["ollama"].record(30.0, ok=False)
+        chain.stats["openai"].record(0.5)
+        self.assertEqual(chain.order(), ["openai", "ollama"])
+
+        chain.stats["ollama"].updated -= 60
+        self.assertEqual(chain.order(), ["ollama", "openai"])
+        # One probe at a time; a fast answer puts it back in front
+        self.assertEqual(chain.order(), ["openai", "ollama"])
+        chain.stats["ollama"].record(0.2)
+        self.assertEqual(chain.order(), ["ollama", "openai"])
+
+    def test_stream_fails_over_before_first_chunk(self):
+        async def open_stream(provider):
+            if provider == "ollama":
+                raise ConnectionError("down")
+            for chunk in ["a", "b"]:
+                yield chunk
+
+        async def collect():
+            return [chunk async for chunk in chain.stream(open_stream)]
+
+        chain = ProviderChain(["ollama", "openai"], adaptive=False)
+        self.assertEqual(asyncio.run(collect()), ["a", "b"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import time
+import unittest
+from core.response_cache import ResponseCache, TTLCache
+
+class TestTTLCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+    def test_ttl_expiry(self):
+        cache = TTLCache(max_size=2, ttl=1)
+        cache.set("a", 1, stored_at=time.time() - 5)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_grace_keeps_stale_entries(self):
+        cache = TTLCache(max_size=2, ttl=1, grace=10)
+        cache.set("a", 1, stored_at=time.time() - 5)
+        cache.set("b", 2, stored_at=time.time() - 20)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get_stale("a"), 1)
+        self.assertIsNone(cache.get_stale("b"))
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cache.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_normalizes_query(self):
+        a = ResponseCache.make_key("What can you do?", "ollama:llama3.2", "sys", [])
+        b = ResponseCache.make_key("  what CAN you   do ", "ollama:llama3.2", "sys", [])
+        c = ResponseCache.make_key("what can you do", "openai:gpt-4", "sys", [])
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_key_includes_context(self):
+        a = ResponseCache.make_key("hi", "m", "sys", [])
+        b = ResponseCache.make_key("hi", "m", "sys", [{"role": "user", "content": "earlier"}])
+        self.assertNotEqual(a, b)
+
+    def test_disk_tier_survives_restart(self):
+        cache = ResponseCache(path=self.path)
+        cache.set("k", "reply")
+        reopened = ResponseCache(path=self.path)
+        self.assertEqual(reopened.get("k"), "reply")
+        self.assertEqual(reopened.stats()["disk_hits"], 1)
+        self.assertEqual(reopened.get("k"), "reply")
+        self.assertEqual(reopened.stats()["disk_hits"], 1)
+
+    def test_miss_and_expiry(self):
+        cache = ResponseCache(path=self.path, ttl=1)
+        self.assertIsNone(cache.get("missing"))
+        cache.set("k", "reply")
+        cache.memory.clear()
+        cache._db.execute("UPDATE responses SET created = created - 10")
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["misses"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
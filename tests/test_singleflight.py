@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+from core.singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def run():
+            return await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(run()), ["result"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.shared, 4)
+        self.assertEqual(len(flight), 0)
+
+    def test_different_keys_run_separately(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def work(value):
+            calls.append(value)
+            await asyncio.sleep(0)
+            return value
+
+        async def run():
+            return await asyncio.gather(flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b")))
+
+        self.assertEqual(asyncio.run(run()), ["a", "b"])
+        self.assertEqual(sorted(calls), ["a", "b"])
+
+    def test_failure_reaches_every_caller(self):
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def run():
+            return await asyncio.gather(*(flight.do("key", work) for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(len(flight), 0)
+
+    def test_lead_resolved_by_caller(self):
+        flight = SingleFlight()
+
+        async def run():
+            future = flight.lead("key")
+            joiner = asyncio.ensure_future(flight.join(flight.pending("key")))
+            await asyncio.sleep(0)
+            future.set_result("streamed")
+            return await joiner
+
+        self.assertEqual(asyncio.run(run()), "streamed")
+        self.assertIsNone(flight.pending("key"))
+
+
+if __name__ == '__main__':
+    unittest.main()
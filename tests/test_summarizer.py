@@ -0,0 +1,71 @@
+import asyncio
+import unittest
+from core.summarizer import Summarizer
+
+
+def _turns(count):
+    return [{"timestamp": str(i), "user": f"question {i}", "ai": f"answer {i}"} for i in range(count)]
+
+
+class TestSummarizer(unittest.TestCase):
+    def test_not_scheduled_below_threshold(self):
+        async def complete(system_prompt, text):
+            raise AssertionError("should not summarise")
+
+        summarizer = Summarizer(complete, keep_turns=4, batch=2)
+
+        async def run():
+            return summarizer.schedule({"context": _turns(5)})
+
+        self.assertIsNone(asyncio.run(run()))
+
+    def test_folds_old_turns_into_summary(self):
+        prompts = []
+
+        async def complete(system_prompt, text):
+            prompts.append(text)
+            return "User asked questions 0-2. "
+
+        summarizer = Summarizer(complete, keep_turns=3, batch=2)
+        memory = {"context": _turns(6), "summary": "Earlier: greetings."}
+
+        async def run():
+            await summarizer.schedule(memory)
+
+        asyncio.run(run())
+        self.assertEqual(memory["summary"], "User asked questions 0-2.")
+        self.assertEqual([turn["timestamp"] for turn in memory["context"]], ["3", "4", "5"])
+        self.assertIn("Earlier: greetings.", prompts[0])
+        self.assertIn("User: question 2", prompts[0])
+        self.assertNotIn("question 3", prompts[0])
+
+    def test_keeps_turns_added_during_fold(self):
+        async def complete(system_prompt, text):
+            await asyncio.sleep(0.01)
+            return "summary"
+
+        summarizer = Summarizer(complete, keep_turns=2, batch=1)
+        memory = {"context": _turns(4)}
+
+        async def run():
+            task = summarizer.schedule(memory)
+            memory["context"].append({"timestamp": "new", "user": "late", "ai": "reply"})
+            self.assertIsNone(summarizer.schedule(memory))  # one fold at a time
+            await task
+
+        asyncio.run(run())
+        self.assertEqual([turn["timestamp"] for turn in memory["context"]], ["2", "3", "new"])
+
+    def test_failure_keeps_raw_turns(self):
+        async def complete(system_prompt, text):
+            raise RuntimeError("offline")
+
+        summarizer = Summarizer(complete, keep_turns=2, batch=1)
+        memory = {"context": _turns(4)}
+        self.assertFalse(asyncio.run(summarizer.fold(memory)))
+        self.assertEqual(len(memory["context"]), 4)
+        self.assertNotIn("summary", memory)
+
+
+if __name__ == '__main__':
+    unittest.main()
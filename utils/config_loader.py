@@ -17,6 +17,44 @@ def load_config():
         "voice_rate": 150,
         "voice_volume": 1.0,
         "memory_limit": 20,
+        "memory_compact_every": 200,  # journal entries between memory.json snapshots
+        "memory_backend": "json",  # or "sqlite" (WAL, full-text search over history)
+        "memory_db_path": "data/memory.db",
+        "memory_flush_delay": 1.0,  # seconds changes may wait before they are written
+        "context_token_budget": {"default": 1024},  # prompt tokens per model name
+        "context_max_turn_tokens": 256,
+        "stream_responses": True,
+        "intent_router_enabled": True,
+        "intent_router_threshold": 0.45,  # min cosine similarity to skip the LLM
+        "max_concurrent_queries": 4,
+        "batch_workers": 4,
+        "plugins_eager_load": False,  # import every plugin at startup instead of on first use
+        "plugins_load_workers": None,  # import threads in eager mode, defaults to the CPU count
+        "plugin_timeout": 30,  # seconds, for plugins that declare no TIMEOUT
+        "plugin_workers": 4,  # plugin calls running at once
+        "plugin_queue_size": 16,  # plugin calls allowed to wait for a worker
+        "plugin_cache_enabled": True,  # reuse results of plugins that declare CACHE_TTL
+        "response_cache_enabled": True,
+        "response_cache_ttl": 3600,  # seconds
+        "response_cache_size": 256,
+        "response_cache_disk_size": 5000,
+        "provider_chain": None,  # ordered fallbacks, defaults to [use_model]
+        "provider_timeouts": {},  # per-provider deadline in seconds
+        "hedge_delay": None,  # seconds before also asking the next provider
+        "adaptive_provider_order": True,
+        "provider_reprobe_interval": 300,  # seconds before a demoted provider is tried first again
+        "ollama_warmup": True,  # load the model in the background at startup
+        "ollama_keep_alive": "30m",  # how long Ollama keeps the model loaded after a request
+        "ollama_keep_warm_interval": 600,  # idle seconds between keep-warm pings, 0 disables
+        "long_term_memory_enabled": True,  # needs numpy
+        "long_term_memory_top_k": 3,  # past turns recalled into the prompt
+        "long_term_memory_min_score": 0.2,
+        "summary_enabled": True,  # fold older turns into a running summary
+        "summary_keep_turns": 6,  # recent turns kept verbatim
+        "session_mode": True,  # reuse Ollama context / Anthropic prompt cache across turns
+        "llm_timeout": 120,  # seconds
+        "llm_pool_size": 10,  # keep-alive connections per provider
+        "llm_keepalive_seconds": 300,
         "log_level": "INFO"
     }
 